@@ -0,0 +1,127 @@
+import itertools
+import logging
+import time
+from typing import Iterable, Iterator
+
+from ProcessingMetrics import ProcessingMetrics
+
+
+class AdaptiveFlushPolicy:
+    """Decides when the Processor closes the current file and how many opstellingen it converts per batch, instead of
+    the fixed write_size and batch_size.
+
+    A file is closed when it holds triple_budget triples or when the memory budget would be exceeded. The memory
+    budget is turned into a triple limit with the memory used per buffered triple, measured from the growth of the
+    resident set size (RSS) while a file fills up, leaving 1 - headroom of the budget for writing the file. The RSS
+    is sampled after every batch and the largest measurement is kept. Python keeps the memory of a closed file for the
+    next one, so the RSS only grows again once a file outgrows the earlier ones. Sinks that don't buffer their
+    triples (nt, ttl, binary without --deterministic) hardly grow, so for them only the triple budget applies. When
+    the RSS grows beyond the budget and beyond its earlier peak anyway (e.g. a measurement that came too late) the
+    file is closed after the batch.
+
+    batch_size is tuned to keep the extraction and conversion of a batch (without closing files) near
+    target_batch_seconds: it is halved when a batch takes more than twice the target and doubled when it takes less
+    than half of it. This keeps the memory samples at a steady pace, however many borden the opstellingen have.
+    Every decision is logged."""
+
+    def __init__(self, memory_budget_mb: float = None, triple_budget: int = None, batch_size: int = 100,
+                 min_batch_size: int = 10, max_batch_size: int = 10000, target_batch_seconds: float = 0.5,
+                 min_sample_triples: int = 10000, headroom: float = 0.8):
+        if memory_budget_mb is None and triple_budget is None:
+            raise ValueError('an adaptive flush policy needs a memory_budget_mb, a triple_budget or both')
+        self.memory_budget_kb = None if memory_budget_mb is None else int(memory_budget_mb * 1024)
+        self.triple_budget = triple_budget
+        self.batch_size = batch_size
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.target_batch_seconds = target_batch_seconds
+        self.min_sample_triples = min_sample_triples
+        self.headroom = headroom
+        self.bytes_per_triple = None
+        self.triple_limit = triple_budget
+        self.flushes = 0
+        self.reason = None
+        self._base_rss_kb = None
+        self._file_rss_kb = None
+        self._high_water_kb = 0
+        self._file_high_water_kb = 0
+        self._over_budget = False
+        self._flush_seconds = 0.0
+
+    def start_file(self):
+        """Called when a new file is started, measures the RSS the file grows from."""
+        self._file_rss_kb = ProcessingMetrics.get_rss_kb()
+        self._high_water_kb = max(self._high_water_kb, self._file_rss_kb)
+        self._file_high_water_kb = self._high_water_kb
+        if self._base_rss_kb is None:
+            self._base_rss_kb = self._file_rss_kb
+            if self.memory_budget_kb is not None and self._base_rss_kb >= self.memory_budget_kb:
+                logging.warning(f'the RSS is {self._base_rss_kb // 1024} MiB before converting, above the memory '
+                                f'budget of {self.memory_budget_kb // 1024} MiB')
+        self._over_budget = False
+
+    def batches(self, iterable: Iterable) -> Iterator[list]:
+        """Splits the iterable in batches of the current batch_size and tunes it on the time between two batches."""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            self._flush_seconds = 0.0
+            batch = list(itertools.islice(iterator, self.batch_size))
+            if not batch:
+                return
+            yield batch
+            if len(batch) == self.batch_size:
+                self.tune_batch_size(time.perf_counter() - start - self._flush_seconds)
+
+    def tune_batch_size(self, seconds: float):
+        batch_size = self.batch_size
+        if seconds > 2 * self.target_batch_seconds:
+            batch_size = max(self.min_batch_size, batch_size // 2)
+        elif seconds < self.target_batch_seconds / 2:
+            batch_size = min(self.max_batch_size, batch_size * 2)
+        if batch_size != self.batch_size:
+            logging.info(f'batch_size {self.batch_size} -> {batch_size}: the last batch took {seconds:.3f} s, '
+                         f'target {self.target_batch_seconds} s')
+            self.batch_size = batch_size
+
+    def after_batch(self, triples: int):
+        """Samples the RSS after a batch, with the amount of triples in the current file."""
+        if self.memory_budget_kb is None or triples == 0:
+            return
+        rss_kb = ProcessingMetrics.get_rss_kb()
+        self._high_water_kb = max(self._high_water_kb, rss_kb)
+        growth_kb = rss_kb - self._file_rss_kb
+        if growth_kb > 0 and triples >= self.min_sample_triples:
+            bytes_per_triple = growth_kb * 1024 / triples
+            if self.bytes_per_triple is None or bytes_per_triple > self.bytes_per_triple:
+                self.bytes_per_triple = bytes_per_triple
+                memory_limit = max(1, int((self.memory_budget_kb - self._base_rss_kb) * 1024 * self.headroom /
+                                          bytes_per_triple))
+                self.triple_limit = memory_limit if self.triple_budget is None else min(self.triple_budget,
+                                                                                        memory_limit)
+                logging.info(f'{bytes_per_triple:.0f} bytes per buffered triple measured, files are closed at '
+                             f'{self.triple_limit} triples')
+        self._over_budget = rss_kb >= self.memory_budget_kb and rss_kb > self._file_high_water_kb
+
+    def should_flush(self, triples: int) -> bool:
+        if self._over_budget:
+            self.reason = 'RSS over the memory budget'
+            return True
+        if self.triple_limit is not None and triples >= self.triple_limit:
+            self.reason = 'triple budget' if self.triple_limit == self.triple_budget else 'memory budget'
+            return True
+        return False
+
+    def flushed(self, triples: int, seconds: float):
+        """Called after the current file is closed, which took seconds."""
+        self.flushes += 1
+        self._flush_seconds += seconds
+        logging.info(f'closed a file at {triples} triples ({self.reason}), RSS '
+                     f'{ProcessingMetrics.get_rss_kb() // 1024} MiB')
+        self.start_file()
+
+    def log_summary(self):
+        message = f'adaptive flushing: {self.flushes} files closed early, batch_size ended at {self.batch_size}'
+        if self.bytes_per_triple is not None:
+            message += f', {self.bytes_per_triple:.0f} bytes per buffered triple'
+        logging.info(message)
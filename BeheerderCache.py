@@ -0,0 +1,98 @@
+import dataclasses
+
+from rdflib import Literal, RDF, URIRef
+
+import OTLVocabulary as otl
+from DimensionTables import SELF, TripleTemplate
+from SQLDbReader import SQLDbReader
+from WDBDataclasses.WDBOpstelling import WDBOpstelling
+
+# the name used in a precedence: the beheerder table and the field of WDBOpstelling holding its key
+BEHEERDER_SOURCES = {'gekozen': ('gekozenBeheerder', 'gekozen_beheerder_id'),
+                     'beheerder': ('beheerder', 'beheerder_id'),
+                     'berekend': ('berekendeBeheerder', 'berekende_beheerder_id')}
+DEFAULT_PRECEDENCE = ('gekozen', 'beheerder', 'berekend')
+
+
+@dataclasses.dataclass(frozen=True)
+class Beheerder:
+    """An agent with the suffix of the HeeftBetrokkene relation of an asset to it and its own triples (type and
+    naam), compiled once per gebiedcode. The Processor writes the triples of an agent once per file."""
+    uri: URIRef
+    relatie_suffix: str
+    template: TripleTemplate
+
+
+def compile_beheerder(gebiedcode: str, naam: str) -> Beheerder:
+    code = gebiedcode.strip().replace(' ', '-')
+    triples = [(SELF, RDF.type, otl.PURL_AGENT)]
+    if naam is not None:
+        triples.append((SELF, otl.PURL_AGENT_NAAM, Literal(naam)))
+    return Beheerder(uri=URIRef(f'{otl.AGENT}{code}'), relatie_suffix=f'-beheerder_{code}',
+                     template=TripleTemplate(triples))
+
+
+class BeheerderCache:
+    """The beheerders of the opstellingen. An opstelling refers to up to three beheerders, each in its own table: the
+    gekozenBeheerder (chosen by hand), the beheerder and the berekendeBeheerder (derived from the location). Every
+    table refers to the gebied of the beheerder, whose gebiedcode (an OVO code, KBO number or district code)
+    identifies the beheerder as an agent.
+    The tables are read once into rows, the (gebiedcode, naam) of every beheerder keyed on its key per source name
+    (see BEHEERDER_SOURCES), and compiled into beheerders. resolve() returns the beheerder of the first source in the
+    precedence that the opstelling refers to, so resolving a beheerder is a few dict lookups instead of extra joins on
+    the opstelling query. The tables can name the same gebied differently, an agent gets the naam of the first source
+    in the precedence that names it. Beheerders without a gebied can't be identified and are left out, an opstelling
+    referring to one falls through to the next source."""
+
+    def __init__(self, rows: dict = None, precedence: (str,) = DEFAULT_PRECEDENCE):
+        unknown = [source for source in precedence if source not in BEHEERDER_SOURCES]
+        if unknown:
+            raise ValueError(f'unknown beheerder source(s) {", ".join(unknown)} in the precedence, expected '
+                             f'{", ".join(BEHEERDER_SOURCES)}')
+        self.rows = {} if rows is None else rows
+        self.precedence = tuple(precedence)
+        self.beheerders = self.compile_beheerders()
+        self._lookups = tuple((WDBOpstelling._fields.index(BEHEERDER_SOURCES[source][1]),
+                               self.beheerders.get(source, {}).get)
+                              for source in self.precedence)
+
+    @classmethod
+    def load(cls, sql_db_reader: SQLDbReader, precedence: (str,) = DEFAULT_PRECEDENCE) -> 'BeheerderCache':
+        rows = {}
+        for source, (table, _) in BEHEERDER_SOURCES.items():
+            rows[source] = {key: (gebiedcode, naam) for key, naam, gebiedcode in sql_db_reader.perform_read_query(
+                f'SELECT {table}.key, {table}.naam, gebied.gebiedcode FROM {table} '
+                f'JOIN gebied ON gebied.key = {table}.gebiedCode_key ORDER BY {table}.key', {}) if gebiedcode}
+        return cls(rows, precedence)
+
+    def compile_beheerders(self) -> dict:
+        """The Beheerder of every key per source, one per gebiedcode."""
+        sources = self.precedence + tuple(source for source in BEHEERDER_SOURCES if source not in self.precedence)
+        namen = {}
+        for source in sources:
+            for gebiedcode, naam in self.rows.get(source, {}).values():
+                if naam is not None:
+                    namen.setdefault(gebiedcode, naam)
+        compiled = {}
+        beheerders = {}
+        for source, source_rows in self.rows.items():
+            beheerders[source] = {}
+            for key, (gebiedcode, _) in source_rows.items():
+                beheerder = compiled.get(gebiedcode)
+                if beheerder is None:
+                    beheerder = compiled[gebiedcode] = compile_beheerder(gebiedcode, namen.get(gebiedcode))
+                beheerders[source][key] = beheerder
+        return beheerders
+
+    def with_precedence(self, precedence: (str,)) -> 'BeheerderCache':
+        """A cache on the same rows with another precedence."""
+        return BeheerderCache(self.rows, precedence)
+
+    def resolve(self, opstelling: WDBOpstelling) -> Beheerder:
+        for index, get in self._lookups:
+            key = opstelling[index]
+            if key is not None:
+                beheerder = get(key)
+                if beheerder is not None:
+                    return beheerder
+        return None
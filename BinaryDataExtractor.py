@@ -0,0 +1,157 @@
+import base64
+import binascii
+import hashlib
+import logging
+import mimetypes
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import quote
+
+from rdflib import Literal, URIRef
+
+import OTLVocabulary as otl
+from NodeFactory import BlankNodeFactory
+from ProcessingMetrics import ProcessingMetrics
+from SQLiteQueryExecutor import SQLiteQueryExecutor
+from TripleSink import create_sink
+from WDBDataclasses.WDBBinaireData import WDBBinaireData
+
+
+class BinaryDataExtractor:
+    """Extracts the images of the binaireData table into a content-addressed directory and describes them as
+    DtcDocument bijlagen of their opstelling and, for an image of an aanzicht, of the borden on that aanzicht (the
+    aanzicht itself is not an asset). An image that can't be linked to any asset is logged.
+    Every image is stored once as <directory>/<md5[:2]>/<md5><extension>, md5 being the hex form of the (base64)
+    md5 column. Images that were already written, in this run or an earlier one, are skipped; images whose content
+    doesn't match their md5 are logged and skipped. The records are fetched in chunks of chunk_size: every chunk is
+    handed to a pool of threads that decodes and writes it, and released before the next one is fetched, so at most
+    one chunk of blobs is in memory."""
+
+    def __init__(self, executor: SQLiteQueryExecutor, directory: Path, base_uri: str = None, workers: int = 4,
+                 chunk_size: int = 100, node_factory=None, metrics: ProcessingMetrics = None):
+        """base_uri is the start of the DtcDocument uri of the files, where they are published. When not given the
+        uri is a relative reference to the file: the directory as given followed by its path in the directory, so
+        the output doesn't depend on the machine or the working directory of the run."""
+        self.executor = executor
+        self.directory = directory
+        self.base_uri = base_uri if base_uri is not None else quote(f'{directory.as_posix().rstrip("/")}/')
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.node_factory = BlankNodeFactory() if node_factory is None else node_factory
+        self.metrics = ProcessingMetrics() if metrics is None else metrics
+        self.written = set()
+        self.files_written = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.unlinked = 0
+
+    @staticmethod
+    def get_md5_hex(md5: str) -> str:
+        """The export stores the md5 base64 encoded, older exports as hex."""
+        if len(md5) == 32:
+            return md5.lower()
+        return base64.b64decode(md5).hex()
+
+    @staticmethod
+    def get_extension(mime: str) -> str:
+        if mime == 'image/png':
+            return '.png'
+        return mimetypes.guess_extension(mime or '') or '.bin'
+
+    def get_relative_path(self, md5_hex: str, mime: str) -> str:
+        return f'{md5_hex[:2]}/{md5_hex}{self.get_extension(mime)}'
+
+    def write_file(self, record: WDBBinaireData, md5_hex: str, relative_path: str) -> bool:
+        """Decodes and writes one image, runs in the thread pool. Returns False when the image is rejected."""
+        try:
+            content = base64.b64decode(record.data, validate=True)
+        except (binascii.Error, ValueError, TypeError):
+            logging.warning(f'binaireData {record.id} is not valid base64, skipped')
+            return False
+        if hashlib.md5(content).hexdigest() != md5_hex:
+            logging.warning(f'binaireData {record.id} does not match its md5 {record.md5}, skipped')
+            return False
+
+        path = self.directory / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f'{path.name}.{record.id}.tmp')
+        with open(temp_path, 'wb') as file:
+            file.write(content)
+        os.replace(temp_path, path)
+        return True
+
+    def add_document(self, g, record: WDBBinaireData, md5_hex: str, relative_path: str, bord_ids: [int] = ()):
+        """Describes the image as a DtcDocument that is a bijlage of its opstelling and of every bord in bord_ids."""
+        asset_uris = [URIRef(f'{otl.ASSET}bord_{bord_id}') for bord_id in bord_ids]
+        if record.opstelling_id is not None:
+            asset_uris.insert(0, URIRef(f'{otl.ASSET}opstelling_{record.opstelling_id}'))
+        if not asset_uris:
+            logging.warning(f'binaireData {record.id} has no opstelling or bord, {relative_path} is not linked')
+            self.unlinked += 1
+            return
+        document_node = self.node_factory.new_node(asset_uris[0], otl.AIMOBJECT_BIJLAGE, key=record.id)
+        for asset_uri in asset_uris:
+            g.add((asset_uri, otl.AIMOBJECT_BIJLAGE, document_node))
+        g.add((document_node, otl.DTC_DOCUMENT_BESTANDSNAAM, Literal(relative_path.split('/')[-1])))
+        g.add((document_node, otl.DTC_DOCUMENT_URI, URIRef(f'{self.base_uri}{relative_path}')))
+        if record.mime == 'image/png':
+            g.add((document_node, otl.DTC_DOCUMENT_MIME_TYPE, otl.KL_ALG_MIME_TYPE_IMAGE_PNG))
+        if record.naam:
+            g.add((document_node, otl.DTC_DOCUMENT_OMSCHRIJVING, Literal(record.naam)))
+
+    def process_chunk(self, pool: ThreadPoolExecutor, g, chunk: [WDBBinaireData]):
+        futures = {}
+        documents = []
+        for record in chunk:
+            if not record.md5 or not record.data:
+                self.rejected += 1
+                continue
+            try:
+                md5_hex = self.get_md5_hex(record.md5)
+            except (binascii.Error, ValueError):
+                logging.warning(f'binaireData {record.id} has an invalid md5 {record.md5}, skipped')
+                self.rejected += 1
+                continue
+            relative_path = self.get_relative_path(md5_hex, record.mime)
+            documents.append((record, md5_hex, relative_path))
+            if md5_hex in self.written or md5_hex in futures or os.path.isfile(self.directory / relative_path):
+                self.duplicates += 1
+                continue
+            futures[md5_hex] = pool.submit(self.write_file, record, md5_hex, relative_path)
+
+        for md5_hex, future in futures.items():
+            if future.result():
+                self.files_written += 1
+                self.written.add(md5_hex)
+            else:
+                self.rejected += 1
+
+        bord_ids = self.executor.get_bord_ids(sorted({record.aanzicht_id for record, _, _ in documents
+                                                      if record.aanzicht_id is not None}))
+        for record, md5_hex, relative_path in documents:
+            future = futures.get(md5_hex)
+            if future is None or future.result():
+                self.add_document(g, record, md5_hex, relative_path, bord_ids.get(record.aanzicht_id, ()))
+
+    def extract(self, g):
+        """Writes the images and adds the bijlage triples to g (a graph or sink)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for chunk in self.executor.get_binaire_data_chunks(self.chunk_size):
+                with self.metrics.measure('documents', items=len(chunk)):
+                    self.process_chunk(pool, g, chunk)
+                # release the blobs before the next chunk is fetched
+                del chunk
+        print(f'binaireData: {self.files_written} files written to {self.directory}, {self.duplicates} duplicates, '
+              f'{self.rejected} rejected, {self.unlinked} not linked')
+
+    def process(self, sink_type: str = 'rdflib', output_prefix: str = 'test', sort: bool = False,
+                compression: str = None) -> str:
+        """Extracts the images and writes the bijlage triples to <output_prefix>_documenten. Returns the file name."""
+        sink = create_sink(sink_type, f'{output_prefix}_documenten', sort=sort, compression=compression)
+        self.extract(sink)
+        amount_triples = len(sink)
+        sink.close()
+        print(f'wrote {sink.file_name} with {amount_triples} triples')
+        return sink.file_name
@@ -0,0 +1,165 @@
+"""A compact binary RDF format with a dictionary that is built while streaming, in the spirit of RDF Thrift and HDT.
+
+A file starts with MAGIC, followed by the triples as three term references each. A reference is an unsigned LEB128
+varint: the id of a term written before, or 0 for a new term that follows right away and gets the next id (ids start at
+1). A new term is a kind byte followed by:
+- IRI: a namespace reference (varint, 0 for a new namespace string, which gets the next namespace id) and the local
+  name string; the namespace is the IRI up to and including its last '/' or '#'
+- BNODE: the label string
+- LITERAL: the lexical form string
+- TYPED_LITERAL: a term reference to the datatype IRI and the lexical form string
+- LANG_LITERAL: the language string and the lexical form string
+Strings are a varint length followed by UTF-8 bytes. Every long OTL IRI is thus written once per file and referenced
+with one to three bytes afterwards.
+
+Convert a file to N-Triples with: python BinaryRDF.py <file.rdfb[.gz|.zst]> [output.nt]"""
+import sys
+from typing import Iterator
+
+from rdflib import BNode, Literal, URIRef, XSD
+
+from CompressedOutput import open_input
+
+MAGIC = b'RDFB\x01\n'
+IRI, BNODE, LITERAL, TYPED_LITERAL, LANG_LITERAL = 1, 2, 3, 4, 5
+
+
+def encode_varint(value: int, out: bytearray):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def encode_string(value: str, out: bytearray):
+    data = value.encode('utf-8')
+    encode_varint(len(data), out)
+    out += data
+
+
+class BinaryRDFEncoder:
+    """Encodes triples into the bytes of the format, keeping the dictionary of the terms written so far."""
+
+    def __init__(self):
+        self.terms = {}
+        self.namespaces = {}
+
+    def encode_term(self, term, out: bytearray):
+        term_id = self.terms.get(term)
+        if term_id is not None:
+            encode_varint(term_id, out)
+            return
+        out.append(0)
+        self.terms[term] = len(self.terms) + 1
+        if isinstance(term, URIRef):
+            split = max(term.rfind('/'), term.rfind('#')) + 1
+            namespace = term[:split]
+            out.append(IRI)
+            namespace_id = self.namespaces.get(namespace)
+            if namespace_id is None:
+                out.append(0)
+                self.namespaces[namespace] = len(self.namespaces) + 1
+                encode_string(namespace, out)
+            else:
+                encode_varint(namespace_id, out)
+            encode_string(term[split:], out)
+        elif isinstance(term, BNode):
+            out.append(BNODE)
+            encode_string(term, out)
+        elif term.language is not None:
+            out.append(LANG_LITERAL)
+            encode_string(term.language, out)
+            encode_string(term, out)
+        elif term.datatype is not None:
+            out.append(TYPED_LITERAL)
+            self.encode_term(term.datatype, out)
+            lexical = str(term)
+            if term.datatype == XSD.decimal and '.' not in lexical and 'e' not in lexical and 'E' not in lexical:
+                # same lexical form as the turtle and N-Triples sinks
+                lexical += '.0'
+            encode_string(lexical, out)
+        else:
+            out.append(LITERAL)
+            encode_string(term, out)
+
+    def encode(self, triple: tuple, out: bytearray):
+        self.encode_term(triple[0], out)
+        self.encode_term(triple[1], out)
+        self.encode_term(triple[2], out)
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.position = 0
+        self.terms = [None]
+        self.namespaces = [None]
+
+    def read_varint(self) -> int:
+        data = self.data
+        result = shift = 0
+        while True:
+            byte = data[self.position]
+            self.position += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    def read_string(self) -> str:
+        length = self.read_varint()
+        start = self.position
+        self.position += length
+        return self.data[start:self.position].decode('utf-8')
+
+    def read_term(self):
+        term_id = self.read_varint()
+        if term_id:
+            return self.terms[term_id]
+        # reserve the id before reading the term, a datatype inside it gets the next one
+        term_id = len(self.terms)
+        self.terms.append(None)
+        kind = self.data[self.position]
+        self.position += 1
+        if kind == IRI:
+            namespace_id = self.read_varint()
+            if namespace_id == 0:
+                self.namespaces.append(self.read_string())
+                namespace_id = len(self.namespaces) - 1
+            term = URIRef(self.namespaces[namespace_id] + self.read_string())
+        elif kind == BNODE:
+            term = BNode(self.read_string())
+        elif kind == LITERAL:
+            term = Literal(self.read_string())
+        elif kind == TYPED_LITERAL:
+            datatype = self.read_term()
+            term = Literal(self.read_string(), datatype=datatype)
+        elif kind == LANG_LITERAL:
+            language = self.read_string()
+            term = Literal(self.read_string(), lang=language)
+        else:
+            raise ValueError(f'unknown term kind {kind} at byte {self.position - 1}')
+        self.terms[term_id] = term
+        return term
+
+
+def read_binary_rdf(file_name: str) -> Iterator[tuple]:
+    """Yields the triples of a (compressed) binary RDF file as rdflib terms. The file is read into memory at once."""
+    with open_input(file_name) as input_file:
+        data = input_file.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f'{file_name} is not a binary RDF file')
+    reader = _Reader(data)
+    reader.position = len(MAGIC)
+    while reader.position < len(data):
+        yield reader.read_term(), reader.read_term(), reader.read_term()
+
+
+if __name__ == '__main__':
+    from TripleSink import NTriplesSink
+
+    output = open(sys.argv[2], 'w', encoding='utf-8') if len(sys.argv) > 2 else sys.stdout
+    format_term = NTriplesSink.format_term
+    for s, p, o in read_binary_rdf(sys.argv[1]):
+        output.write(f'{format_term(s)} {format_term(p)} {format_term(o)} .\n')
+    output.close()
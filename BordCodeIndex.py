@@ -0,0 +1,147 @@
+"""Index of the wegcode register, compiled once when the register is loaded. Maps the bord codes of a WDB export to
+the class of the bord and the register entry of the sign, also when the code in the export isn't written exactly as
+in the register. A code is resolved, in order, by:
+- an exact match: 'C43'
+- its normalised form, folding case, spaces, dots and a trailing '/': 'F34b2', 'F91 b', 'c43/'
+- a zonal code, a Z followed by the code of the sign: 'ZC43/' resolves to C43
+- a composite code, the first code before a '-': 'C5-C7' resolves to C5, 'F27-xx' to F27. The other parts that
+  can't be resolved ('xx') are reported as missing from the register, see BordCodeInfo.unresolved
+Any other code is not found. A code that only starts with a register code is another sign ('B15a' isn't B15, 'D1d'
+isn't D1), it is reported as missing from the register instead of getting the betekenis and image of that code.
+The result per code is memoised, so every code is resolved once per run. The index itself only holds strings, tuples
+and dicts (see to_data), the triples of a register entry are compiled the first time a code resolves to it."""
+import csv
+import dataclasses
+import re
+from pathlib import Path
+
+from rdflib import Literal, URIRef
+
+import OTLVocabulary as otl
+from DimensionTables import SELF, TripleTemplate
+
+_IGNORED = re.compile(r'[\s.]+')
+
+
+def normalise_code(code: str) -> str:
+    return _IGNORED.sub('', code).rstrip('/').casefold()
+
+
+def get_bord_type(code: str) -> URIRef:
+    if code is not None and code[0:1] in ('G', 'M'):
+        return otl.ONDERBORD
+    if code is not None and code[0:4] == 'ITRS':
+        return otl.CALAMITEITS_BORD
+    return otl.RETROREFLECTEREND_VERKEERSBORD
+
+
+@dataclasses.dataclass(frozen=True)
+class RegisterEntry:
+    """A row of the register: code, image path and betekenis. template holds the betekenis and afbeelding triples of
+    a verkeersbordconcept with this code."""
+    code: str
+    image: str
+    betekenis: str
+    template: TripleTemplate
+
+
+@dataclasses.dataclass(frozen=True)
+class BordCodeInfo:
+    """What the conversion needs to know about a bord code: the class of the bord and the register entry of the
+    sign, None when the code can't be resolved. unresolved holds the parts of a composite code after the one it
+    resolved to that are not in the register."""
+    type_uri: URIRef
+    entry: RegisterEntry = None
+    unresolved: (str,) = ()
+
+
+def compile_register_entry(code: str, image: str, betekenis: str) -> RegisterEntry:
+    return RegisterEntry(code=code, image=image, betekenis=betekenis, template=TripleTemplate([
+        (SELF, otl.VERKEERSBORD_CONCEPT_BETEKENIS, Literal(betekenis)),
+        (SELF, otl.VERKEERSBORD_CONCEPT_AFBEELDING, 1),
+        (1, otl.DTC_DOCUMENT_BESTANDSNAAM, Literal(image.split('/')[-1])),
+        (1, otl.DTC_DOCUMENT_URI, URIRef(f'{otl.WEGCODE}{image}')),
+        (1, otl.DTC_DOCUMENT_MIME_TYPE, otl.KL_ALG_MIME_TYPE_IMAGE_PNG)]))
+
+
+class BordCodeIndex:
+    def __init__(self, entries: dict = None, normalised_codes: dict = None):
+        """entries: (image, betekenis) per register code, normalised_codes: the register code per normalised code."""
+        self.entries = {} if entries is None else entries
+        self.normalised_codes = {} if normalised_codes is None else normalised_codes
+        self.compiled_entries = {}
+        self.infos = {}
+
+    def to_data(self) -> dict:
+        return {'entries': self.entries, 'normalised_codes': self.normalised_codes}
+
+    @classmethod
+    def from_data(cls, data: dict) -> 'BordCodeIndex':
+        return cls(entries=data['entries'], normalised_codes=data['normalised_codes'])
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add_register(self, bord_register: Path):
+        """Adds the rows of a wegcode register csv: image path;"<code>. <betekenis>"."""
+        with open(bord_register, newline='') as csvfile:
+            for row in csv.reader(csvfile, delimiter=';'):
+                splitted = row[1].split('. ', 2)
+                self.add_entry(code=splitted[0], image=row[0], betekenis=splitted[1])
+
+    def add_entry(self, code: str, image: str, betekenis: str):
+        self.entries[code] = (image, betekenis)
+        normalised = normalise_code(code)
+        self.normalised_codes.setdefault(normalised, code)
+        self.compiled_entries.pop(code, None)
+        self.infos.clear()
+
+    def get(self, code: str) -> BordCodeInfo:
+        info = self.infos.get(code)
+        if info is None:
+            register_code = self.resolve(code)
+            info = BordCodeInfo(type_uri=get_bord_type(code), entry=self.get_entry(register_code),
+                                unresolved=() if register_code is None else self.get_unresolved_parts(code))
+            self.infos[code] = info
+        return info
+
+    def get_unresolved_parts(self, code: str) -> (str,):
+        """The parts after the first of a composite code that can't be resolved, () when code isn't composite."""
+        normalised = normalise_code(code)
+        if code in self.entries or normalised in self.normalised_codes or '-' not in normalised:
+            return ()
+        parts = [part.strip() for part in code.split('-')[1:]]
+        return tuple(part for part in parts if part and self.resolve(part) is None)
+
+    def get_entry(self, register_code: str) -> RegisterEntry:
+        if register_code is None:
+            return None
+        entry = self.compiled_entries.get(register_code)
+        if entry is None:
+            image, betekenis = self.entries[register_code]
+            entry = compile_register_entry(code=register_code, image=image, betekenis=betekenis)
+            self.compiled_entries[register_code] = entry
+        return entry
+
+    def resolve(self, code: str) -> str:
+        """Returns the register code the code resolves to, None when it can't be resolved."""
+        if code is None:
+            return None
+        if code in self.entries:
+            return code
+        normalised = normalise_code(code)
+        if not normalised:
+            return None
+        register_code = self._resolve_normalised(normalised)
+        if register_code is None and normalised[0] == 'z':
+            register_code = self._resolve_normalised(normalised[1:])
+        return register_code
+
+    def _resolve_normalised(self, normalised: str) -> str:
+        register_code = self.normalised_codes.get(normalised)
+        if register_code is not None:
+            return register_code
+        first = normalised.split('-', 1)[0]
+        if first != normalised:
+            return self.normalised_codes.get(first)
+        return None
@@ -0,0 +1,82 @@
+"""Compiles the wegcode register into a marshalled BordCodeIndex (its entries and normalised codes), so a run
+loads the index instead of parsing the csv. The artifact records a hash of the register csv, the artifact version and
+the Python version, as the marshal format depends on it; when the hash doesn't match, the index is compiled again and
+the artifact replaced. When the artifact can't be written, e.g. in a read-only install, the run uses the index it
+compiled in memory.
+
+Build the artifact ahead of the runs with: python CompiledRegister.py [register csv] [artifact]"""
+import contextlib
+import hashlib
+import logging
+import marshal
+import os
+import sys
+from pathlib import Path
+
+from BordCodeIndex import BordCodeIndex
+
+ARTIFACT_VERSION = 3
+
+
+def get_artifact_path(bord_register: Path) -> Path:
+    return bord_register.with_suffix('.index.bin')
+
+
+def get_source_hash(bord_register: Path) -> str:
+    source_hash = hashlib.sha256(
+        f'bord code index v{ARTIFACT_VERSION} python {sys.version_info[0]}.{sys.version_info[1]}'.encode('utf-8'))
+    with open(bord_register, 'rb') as source_file:
+        source_hash.update(hashlib.sha256(source_file.read()).digest())
+    return source_hash.hexdigest()
+
+
+def write_artifact(index: BordCodeIndex, bord_register: Path, artifact_path: Path):
+    """Writes the artifact of the index, replacing it atomically."""
+    temp_path = artifact_path.with_name(f'{artifact_path.name}.{os.getpid()}.tmp')
+    try:
+        with open(temp_path, 'wb') as artifact_file:
+            artifact_file.write(marshal.dumps({'source_hash': get_source_hash(bord_register),
+                                               'index': index.to_data()}))
+        os.replace(temp_path, artifact_path)
+    finally:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+
+
+def compile_register(bord_register: Path, artifact_path: Path = None) -> BordCodeIndex:
+    """Compiles the register and writes the artifact."""
+    artifact_path = get_artifact_path(bord_register) if artifact_path is None else artifact_path
+    index = BordCodeIndex()
+    index.add_register(bord_register)
+    write_artifact(index, bord_register, artifact_path)
+    return index
+
+
+def load_register(bord_register: Path, artifact_path: Path = None) -> BordCodeIndex:
+    """Returns the index of the register from the artifact, compiling it first when the artifact is missing, of
+    another version or built from other sources. When the artifact can't be written, the compiled index is used
+    without it."""
+    artifact_path = get_artifact_path(bord_register) if artifact_path is None else artifact_path
+    if os.path.isfile(artifact_path):
+        try:
+            # loads on the whole file is much faster than load, which reads the file in small pieces
+            with open(artifact_path, 'rb') as artifact_file:
+                artifact = marshal.loads(artifact_file.read())
+            if artifact['source_hash'] == get_source_hash(bord_register):
+                return BordCodeIndex.from_data(artifact['index'])
+        except (ValueError, EOFError, TypeError, KeyError) as exc:
+            logging.warning(f'{artifact_path} can not be read ({exc}), compiling {bord_register} again')
+    index = BordCodeIndex()
+    index.add_register(bord_register)
+    try:
+        write_artifact(index, bord_register, artifact_path)
+    except OSError as exc:
+        logging.warning(f'{artifact_path} can not be written ({exc}), using the index of {bord_register} in memory')
+    return index
+
+
+if __name__ == '__main__':
+    register_path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path('wegcode_register.csv')
+    artifact = Path(sys.argv[2]) if len(sys.argv) > 2 else get_artifact_path(register_path)
+    compiled = compile_register(register_path, artifact)
+    print(f'compiled {len(compiled)} register entries into {artifact}')
@@ -0,0 +1,130 @@
+"""Compressed output files for the streaming sinks. The sinks write text (or bytes) to a CompressedWriter, which
+collects it in blocks and hands every block to a background thread that compresses it and writes it to the file, so the
+compression overlaps with the conversion (zlib and zstandard release the GIL while compressing).
+
+gzip uses zlib from the standard library, zstd needs the optional zstandard package."""
+import gzip
+import os
+import queue
+import threading
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+
+
+def check_compression(compression: str):
+    """Raises when the compression is unknown or its package is not installed, so a conversion fails before it starts
+    instead of at its first file."""
+    if compression is None or compression == 'gzip':
+        return
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f'unknown compression {compression}, expected one of {", ".join(COMPRESSION_SUFFIXES)}')
+    if zstandard is None:
+        raise ImportError('zstd compression needs zstandard, install it with pip install zstandard')
+
+
+def get_compressor(compression: str, level: int = None):
+    if compression == 'gzip':
+        # wbits 31: gzip header and trailer, readable with gzip and zcat
+        return zlib.compressobj(6 if level is None else level, zlib.DEFLATED, 31)
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ImportError('zstd compression needs zstandard, install it with pip install zstandard')
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compressobj()
+    raise ValueError(f'unknown compression {compression}, expected one of {", ".join(COMPRESSION_SUFFIXES)}')
+
+
+class CompressedWriter:
+    """A write-only file object that compresses in a background thread. Text is encoded as UTF-8 (binary=False) or
+    bytes are written as they are (binary=True). At most queue_size blocks of block_size wait for the compressor.
+    raw_size is the amount of bytes before compression."""
+
+    def __init__(self, file_name: str, compression: str, binary: bool = False, block_size: int = 1 << 20,
+                 queue_size: int = 4, level: int = None):
+        self.file_name = file_name
+        self.binary = binary
+        self.block_size = block_size
+        self.raw_size = 0
+        self._compressor = get_compressor(compression, level)
+        self._parts = []
+        self._pending = 0
+        self._error = None
+        self._file = open(file_name, 'wb')
+        self._blocks = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._compress, name=f'compress {file_name}', daemon=True)
+        self._thread.start()
+
+    def _compress(self):
+        try:
+            while True:
+                block = self._blocks.get()
+                if block is None:
+                    break
+                self._file.write(self._compressor.compress(block))
+            self._file.write(self._compressor.flush())
+        except BaseException as error:
+            self._error = error
+            # keep taking blocks, so the writing thread doesn't wait forever
+            while self._blocks.get() is not None:
+                pass
+        finally:
+            self._file.close()
+
+    def write(self, data):
+        self._parts.append(data)
+        self._pending += len(data)
+        if self._pending >= self.block_size:
+            self._flush_block()
+
+    def _flush_block(self):
+        if self._error is not None:
+            raise self._error
+        block = b''.join(self._parts) if self.binary else ''.join(self._parts).encode('utf-8')
+        self._parts = []
+        self._pending = 0
+        if block:
+            self.raw_size += len(block)
+            self._blocks.put(block)
+
+    def close(self):
+        if self._thread is None:
+            return
+        try:
+            self._flush_block()
+        finally:
+            self._blocks.put(None)
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            raise self._error
+
+
+def open_output(file_name: str, compression: str = None, binary: bool = False, buffer_size: int = 1 << 20):
+    """Opens an output file for writing text (or bytes), compressed in the background when compression is given."""
+    if compression is None:
+        if binary:
+            return open(file_name, 'wb', buffering=buffer_size)
+        return open(file_name, 'w', encoding='utf-8', buffering=buffer_size)
+    return CompressedWriter(file_name, compression, binary=binary, block_size=buffer_size)
+
+
+def open_input(file_name: str):
+    """Opens a file written by open_output for reading bytes, decompressing it based on its suffix."""
+    if file_name.endswith(COMPRESSION_SUFFIXES['gzip']):
+        return gzip.open(file_name, 'rb')
+    if file_name.endswith(COMPRESSION_SUFFIXES['zstd']):
+        if zstandard is None:
+            raise ImportError('reading zstd files needs zstandard, install it with pip install zstandard')
+        return zstandard.ZstdDecompressor().stream_reader(open(file_name, 'rb'), closefd=True)
+    return open(file_name, 'rb')
+
+
+def get_sizes(output, file_name: str) -> (int, int):
+    """The (raw, written) size in bytes of a closed output file."""
+    size = os.path.getsize(file_name) if os.path.isfile(file_name) else 0
+    return getattr(output, 'raw_size', size), size
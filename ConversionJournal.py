@@ -0,0 +1,68 @@
+import json
+import os
+from pathlib import Path
+
+
+class ConversionJournal:
+    """Records the progress of a conversion after every output file that is written: the id of the last opstelling in
+    the written files, how many opstellingen they hold, the file counter (graph_counter) and what was accumulated so
+    far (triples, files, checksums, the codes missing from the bord register and the state of the quarantine). A run
+    that is interrupted can be resumed from the journal instead of starting over from the first opstelling.
+    The output files are only renamed to their final name once complete (see TripleSink), and the journal is replaced
+    atomically after the rename, so it never refers to a file that isn't fully written. The settings that determine
+    the content of the files are kept in the journal, a run with other settings can't resume it."""
+
+    version = 1
+
+    def __init__(self, path: Path, settings: dict):
+        self.path = path
+        self.settings = settings
+        self.last_opstelling_id = None
+        self.opstellingen = 0
+        self.graph_counter = 0
+        self.triples_written = 0
+        self.written_files = []
+        self.checksums = {}
+        self.bord_register_not_found = set()
+        self.rejects = None
+
+    def load(self) -> bool:
+        """Reads the journal of an interrupted run, returns False when there is none."""
+        if not os.path.isfile(self.path):
+            return False
+        with open(self.path, encoding='utf-8') as journal_file:
+            data = json.load(journal_file)
+        if data.get('version') != self.version:
+            raise ValueError(f'{self.path} is a journal of version {data.get("version")}, expected {self.version}')
+        if data['settings'] != self.settings:
+            raise ValueError(f'{self.path} was written by a run with other settings ({data["settings"]}), resume it '
+                             f'with the same settings or remove it to start over')
+        self.last_opstelling_id = data['last_opstelling_id']
+        self.opstellingen = data['opstellingen']
+        self.graph_counter = data['graph_counter']
+        self.triples_written = data['triples_written']
+        self.written_files = data['written_files']
+        self.checksums = data['checksums']
+        self.bord_register_not_found = set(data['bord_register_not_found'])
+        self.rejects = data.get('rejects')
+        return True
+
+    def save(self, last_opstelling_id: int, opstellingen: int, graph_counter: int, triples_written: int,
+             written_files: [str], checksums: dict, bord_register_not_found: set, rejects: dict = None):
+        self.last_opstelling_id = last_opstelling_id
+        self.opstellingen = opstellingen
+        self.graph_counter = graph_counter
+        temp_path = Path(f'{self.path}.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as journal_file:
+            json.dump({'version': self.version, 'settings': self.settings,
+                       'last_opstelling_id': last_opstelling_id, 'opstellingen': opstellingen,
+                       'graph_counter': graph_counter, 'triples_written': triples_written,
+                       'written_files': written_files, 'checksums': checksums,
+                       'bord_register_not_found': sorted(bord_register_not_found), 'rejects': rejects},
+                      journal_file)
+        os.replace(temp_path, self.path)
+
+    def remove(self):
+        """Removes the journal of a run that completed."""
+        if os.path.isfile(self.path):
+            os.remove(self.path)
@@ -0,0 +1,184 @@
+"""Declarative dimension tables for the funderingen (sokkels) and the bord vormen. Every sokkel and every distinct
+(vorm, breedte, hoogte) is compiled once into a TripleTemplate holding the afmeting subtree, the oppervlakte and the
+grootteorde, so converting a sign only copies a template instead of branching and recomputing the area."""
+import dataclasses
+import logging
+import math
+from functools import lru_cache
+from typing import Callable, Iterable
+
+from rdflib import BNode, Graph, Literal, URIRef, XSD
+
+import OTLVocabulary as otl
+from WDBDataclasses.WDBSokkelAfmeting import WDBSokkelAfmeting
+
+SELF = 0
+
+
+class TripleTemplate:
+    """A subtree of triples hanging from one subject. The subjects and objects in the triples are SELF, the number of
+    a node (1, 2, ...) or an rdflib term. emit() adds the triples with fresh nodes, so every subject gets its own
+    subtree while the predicates and literals are shared. Without a node factory the nodes are blank nodes, with one
+    every node is created from its parent node and the predicate that links them."""
+
+    def __init__(self, triples: [tuple]):
+        self.triples = tuple(triples)
+        self.node_count = max((term for s, _, o in self.triples for term in (s, o) if isinstance(term, int)),
+                              default=0)
+        links = {}
+        for s, p, o in self.triples:
+            if isinstance(o, int) and o not in links:
+                if s >= o:
+                    raise ValueError('the nodes of a template must be numbered from the subject down')
+                links[o] = (s, p)
+        self.node_links = tuple(links[node] for node in range(1, self.node_count + 1))
+
+    def __len__(self) -> int:
+        return len(self.triples)
+
+    def emit(self, g: Graph, self_uri: URIRef, node_factory=None):
+        nodes = [self_uri]
+        if node_factory is None:
+            nodes.extend(BNode() for _ in range(self.node_count))
+        else:
+            for parent, predicate in self.node_links:
+                nodes.append(node_factory.new_node(nodes[parent], predicate))
+        for s, p, o in self.triples:
+            g.add((nodes[s], p, nodes[o] if isinstance(o, int) else o))
+
+
+# sokkels: the rows of the sokkelAfmetingen table, dimensions in mm. Used when the export is not available.
+SOKKEL_AFMETINGEN = (
+    WDBSokkelAfmeting(naam='300x300x600, LG-51/VG-51/VG-76', hoogte=600, breedte=300, diepte=300),
+    WDBSokkelAfmeting(naam='400x400x700, LG-76/VG-89', hoogte=700, breedte=400, diepte=400),
+    WDBSokkelAfmeting(naam='500x500x700, LG-89/VG-114', hoogte=700, breedte=500, diepte=500),
+    WDBSokkelAfmeting(naam='Bodemhuls Ø76', hoogte=370, breedte=110, diepte=110))
+
+
+def _mm_to_cm(mm: int):
+    return mm // 10 if mm % 10 == 0 else mm / 10
+
+
+def compile_sokkel_template(sokkel: WDBSokkelAfmeting) -> TripleTemplate:
+    """Round sokkels (a Ø in the name) get a diameter, the others a breedte and lengte. Sokkels without a grondvlak,
+    like 'Zonder sokkel in verharding', get an empty template."""
+    if not sokkel.breedte or sokkel.breedte < 0:
+        return TripleTemplate([])
+
+    if 'Ø' in sokkel.naam:
+        triples = [(SELF, otl.FUNDERINGSMASSIEF_AFMETING_GRONDVLAK, 1),
+                   (1, otl.DTU_AFMETING_GRONDVLAK_ROND, 2),
+                   (2, otl.DTC_AFMETING_DIAMETER_IN_CM_DIAMETER, 3),
+                   (3, otl.KWANT_WRD_IN_CENTIMETER_WAARDE,
+                    Literal(_mm_to_cm(sokkel.breedte), datatype=XSD.decimal))]
+    else:
+        triples = [(SELF, otl.FUNDERINGSMASSIEF_AFMETING_GRONDVLAK, 1),
+                   (1, otl.DTU_AFMETING_GRONDVLAK_RECHTHOEKIG, 2),
+                   (2, otl.DTC_AFMETING_BXL_IN_CM_BREEDTE, 3),
+                   (3, otl.KWANT_WRD_IN_CENTIMETER_WAARDE,
+                    Literal(_mm_to_cm(sokkel.breedte), datatype=XSD.decimal)),
+                   (2, otl.DTC_AFMETING_BXL_IN_CM_LENGTE, 4),
+                   (4, otl.KWANT_WRD_IN_CENTIMETER_WAARDE,
+                    Literal(_mm_to_cm(sokkel.diepte), datatype=XSD.decimal))]
+    if sokkel.hoogte is not None and sokkel.hoogte > 0:
+        hoogte_node = triples[-1][0] + 1
+        triples.extend([(SELF, otl.FUNDERINGSMASSIEF_FUNDERINGSHOOGTE, hoogte_node),
+                        (hoogte_node, otl.KWANT_WRD_IN_CENTIMETER_WAARDE,
+                         Literal(_mm_to_cm(sokkel.hoogte), datatype=XSD.decimal))])
+    return TripleTemplate(triples)
+
+
+# bord vormen
+def _pijlbord_area(breedte: int, hoogte: int) -> float:
+    h = hoogte / 1000.0
+    b = breedte / 1000.0
+    if hoogte == 200:
+        pijl = 0.172
+    elif hoogte == 300:
+        pijl = 0.25
+    elif hoogte > 400:
+        pijl = 0.428
+    else:
+        raise NotImplementedError('Onbekende hoogte voor het berekenen van de oppervlakte van een pijlbord')
+    return h * (b - pijl / 2)
+
+
+@dataclasses.dataclass(frozen=True)
+class BordVorm:
+    """vorm: the DtuAfmetingVerkeersbord field, afmetingen: the predicate for the breedte and, for vierhoekige borden,
+    the hoogte, area: the area in m² computed from the breedte and hoogte in mm. Shapes with one dimension have a
+    naam, used in the warning when breedte and hoogte differ."""
+    vorm: URIRef
+    afmetingen: tuple
+    area: Callable[[int, int], float]
+    naam: str = None
+
+
+_VIERHOEKIG_AFMETINGEN = (otl.DTC_AFMETING_BXH_IN_MM_BREEDTE, otl.DTC_AFMETING_BXH_IN_MM_HOOGTE)
+_RECHTHOEK = BordVorm(otl.DTU_AFMETING_VERKEERSBORD_VIERHOEKIG, _VIERHOEKIG_AFMETINGEN,
+                      lambda breedte, hoogte: breedte * hoogte / 1000000.0)
+_RUIT = BordVorm(otl.DTU_AFMETING_VERKEERSBORD_VIERHOEKIG, _VIERHOEKIG_AFMETINGEN,
+                 lambda breedte, hoogte: (breedte / 1000.0) ** 2 / 2, 'Ruitvormig')
+_PIJLBORD = BordVorm(otl.DTU_AFMETING_VERKEERSBORD_VIERHOEKIG, _VIERHOEKIG_AFMETINGEN, _pijlbord_area)
+_DRIEHOEK = BordVorm(otl.DTU_AFMETING_VERKEERSBORD_DRIEHOEKIG, (otl.DTC_AFMETING_ZIJDE_IN_MM_ZIJDE,),
+                     lambda breedte, hoogte: math.sqrt(3) / 4 * (breedte / 1000.0) ** 2, 'Driehoekig')
+
+BORD_VORMEN = {
+    'rh': _RECHTHOEK,
+    'rt': _RUIT,
+    'wwr': _PIJLBORD,
+    'wwl': _PIJLBORD,
+    'dh': _DRIEHOEK,
+    'odh': _DRIEHOEK,
+    'zh': BordVorm(otl.DTU_AFMETING_VERKEERSBORD_ZESHOEKIG, (otl.DTC_AFMETING_ZIJDE_IN_MM_ZIJDE,),
+                   lambda breedte, hoogte: math.sqrt(3) * 3 / 2 * (breedte / 1000.0) ** 2, 'Zeshoekig'),
+    'ah': BordVorm(otl.DTU_AFMETING_VERKEERSBORD_ACHTHOEKIG, (otl.DTC_AFMETING_ZIJDE_IN_MM_ZIJDE,),
+                   lambda breedte, hoogte: 8 * (breedte / 2000.0) ** 2 * (math.sqrt(2) - 1), 'Achthoekig'),
+    'ro': BordVorm(otl.DTU_AFMETING_VERKEERSBORD_ROND, (otl.DTC_AFMETING_DIAMETER_IN_MM_DIAMETER,),
+                   lambda breedte, hoogte: math.pi * (breedte / 2000.0) ** 2, 'Rond')}
+
+
+@lru_cache(maxsize=None)
+def get_bord_template(vorm: str, breedte: int, hoogte: int) -> TripleTemplate:
+    """Compiles the afmeting, oppervlakte and grootteorde triples of a bord once per (vorm, breedte, hoogte). The
+    warning for differing breedte and hoogte is therefore logged once per combination."""
+    bord_vorm = BORD_VORMEN.get(vorm)
+    if bord_vorm is None:
+        raise ValueError(f"bord.vorm can't be mapped: {vorm}")
+
+    triples = [(SELF, otl.DTU_AFMETING_VERKEERSBORD, 1),
+               (1, bord_vorm.vorm, 2)]
+    for node, (predicate, waarde) in enumerate(zip(bord_vorm.afmetingen, (breedte, hoogte)), start=3):
+        triples.extend([(2, predicate, node),
+                        (node, otl.KWANT_WRD_IN_MILLIMETER_WAARDE, Literal(waarde, datatype=XSD.decimal))])
+
+    if hoogte is not None:
+        if bord_vorm.naam is not None and hoogte != breedte:
+            logging.warning(f'{bord_vorm.naam} bord met verschillende breedte en hoogte')
+        area = round(bord_vorm.area(breedte, hoogte), 6)
+        opp_node = 3 + len(bord_vorm.afmetingen)
+        triples.extend([(SELF, otl.RETROREFLECTEREND_VERKEERSBORD_OPPERVLAKTE, opp_node),
+                        (opp_node, otl.KWANT_WRD_IN_VIERKANTE_METER_WAARDE, Literal(area, datatype=XSD.decimal)),
+                        (SELF, otl.RETROREFLECTEREND_VERKEERSBORD_GROOTTEORDE, otl.get_grootteorde(area))])
+    return TripleTemplate(triples)
+
+
+class DimensionTables:
+    """Holds the compiled sokkel templates, keyed on the sokkel name. Starts from SOKKEL_AFMETINGEN; the rows of the
+    sokkelAfmetingen table of an export are added with add_sokkel_afmetingen, so new sokkels need no code changes."""
+
+    def __init__(self, sokkel_afmetingen: Iterable[WDBSokkelAfmeting] = SOKKEL_AFMETINGEN):
+        self.sokkel_templates = {}
+        self.add_sokkel_afmetingen(sokkel_afmetingen)
+
+    def add_sokkel_afmetingen(self, sokkel_afmetingen: Iterable[WDBSokkelAfmeting]):
+        for sokkel in sokkel_afmetingen:
+            self.sokkel_templates[sokkel.naam] = compile_sokkel_template(sokkel)
+
+    def get_sokkel_template(self, sokkel_naam: str) -> TripleTemplate:
+        """Returns None for unknown sokkels."""
+        return self.sokkel_templates.get(sokkel_naam)
+
+    @staticmethod
+    def get_bord_template(vorm: str, breedte: int, hoogte: int) -> TripleTemplate:
+        return get_bord_template(vorm, breedte, hoogte)
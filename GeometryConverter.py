@@ -0,0 +1,79 @@
+"""Converts the Lambert72 WKT points of the WDB export to GeoSPARQL wktLiterals, a batch at a time.
+
+Reprojecting to WGS84 needs pyproj, which transforms the coordinates of a batch in one call."""
+from typing import Sequence
+
+from rdflib import Literal
+
+import OTLVocabulary as otl
+
+try:
+    import pyproj
+except ImportError:
+    pyproj = None
+
+CRS_IRIS = {
+    'lambert72': 'http://www.opengis.net/def/crs/EPSG/0/31370',
+    'wgs84': 'http://www.opengis.net/def/crs/OGC/1.3/CRS84'}
+
+
+def check_crs(crs: str):
+    """Raises when the crs is unknown or reprojecting to it needs pyproj and pyproj is not installed, so a conversion
+    fails before it starts instead of at its first batch."""
+    if crs not in CRS_IRIS:
+        raise ValueError(f'unknown crs {crs}, expected one of {", ".join(CRS_IRIS)}')
+    if crs == 'wgs84' and pyproj is None:
+        raise ImportError('reprojecting to wgs84 needs pyproj, install it with pip install pyproj')
+
+
+class GeometryConverter:
+    """crs selects the coordinate system of the literals: 'lambert72' keeps the coordinates of the export,
+    'wgs84' reprojects them (longitude, latitude) with pyproj. Only POINT geometries are converted, with their x and
+    y (a z or m ordinate is dropped); anything else, including missing geometries and points that can't be parsed,
+    gives None for that opstelling only."""
+
+    def __init__(self, crs: str = 'lambert72'):
+        check_crs(crs)
+        self.crs = crs
+        self.prefix = f'<{CRS_IRIS[crs]}> POINT ('
+        self.transformer = None
+        if crs == 'wgs84':
+            self.transformer = pyproj.Transformer.from_crs('EPSG:31370', 'EPSG:4326', always_xy=True)
+
+    @staticmethod
+    def parse_point(wkt: str) -> (float, float):
+        """The x and y of 'POINT (x y)', also of 'POINT Z (x y z)' and the like, None when wkt isn't such a point."""
+        if wkt is None or not wkt.startswith('POINT'):
+            return None
+        ordinates = wkt.partition('(')[2].partition(')')[0].split()
+        try:
+            return float(ordinates[0]), float(ordinates[1])
+        except (IndexError, ValueError):
+            return None
+
+    def transform(self, xs, ys):
+        if self.transformer is None:
+            return xs, ys
+        return self.transformer.transform(xs, ys)
+
+    def convert(self, wkts: Sequence[str]) -> ([Literal], [tuple]):
+        """Returns a wktLiteral and the (x, y) point in Lambert72 for every wkt, or None for the ones that are not a
+        point."""
+        points = [self.parse_point(wkt) for wkt in wkts]
+        literals = [None] * len(wkts)
+        indexes = [index for index, point in enumerate(points) if point is not None]
+        if not indexes:
+            return literals, points
+
+        xs = [points[index][0] for index in indexes]
+        ys = [points[index][1] for index in indexes]
+        transformed_xs, transformed_ys = self.transform(xs, ys)
+        prefix = self.prefix
+        for index, transformed_x, transformed_y in zip(indexes, transformed_xs, transformed_ys):
+            literals[index] = Literal(f'{prefix}{float(transformed_x)!r} {float(transformed_y)!r})',
+                                      datatype=otl.WKT_LITERAL)
+        return literals, points
+
+    def to_wkt_literals(self, wkts: Sequence[str]) -> [Literal]:
+        """Returns a wktLiteral for every wkt, or None for the ones that are not a point."""
+        return self.convert(wkts)[0]
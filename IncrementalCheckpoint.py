@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import OTLVocabulary as otl
+from BeheerderCache import Beheerder
+from WDBDataclasses.WDBOpstellingAggregate import WDBOpstellingAggregate
+
+# the assets the Processor creates for a record: its own assets and the relations between them, as templates on the
+# fields of the record. A relation is named after its source and target, so a relation whose target changed is new.
+RECORD_ASSETS = {
+    'opstelling': ('opstelling_{id}',),
+    'bord': ('bord_{id}', 'folie_{id}', 'verkeersteken_{id}', 'verkeersbordconcept_{id}',
+             'bord_{id}-opstelling_{opstelling_id}', 'bord_{id}-folie_{id}', 'bord_{id}-verkeersteken_{id}',
+             'verkeersteken_{id}-verkeersbordconcept_{id}'),
+    'ophanging': ('ophanging_{id}', 'fundering_{id}', 'ophanging_{id}-opstelling_{opstelling_id}',
+                  'ophanging_{id}-fundering_{id}'),
+    'beugel': ('beugel_{id}', 'beugel_{id}-ophanging_{ophanging_id}', 'beugel_{id}-bord_{bord_id}')}
+# the assets of a record in a version 1 checkpoint, which only held the records
+VERSION_1_ASSETS = {'opstelling': ('opstelling',), 'bord': ('bord', 'folie', 'verkeersteken', 'verkeersbordconcept'),
+                    'ophanging': ('ophanging', 'fundering'), 'beugel': ('beugel',)}
+
+
+class IncrementalCheckpoint:
+    """Remembers, per opstelling, a content hash of its aggregate (opstelling, borden, ophangingen, beugels and the
+    resolved beheerder) and the assets it was converted to, the relations included. On the next run only new and
+    changed aggregates are converted. The assets of opstellingen that disappeared or are marked toDelete, and the
+    assets a changed opstelling no longer has (removed records, relations to another target), end up in the delete
+    set.
+    Every run reads and hashes the complete export: deleted opstellingen can only be found by comparing all of them,
+    and wijzigingsDatum is a dd/mm/yyyy text sqlite can't filter on. The latest wijzigingsDatum that was processed is
+    stored in the checkpoint and reported, but only for information.
+    The checkpoint is only replaced by save(), so an interrupted run leaves the previous checkpoint intact."""
+
+    version = 2
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.last_wijzigings_datum = None
+        self.previous = {}
+        self.current = {}
+        self.changed = 0
+        self.unchanged = 0
+
+        if os.path.isfile(path):
+            with open(path, encoding='utf-8') as checkpoint_file:
+                data = json.load(checkpoint_file)
+            if data.get('version') == 1:
+                data = self.upgrade_version_1(data)
+            if data.get('version') != self.version:
+                raise ValueError(f'{path} is a checkpoint of version {data.get("version")}, expected {self.version}')
+            self.last_wijzigings_datum = data['last_wijzigings_datum']
+            self.previous = data['opstellingen']
+
+    @classmethod
+    def upgrade_version_1(cls, data: dict) -> dict:
+        """A version 1 checkpoint holds the records instead of the assets and hashes without the beheerder: every
+        opstelling counts as changed, so the relations it didn't record are written again."""
+        opstellingen = {}
+        for key, previous in data['opstellingen'].items():
+            assets = []
+            for record in previous['records']:
+                record_type, record_id = record.split('_', 1)
+                assets.extend(f'{asset}_{record_id}' for asset in VERSION_1_ASSETS[record_type])
+            opstellingen[key] = {'hash': None, 'assets': assets}
+        return {'version': cls.version, 'last_wijzigings_datum': data['last_wijzigings_datum'],
+                'opstellingen': opstellingen}
+
+    @staticmethod
+    def get_hash(aggregate: WDBOpstellingAggregate, beheerder: Beheerder = None) -> str:
+        content = (aggregate, None if beheerder is None else beheerder.relatie_suffix)
+        return hashlib.blake2b(repr(content).encode('utf-8'), digest_size=16).hexdigest()
+
+    @staticmethod
+    def get_assets(aggregate: WDBOpstellingAggregate, beheerder: Beheerder = None) -> [str]:
+        """The local names of the assets the aggregate is converted to (see RECORD_ASSETS)."""
+        opstelling = aggregate.opstelling
+        assets = [template.format(id=opstelling.id) for template in RECORD_ASSETS['opstelling']]
+        if beheerder is not None:
+            assets.append(f'opstelling_{opstelling.id}{beheerder.relatie_suffix}')
+        for record_type, records in (('bord', aggregate.borden), ('ophanging', aggregate.ophangingen),
+                                     ('beugel', aggregate.beugels)):
+            for record in records:
+                if record.id is not None:
+                    fields = record._asdict()
+                    assets.extend(template.format(**fields) for template in RECORD_ASSETS[record_type])
+        return assets
+
+    @staticmethod
+    def is_marked_to_delete(aggregate: WDBOpstellingAggregate) -> bool:
+        to_delete = aggregate.opstelling.to_delete
+        return to_delete is not None and str(to_delete).strip().lower() in ('1', 'yes', 'true', 'ja')
+
+    @staticmethod
+    def parse_wijzigings_datum(wijzigings_datum: str):
+        """wijzigingsDatum is exported as dd/mm/yyyy, returns the ISO date or None."""
+        if not wijzigings_datum:
+            return None
+        try:
+            return datetime.strptime(wijzigings_datum, '%d/%m/%Y').date().isoformat()
+        except ValueError:
+            return None
+
+    def register(self, aggregate: WDBOpstellingAggregate, beheerder: Beheerder = None) -> bool:
+        """Records the aggregate, with the beheerder it resolves to, in the new checkpoint and returns whether it has
+        to be converted."""
+        if self.is_marked_to_delete(aggregate):
+            return False
+
+        wijzigings_datum = self.parse_wijzigings_datum(aggregate.opstelling.wijzigings_datum)
+        if wijzigings_datum is not None and (self.last_wijzigings_datum is None or
+                                             wijzigings_datum > self.last_wijzigings_datum):
+            self.last_wijzigings_datum = wijzigings_datum
+
+        key = str(aggregate.opstelling.id)
+        content_hash = self.get_hash(aggregate, beheerder)
+        self.current[key] = {'hash': content_hash, 'assets': self.get_assets(aggregate, beheerder)}
+
+        previous = self.previous.get(key)
+        if previous is not None and previous['hash'] == content_hash:
+            self.unchanged += 1
+            return False
+        self.changed += 1
+        return True
+
+    def reject(self, aggregate: WDBOpstellingAggregate):
+        """Undoes the registration of an aggregate that couldn't be converted: its previous state is kept, so it is
+        converted again by the next run and its assets don't end up in the delete set."""
+        key = str(aggregate.opstelling.id)
+        previous = self.previous.get(key)
+        if previous is None:
+            self.current.pop(key, None)
+        else:
+            self.current[key] = previous
+        self.changed -= 1
+
+    def get_deleted_assets(self) -> [str]:
+        """The assets of the previous checkpoint that are missing from the current run. An asset that moved to
+        another opstelling isn't deleted."""
+        current_assets = {asset for current in self.current.values() for asset in current['assets']}
+        return [asset for previous in self.previous.values() for asset in previous['assets']
+                if asset not in current_assets]
+
+    def write_delete_set(self, file_name: str) -> int:
+        """Writes the IRIs of the deleted assets, one per line, and returns how many were written. No file is written
+        when nothing was deleted."""
+        uris = [f'{otl.ASSET}{asset}' for asset in self.get_deleted_assets()]
+        if uris:
+            with open(file_name, 'w', encoding='utf-8') as delete_file:
+                delete_file.writelines(f'{uri}\n' for uri in uris)
+        return len(uris)
+
+    def save(self):
+        temp_path = Path(f'{self.path}.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as checkpoint_file:
+            json.dump({'version': self.version, 'last_wijzigings_datum': self.last_wijzigings_datum,
+                       'opstellingen': self.current}, checkpoint_file)
+        os.replace(temp_path, self.path)
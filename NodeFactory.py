@@ -0,0 +1,38 @@
+from functools import lru_cache
+
+from rdflib import BNode, URIRef
+
+import OTLVocabulary as otl
+
+SKOLEM = 'https://data.awvvlaanderen.be/.well-known/genid/'
+
+
+@lru_cache(maxsize=1024)
+def get_local_name(predicate: URIRef) -> str:
+    return predicate[max(predicate.rfind('#'), predicate.rfind('/')) + 1:]
+
+
+class BlankNodeFactory:
+    """Creates the nodes of the complex attributes (afmetingen, kwantitatieve waarden, identificatoren, ...) as fresh
+    blank nodes."""
+
+    @staticmethod
+    def new_node(subject, predicate: URIRef, key=None) -> BNode:
+        return BNode()
+
+
+class SkolemNodeFactory:
+    """Creates the nodes of the complex attributes as stable skolem IRIs, derived from the asset and the path of
+    predicates leading to the node: the breedte of the afmeting of bord_1 becomes
+    .well-known/genid/bord_1/DtuAfmetingVerkeersbord/DtuAfmetingVerkeersbord.vierhoekig/DtcAfmetingBxhInMm.breedte
+    A predicate that is used more than once per subject needs a key to tell the nodes apart, e.g. the id of the record
+    the node is created for, which is added to the path."""
+
+    @staticmethod
+    def new_node(subject, predicate: URIRef, key=None) -> URIRef:
+        path = get_local_name(predicate) if key is None else f'{get_local_name(predicate)}/{key}'
+        if subject.startswith(SKOLEM):
+            return URIRef(f'{subject}/{path}')
+        if subject.startswith(otl.ASSET):
+            return URIRef(f'{SKOLEM}{subject[len(otl.ASSET):]}/{path}')
+        raise ValueError(f"can't create a skolem IRI for a node of {subject}")
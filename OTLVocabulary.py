@@ -0,0 +1,154 @@
+"""The OTL classes, predicates and concepts used by the Processor, created once at import as shared URIRef
+singletons, together with the lookup tables for the enumerations."""
+import math
+
+from rdflib import Namespace, Literal
+
+ASSET = 'https://data.awvvlaanderen.be/id/asset/'
+MERK = 'https://wegenenverkeer.data.vlaanderen.be/id/conceptscheme/KlRetroreflecterendVerkeersbordMerk/'
+WEGCODE = 'https://www.wegcode.be'
+AGENT = 'https://data.awvvlaanderen.be/id/agent/'
+
+ABSTRACTEN = Namespace('https://wegenenverkeer.data.vlaanderen.be/ns/abstracten#')
+GEO = Namespace('http://www.opengis.net/ont/geosparql#')
+CONCEPT = Namespace('https://wegenenverkeer.data.vlaanderen.be/id/concept/')
+IMPLEMENTATIEELEMENT = Namespace('https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#')
+INSTALLATIE = Namespace('https://wegenenverkeer.data.vlaanderen.be/ns/installatie#')
+ONDERDEEL = Namespace('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#')
+PURL = Namespace('http://purl.org/dc/terms/')
+SIGNALISATIE = Namespace('https://wegenenverkeer.data.vlaanderen.be/doc/implementatiemodel/signalisatie/#')
+
+# abstracten
+VERKEERSBORD_AANZICHT = ABSTRACTEN['Verkeersbord.aanzicht']
+VERKEERSBORD_FABRICAGEVOORSCHRIFT = ABSTRACTEN['Verkeersbord.fabricagevoorschrift']
+VERKEERSBORD_OPSTELHOOGTE = ABSTRACTEN['Verkeersbord.opstelhoogte']
+VERKEERSTEKEN_VARIABEL_OPSCHRIFT = ABSTRACTEN['Verkeersteken.variabelOpschrift']
+
+# geosparql
+GEO_AS_WKT = GEO['asWKT']
+GEO_HAS_GEOMETRY = GEO['hasGeometry']
+WKT_LITERAL = GEO['wktLiteral']
+
+# implementatieelement
+AIMOBJECT_ASSET_ID = IMPLEMENTATIEELEMENT['AIMObject.assetId']
+AIMOBJECT_BIJLAGE = IMPLEMENTATIEELEMENT['AIMObject.bijlage']
+DTC_AFMETING_BXH_IN_MM_BREEDTE = IMPLEMENTATIEELEMENT['DtcAfmetingBxhInMm.breedte']
+DTC_AFMETING_BXH_IN_MM_HOOGTE = IMPLEMENTATIEELEMENT['DtcAfmetingBxhInMm.hoogte']
+DTC_AFMETING_BXL_IN_CM_BREEDTE = IMPLEMENTATIEELEMENT['DtcAfmetingBxlInCm.breedte']
+DTC_AFMETING_BXL_IN_CM_LENGTE = IMPLEMENTATIEELEMENT['DtcAfmetingBxlInCm.lengte']
+DTC_AFMETING_DIAMETER_IN_CM_DIAMETER = IMPLEMENTATIEELEMENT['DtcAfmetingDiameterInCm.diameter']
+DTC_AFMETING_DIAMETER_IN_MM_DIAMETER = IMPLEMENTATIEELEMENT['DtcAfmetingDiameterInMm.diameter']
+DTC_AFMETING_ZIJDE_IN_MM_ZIJDE = IMPLEMENTATIEELEMENT['DtcAfmetingZijdeInMm.zijde']
+DTC_DOCUMENT_BESTANDSNAAM = IMPLEMENTATIEELEMENT['DtcDocument.bestandsnaam']
+DTC_DOCUMENT_MIME_TYPE = IMPLEMENTATIEELEMENT['DtcDocument.mimeType']
+DTC_DOCUMENT_OMSCHRIJVING = IMPLEMENTATIEELEMENT['DtcDocument.omschrijving']
+DTC_DOCUMENT_URI = IMPLEMENTATIEELEMENT['DtcDocument.uri']
+DTC_IDENTIFICATOR_IDENTIFICATOR = IMPLEMENTATIEELEMENT['DtcIdentificator.identificator']
+KWANT_WRD_IN_CENTIMETER_WAARDE = IMPLEMENTATIEELEMENT['KwantWrdInCentimeter.waarde']
+KWANT_WRD_IN_DECIMALE_GRADEN_WAARDE = IMPLEMENTATIEELEMENT['KwantWrdInDecimaleGraden.waarde']
+KWANT_WRD_IN_METER_WAARDE = IMPLEMENTATIEELEMENT['KwantWrdInMeter.waarde']
+KWANT_WRD_IN_MILLIMETER_WAARDE = IMPLEMENTATIEELEMENT['KwantWrdInMillimeter.waarde']
+KWANT_WRD_IN_VIERKANTE_METER_WAARDE = IMPLEMENTATIEELEMENT['KwantWrdInVierkanteMeter.waarde']
+RELATIE_OBJECT_BRON = IMPLEMENTATIEELEMENT['RelatieObject.bron']
+RELATIE_OBJECT_DOEL = IMPLEMENTATIEELEMENT['RelatieObject.doel']
+
+# installatie
+VERKEERSBORD_CONCEPT = INSTALLATIE['VerkeersbordConcept']
+VERKEERSBORD_CONCEPT_AFBEELDING = INSTALLATIE['VerkeersbordConcept.afbeelding']
+VERKEERSBORD_CONCEPT_BETEKENIS = INSTALLATIE['VerkeersbordConcept.betekenis']
+VERKEERSBORD_CONCEPT_VERKEERSBORD_CODE = INSTALLATIE['VerkeersbordConcept.verkeersbordCode']
+VERKEERSBORD_VERKEERSTEKEN = INSTALLATIE['VerkeersbordVerkeersteken']
+VERKEERSBORDOPSTELLING_POSITIE_TOV_RIJWEG = INSTALLATIE['Verkeersbordopstelling.positieTovRijweg']
+VERKEERSBORDOPSTELLING_WEG_SEGMENT = INSTALLATIE['Verkeersbordopstelling.wegSegment']
+
+# onderdeel
+BEVESTIGING = ONDERDEEL['Bevestiging']
+BEVESTIGINGSBEUGEL = ONDERDEEL['Bevestigingsbeugel']
+CALAMITEITS_BORD = ONDERDEEL['CalamiteitsBord']
+DTC_EXTERNE_REFERENTIE_EXTERN_REFERENTIENUMMER = ONDERDEEL['DtcExterneReferentie.externReferentienummer']
+DTC_EXTERNE_REFERENTIE_EXTERNE_PARTIJ = ONDERDEEL['DtcExterneReferentie.externePartij']
+DTU_AFMETING_GRONDVLAK_RECHTHOEKIG = ONDERDEEL['DtuAfmetingGrondvlak.rechthoekig']
+DTU_AFMETING_GRONDVLAK_ROND = ONDERDEEL['DtuAfmetingGrondvlak.rond']
+DTU_AFMETING_VERKEERSBORD = ONDERDEEL['DtuAfmetingVerkeersbord']
+DTU_AFMETING_VERKEERSBORD_ACHTHOEKIG = ONDERDEEL['DtuAfmetingVerkeersbord.achthoekig']
+DTU_AFMETING_VERKEERSBORD_DRIEHOEKIG = ONDERDEEL['DtuAfmetingVerkeersbord.driehoekig']
+DTU_AFMETING_VERKEERSBORD_ROND = ONDERDEEL['DtuAfmetingVerkeersbord.rond']
+DTU_AFMETING_VERKEERSBORD_VIERHOEKIG = ONDERDEEL['DtuAfmetingVerkeersbord.vierhoekig']
+DTU_AFMETING_VERKEERSBORD_ZESHOEKIG = ONDERDEEL['DtuAfmetingVerkeersbord.zeshoekig']
+FUNDERINGSMASSIEF = ONDERDEEL['Funderingsmassief']
+FUNDERINGSMASSIEF_AFMETING_GRONDVLAK = ONDERDEEL['Funderingsmassief.afmetingGrondvlak']
+FUNDERINGSMASSIEF_FUNDERINGSHOOGTE = ONDERDEEL['Funderingsmassief.funderingshoogte']
+HEEFT_BETROKKENE = ONDERDEEL['HeeftBetrokkene']
+HEEFT_BETROKKENE_ROL = ONDERDEEL['HeeftBetrokkene.rol']
+HOORT_BIJ = ONDERDEEL['HoortBij']
+ONDERBORD = ONDERDEEL['Onderbord']
+RETROREFLECTEREND_VERKEERSBORD = ONDERDEEL['RetroreflecterendVerkeersbord']
+RETROREFLECTEREND_VERKEERSBORD_GROOTTEORDE = ONDERDEEL['RetroreflecterendVerkeersbord.grootteorde']
+RETROREFLECTEREND_VERKEERSBORD_MERK = ONDERDEEL['RetroreflecterendVerkeersbord.merk']
+RETROREFLECTEREND_VERKEERSBORD_OPPERVLAKTE = ONDERDEEL['RetroreflecterendVerkeersbord.oppervlakte']
+RETROREFLECTERENDE_FOLIE = ONDERDEEL['RetroreflecterendeFolie']
+RETROREFLECTERENDE_FOLIE_FOLIETYPE = ONDERDEEL['RetroreflecterendeFolie.folietype']
+VERKEERSBORDSTEUN = ONDERDEEL['Verkeersbordsteun']
+VERKEERSBORDSTEUN_DIAMETER = ONDERDEEL['Verkeersbordsteun.diameter']
+VERKEERSBORDSTEUN_LENGTE = ONDERDEEL['Verkeersbordsteun.lengte']
+VERKEERSBORDSTEUN_TYPE = ONDERDEEL['Verkeersbordsteun.type']
+
+# purl
+PURL_AGENT = PURL['Agent']
+PURL_AGENT_NAAM = PURL['Agent.naam']
+
+# signalisatie
+VERKEERSBORDOPSTELLING = SIGNALISATIE['Verkeersbordopstelling']
+
+# concepts
+KL_ALG_MIME_TYPE_IMAGE_PNG = CONCEPT['KlAlgMimeType/image-png']
+KL_BETROKKENHEID_ROL_BEHEERDER = CONCEPT['KlBetrokkenheidRol/beheerder']
+KL_FOLIE_TYPE_1 = CONCEPT['KlFolieType/folietype-1']
+KL_FOLIE_TYPE_2 = CONCEPT['KlFolieType/folietype-2']
+KL_FOLIE_TYPE_3A = CONCEPT['KlFolieType/folietype-3a']
+KL_FOLIE_TYPE_3A_EN_3B = CONCEPT['KlFolieType/folietype-3a-en-3b']
+KL_FOLIE_TYPE_3B = CONCEPT['KlFolieType/folietype-3b']
+KL_POSITIE_SOORT_LINKERRAND = CONCEPT['KlPositieSoort/linkerrand']
+KL_POSITIE_SOORT_MIDDEN = CONCEPT['KlPositieSoort/midden']
+KL_POSITIE_SOORT_RECHTERRAND = CONCEPT['KlPositieSoort/rechterrand']
+KL_GROOTTEORDE_GROOT = CONCEPT['KlRetroreflecterendVerkeersbordGrootteorde/groot']
+KL_GROOTTEORDE_KLEIN = CONCEPT['KlRetroreflecterendVerkeersbordGrootteorde/klein']
+KL_GROOTTEORDE_MIDDELGROOT = CONCEPT['KlRetroreflecterendVerkeersbordGrootteorde/middelgroot']
+KL_VERKEERSBORDSTEUN_TYPE_RECHTE_PAAL = CONCEPT['KlVerkeersbordsteunType/rechte-paal']
+
+# literals
+WEGENREGISTER = Literal('WegenRegister')
+
+# enumerations, None means the value is known but not mapped
+POSITIE_TOV_RIJWEG = {
+    'LINKS': KL_POSITIE_SOORT_LINKERRAND,
+    'RECHTS': KL_POSITIE_SOORT_RECHTERRAND,
+    'MIDDEN': KL_POSITIE_SOORT_MIDDEN,
+    'BOVEN': None}
+
+FOLIE_TYPES = {
+    '3.a': KL_FOLIE_TYPE_3A,
+    '3.b': KL_FOLIE_TYPE_3B,
+    '3': KL_FOLIE_TYPE_3A_EN_3B,
+    '1': KL_FOLIE_TYPE_1,
+    '2': KL_FOLIE_TYPE_2,
+    'Onbekend': None,
+    '': None,
+    'nvt': None,
+    None: None}
+
+# (maximum area in m², grootteorde)
+GROOTTEORDES = (
+    (1, KL_GROOTTEORDE_KLEIN),
+    (2, KL_GROOTTEORDE_MIDDELGROOT),
+    (math.inf, KL_GROOTTEORDE_GROOT))
+
+# (part of the ophanging client_id, class, steun type)
+STEUN_TYPES = (
+    ('steun', VERKEERSBORDSTEUN, KL_VERKEERSBORDSTEUN_TYPE_RECHTE_PAAL),)
+
+
+def get_grootteorde(area: float):
+    for maximum_area, grootteorde in GROOTTEORDES:
+        if area <= maximum_area:
+            return grootteorde
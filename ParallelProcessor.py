@@ -0,0 +1,88 @@
+import dataclasses
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from ProcessingMetrics import ProcessingMetrics
+from Processor import Processor
+from ProcessorConfig import ProcessorConfig
+from Quarantine import Quarantine
+from SQLDbReader import SQLDbReader
+from SQLiteQueryExecutor import SQLiteQueryExecutor
+
+
+@dataclasses.dataclass
+class ShardResult:
+    shard: int = -1
+    min_id: int = -1
+    max_id: int = -1
+    triples: int = 0
+    files: [str] = dataclasses.field(default_factory=list)
+    bord_register_not_found: set = dataclasses.field(default_factory=set)
+    rejects: Counter = dataclasses.field(default_factory=Counter)
+    metrics: ProcessingMetrics = None
+
+
+def convert_shard(db_path: Path, bord_register: Path, shard: int, id_range: (int, int), batch_size: int,
+                  write_size: int, config: ProcessorConfig) -> ShardResult:
+    """Converts one shard in the current process, with its own reader, executor and graph. The output files are
+    named <output_prefix>_<shard>_<N>.ttl so the shards keep the id order of the opstellingen, the rejects of the
+    quarantine <output_prefix>_<shard>_rejects.jsonl."""
+    metrics = ProcessingMetrics()
+    with SQLDbReader(db_path, metrics=metrics) as sql_db_reader:
+        processor = Processor(SQLiteQueryExecutor(sql_db_reader, opstelling_id_range=id_range),
+                              bord_register=bord_register, metrics=metrics,
+                              config=dataclasses.replace(config, output_prefix=f'{config.output_prefix}_{shard}'))
+        processor.convert(batch_size=batch_size, write_size=write_size, joined=True)
+    return ShardResult(shard=shard, min_id=id_range[0], max_id=id_range[1], triples=processor.triples_written,
+                       files=processor.written_files, bord_register_not_found=processor.bord_register_not_found,
+                       rejects=Counter() if processor.quarantine is None else processor.quarantine.counts,
+                       metrics=metrics)
+
+
+class ParallelProcessor:
+    """Splits the opstelling id range in shards and converts every shard in a worker process."""
+
+    def __init__(self, db_path: Path, bord_register: Path = None, workers: int = None,
+                 config: ProcessorConfig = None):
+        """The shards are converted with config, whose output_prefix gets the shard number."""
+        self.db_path = db_path
+        self.config = ProcessorConfig() if config is None else config
+        self.config.check_mode('parallel')
+        self.metrics = ProcessingMetrics()
+        self.bord_register = bord_register
+        self.workers = workers if workers is not None else os.cpu_count()
+        self.bord_register_not_found = set()
+
+    def get_shards(self, shard_count: int) -> [(int, int)]:
+        with SQLDbReader(self.db_path) as sql_db_reader:
+            return SQLiteQueryExecutor(sql_db_reader).get_opstelling_id_ranges(shard_count)
+
+    def process(self, batch_size: int = 100, write_size: int = 12500, shard_count: int = None) -> [ShardResult]:
+        if shard_count is None:
+            shard_count = self.workers
+        shards = self.get_shards(shard_count)
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(convert_shard, self.db_path, self.bord_register, shard, id_range, batch_size,
+                                   write_size, self.config)
+                       for shard, id_range in enumerate(shards)]
+            results = [future.result() for future in futures]
+
+        for result in results:
+            self.bord_register_not_found.update(result.bord_register_not_found)
+            print(f'shard {result.shard} (opstelling {result.min_id} - {result.max_id}): {result.triples} triples '
+                  f'in {len(result.files)} file(s)')
+        print(f'{sum(result.triples for result in results)} triples in {len(results)} shards')
+        Processor.report_register_not_found(self.bord_register_not_found)
+        Quarantine.report(sum((result.rejects for result in results), Counter()),
+                          f'{self.config.output_prefix}_<shard>_rejects.jsonl')
+
+        self.metrics.finish()
+        for result in results:
+            self.metrics.merge(result.metrics)
+        self.metrics.log()
+        if self.config.metrics_path is not None:
+            self.metrics.write_json(self.config.metrics_path)
+        return results
@@ -0,0 +1,153 @@
+import queue
+import threading
+from pathlib import Path
+
+from ProcessingMetrics import ProcessingMetrics
+from Processor import Processor
+from ProcessorConfig import ProcessorConfig
+from SQLiteQueryExecutor import SQLiteQueryExecutor
+from TripleSink import TripleList
+
+_DONE = object()
+_NEXT_FILE = object()
+
+
+class PipelinedProcessor(Processor):
+    """Converts the opstellingen in three stages that run at the same time, connected by bounded queues:
+    - extraction (a thread): reads the opstelling aggregates with the joined extraction, in batches of batch_size
+    - conversion (the calling thread): builds the triples of a batch into a chunk
+    - writing (a thread): adds the chunks to the sink of the current file and closes (serializes) the finished files
+    The queues hold at most queue_size batches and chunks, a stage that gets ahead waits for the next one, so memory
+    stays bounded. The sqlite reads and file writes overlap with the conversion; the 'extract wait' and 'write wait'
+    stages measure how long the conversion waited for the extraction and the writer, showing the slowest stage.
+    The files are the same as those of Processor with joined=True."""
+
+    mode = 'pipelined'
+
+    def __init__(self, executor: SQLiteQueryExecutor = None, bord_register: Path = None,
+                 config: ProcessorConfig = None, metrics: ProcessingMetrics = None, queue_size: int = 4):
+        super().__init__(executor=executor, bord_register=bord_register, config=config, metrics=metrics)
+        if queue_size < 1:
+            raise ValueError('queue_size must be at least 1')
+        self.queue_size = queue_size
+        self._stop = threading.Event()
+        self._errors = []
+
+    def _put(self, target: queue.Queue, item) -> bool:
+        """Waits for room in the queue, returns False when the pipeline is stopped."""
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue):
+        """Waits for the next item, returns _DONE when the pipeline is stopped."""
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _fail(self, error: BaseException):
+        self._errors.append(error)
+        self._stop.set()
+
+    def extract(self, batches: queue.Queue, batch_size: int):
+        try:
+            aggregates = self.metrics.timed_iter('extract', self.executor.get_all_opstelling_aggregates())
+            if self.checkpoint is not None:
+                aggregates = filter(self.register_change, aggregates)
+            for batch in self.batched(aggregates, batch_size):
+                if not self._put(batches, batch):
+                    return
+            self._put(batches, _DONE)
+        except BaseException as error:
+            self._fail(error)
+
+    def write(self, chunks: queue.Queue):
+        """Adds the chunks to the sinks. The per file state of the conversion (file_agents) belongs to the
+        conversion thread, so the files are closed and created without write_and_create_graph."""
+        try:
+            sink = self.create_graph()
+            while True:
+                chunk = self._get(chunks)
+                if chunk is _DONE:
+                    break
+                if chunk is _NEXT_FILE:
+                    self.write_graph(sink)
+                    sink = self.create_graph()
+                    continue
+                with self.metrics.measure('write'):
+                    add = sink.add
+                    for triple in chunk:
+                        add(triple)
+            if not self._stop.is_set():
+                self.write_graph(sink)
+        except BaseException as error:
+            self._fail(error)
+
+    def convert(self, batch_size: int = 100, write_size: int = 12500, joined: bool = True):
+        """Converts all opstellingen with the joined extraction, joined is not used."""
+        self._stop.clear()
+        self._errors = []
+        self.file_agents = set()
+        if self.quarantine is not None:
+            self.quarantine.start()
+        for stage in ('extract', 'sqlite fetch', 'extract wait', 'geometry', 'convert', 'write wait', 'write'):
+            # created up front, so the threads only update their own stages
+            self.metrics.get_stage(stage)
+        batches = queue.Queue(maxsize=self.queue_size)
+        chunks = queue.Queue(maxsize=self.queue_size)
+        extractor = threading.Thread(target=self.extract, args=(batches, batch_size), name='extract', daemon=True)
+        writer = threading.Thread(target=self.write, args=(chunks,), name='write', daemon=True)
+        extractor.start()
+        writer.start()
+
+        try:
+            write_count = 0
+            while True:
+                with self.metrics.measure('extract wait'):
+                    batch = self._get(batches)
+                if batch is _DONE:
+                    break
+                geometries = self.get_geometries([aggregate.opstelling for aggregate in batch])
+                chunk = TripleList()
+                for aggregate, geometry in zip(batch, geometries):
+                    with self.metrics.measure('convert', items=1):
+                        if self.quarantine is None:
+                            self.process_aggregate(chunk, aggregate, geometry)
+                        else:
+                            # roll back the triples of a rejected aggregate from the chunk
+                            start = len(chunk)
+                            if not self.try_process_aggregate(chunk, aggregate, geometry):
+                                del chunk[start:]
+
+                    # the files are split where Processor.convert splits them
+                    if write_count > 0 and write_count % write_size == 0:
+                        with self.metrics.measure('write wait'):
+                            if not (self._put(chunks, chunk) and self._put(chunks, _NEXT_FILE)):
+                                break
+                        chunk = TripleList()
+                        self.file_agents = set()
+                    write_count += 1
+                with self.metrics.measure('write wait'):
+                    self._put(chunks, chunk)
+            self._put(chunks, _DONE)
+        except BaseException as error:
+            self._fail(error)
+        finally:
+            extractor.join()
+            writer.join()
+        if self._errors:
+            raise self._errors[0]
+
+        self.metrics.add_triples('convert', self.triples_written)
+        self.write_checksums()
+        self.save_checkpoint()
+        if self.quarantine is not None:
+            self.quarantine.close()
+        self.metrics.finish()
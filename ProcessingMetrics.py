@@ -0,0 +1,167 @@
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+class StageMetrics:
+    """Wall and CPU time, processed items and triples of one stage. Every measurement is also counted in a latency
+    histogram with power of two buckets in milliseconds: bucket '<= 1 ms', '<= 2 ms', '<= 4 ms', ...
+    Stages that write files also count the bytes written and the bytes before compression (raw_bytes)."""
+
+    def __init__(self):
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.calls = 0
+        self.items = 0
+        self.triples = 0
+        self.bytes = 0
+        self.raw_bytes = 0
+        self.histogram = {}
+
+    def add(self, wall_time: float, cpu_time: float, items: int = 0):
+        self.wall_time += wall_time
+        self.cpu_time += cpu_time
+        self.calls += 1
+        self.items += items
+        bucket = 1
+        milliseconds = wall_time * 1000.0
+        while bucket < milliseconds:
+            bucket *= 2
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+    def merge(self, other: 'StageMetrics'):
+        self.wall_time += other.wall_time
+        self.cpu_time += other.cpu_time
+        self.calls += other.calls
+        self.items += other.items
+        self.triples += other.triples
+        self.bytes += other.bytes
+        self.raw_bytes += other.raw_bytes
+        for bucket, count in other.histogram.items():
+            self.histogram[bucket] = self.histogram.get(bucket, 0) + count
+
+    def to_dict(self) -> dict:
+        summary = {'wall_time': round(self.wall_time, 6),
+                   'cpu_time': round(self.cpu_time, 6),
+                   'calls': self.calls,
+                   'items': self.items,
+                   'items_per_second': round(self.items / self.wall_time, 1) if self.wall_time > 0 else None,
+                   'triples': self.triples,
+                   'triples_per_second': round(self.triples / self.wall_time, 1) if self.wall_time > 0 else None,
+                   'latency_histogram_ms': {f'<= {bucket}': self.histogram[bucket]
+                                            for bucket in sorted(self.histogram)}}
+        if self.bytes:
+            summary.update({'bytes': self.bytes,
+                            'raw_bytes': self.raw_bytes,
+                            'bytes_per_second': round(self.bytes / self.wall_time, 1) if self.wall_time > 0 else None,
+                            'bytes_per_triple': round(self.bytes / self.triples, 2) if self.triples else None,
+                            'compression_ratio': round(self.raw_bytes / self.bytes, 3)})
+        return summary
+
+
+class ProcessingMetrics:
+    """Collects per stage timings of a conversion. Stages are measured with measure() around a block of code or
+    timed_iter() around an iterator, in which case the time spent producing every item is measured. Stages may be
+    nested, e.g. 'sqlite fetch' is part of 'extract'. The summary is logged with log() and can be written to a JSON
+    file with write_json()."""
+
+    def __init__(self):
+        self.stages = {}
+        self.peak_rss_kb = 0
+        self._started = time.perf_counter()
+        self.total_wall_time = 0.0
+
+    def get_stage(self, stage: str) -> StageMetrics:
+        stage_metrics = self.stages.get(stage)
+        if stage_metrics is None:
+            stage_metrics = StageMetrics()
+            self.stages[stage] = stage_metrics
+        return stage_metrics
+
+    @contextmanager
+    def measure(self, stage: str, items: int = 0):
+        stage_metrics = self.get_stage(stage)
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield stage_metrics
+        finally:
+            stage_metrics.add(time.perf_counter() - wall_start, time.process_time() - cpu_start, items)
+
+    def timed_iter(self, stage: str, iterable: Iterable) -> Iterator:
+        stage_metrics = self.get_stage(stage)
+        iterator = iter(iterable)
+        while True:
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                stage_metrics.add(time.perf_counter() - wall_start, time.process_time() - cpu_start)
+                return
+            stage_metrics.add(time.perf_counter() - wall_start, time.process_time() - cpu_start, 1)
+            yield item
+
+    def add_triples(self, stage: str, triples: int):
+        self.get_stage(stage).triples += triples
+
+    @staticmethod
+    def get_peak_rss_kb() -> int:
+        """Peak resident set size of this process in KiB, 0 when it can't be determined."""
+        if resource is None:
+            return 0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS reports bytes, Linux KiB
+        return peak // 1024 if sys.platform == 'darwin' else peak
+
+    @classmethod
+    def get_rss_kb(cls) -> int:
+        """Current resident set size of this process in KiB. Read from /proc on Linux, elsewhere the peak RSS is the
+        closest approximation."""
+        try:
+            with open('/proc/self/statm', encoding='ascii') as statm:
+                return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+        except (OSError, ValueError, AttributeError):
+            return cls.get_peak_rss_kb()
+
+    def finish(self):
+        self.total_wall_time = time.perf_counter() - self._started
+        self.peak_rss_kb = max(self.peak_rss_kb, self.get_peak_rss_kb())
+
+    def merge(self, other: 'ProcessingMetrics'):
+        """Adds the stages of another (finished) run, e.g. of a shard converted in a worker process. Times are
+        summed, so they are CPU-seconds of all workers together; the peak RSS is the largest of the processes."""
+        for stage, stage_metrics in other.stages.items():
+            self.get_stage(stage).merge(stage_metrics)
+        self.peak_rss_kb = max(self.peak_rss_kb, other.peak_rss_kb)
+
+    def to_dict(self) -> dict:
+        return {'total_wall_time': round(self.total_wall_time, 6),
+                'peak_rss_kb': self.peak_rss_kb,
+                'stages': {stage: stage_metrics.to_dict() for stage, stage_metrics in self.stages.items()}}
+
+    def log(self, level: int = logging.INFO):
+        logging.log(level, f'total wall time {self.total_wall_time:.3f} s, peak RSS {self.peak_rss_kb} KiB')
+        for stage, stage_metrics in self.stages.items():
+            summary = stage_metrics.to_dict()
+            message = (f'{stage}: wall {summary["wall_time"]:.3f} s, cpu {summary["cpu_time"]:.3f} s, '
+                       f'{summary["items"]} items')
+            if summary['items_per_second'] is not None and summary['items']:
+                message += f' ({summary["items_per_second"]}/s)'
+            if summary['triples']:
+                message += f', {summary["triples"]} triples ({summary["triples_per_second"]}/s)'
+            if summary.get('bytes'):
+                message += (f', {summary["bytes"]} bytes ({summary["bytes_per_second"]} B/s, '
+                            f'compression ratio {summary["compression_ratio"]})')
+            logging.log(level, message)
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as metrics_file:
+            json.dump(self.to_dict(), metrics_file, indent=2)
@@ -1,119 +1,397 @@
-import csv
-import logging
+import itertools
 import math
+import time
 from pathlib import Path
+from typing import Iterable, Iterator
 
-from rdflib import Graph, URIRef, RDF, Namespace, Literal, BNode, XSD
+from rdflib import Graph, URIRef, RDF, Literal, XSD
 
+from BeheerderCache import Beheerder, BeheerderCache
+from BordCodeIndex import BordCodeIndex
+from CompiledRegister import load_register
 from SQLiteQueryExecutor import SQLiteQueryExecutor
+from ConversionJournal import ConversionJournal
+from TripleSink import TripleList, TripleSink, create_sink, get_file_checksum
+import OTLVocabulary as otl
+from DimensionTables import DimensionTables
+from GeometryConverter import GeometryConverter
+from IncrementalCheckpoint import IncrementalCheckpoint
+from NodeFactory import BlankNodeFactory, SkolemNodeFactory
+from ProcessingMetrics import ProcessingMetrics
+from ProcessorConfig import ProcessorConfig
+from Quarantine import Quarantine
+from ReferenceDataCache import ReferenceDataCache
+from WDBDataclasses.WDBBeugel import WDBBeugel
 from WDBDataclasses.WDBBord import WDBBord
+from WDBDataclasses.WDBOphanging import WDBOphanging
 from WDBDataclasses.WDBOpstelling import WDBOpstelling
+from WDBDataclasses.WDBOpstellingAggregate import WDBOpstellingAggregate
 
 
 class Processor:
-    def __init__(self, executor: SQLiteQueryExecutor = None, bord_register: Path = None):
+    # the conversion mode of ProcessorConfig.check_mode
+    mode = 'sequential'
+
+    def __init__(self, executor: SQLiteQueryExecutor = None, bord_register: Path = None,
+                 config: ProcessorConfig = None, metrics: ProcessingMetrics = None):
+        """config holds the options of the conversion (see ProcessorConfig), the stages of the conversion are timed in
+        metrics (pass the same object to the SQLDbReader to include the sqlite reads)."""
+        self.config = ProcessorConfig() if config is None else config
+        self.config.check_mode(self.mode)
         self.executor = executor
+        self.metrics = ProcessingMetrics() if metrics is None else metrics
+        self.geometry_converter = GeometryConverter(self.config.geometry_crs)
+        self.checkpoint = None if self.config.checkpoint_path is None else IncrementalCheckpoint(
+            self.config.checkpoint_path)
+        self.output_prefix = self.config.output_prefix
+        self.quarantine = Quarantine(Path(f'{self.output_prefix}_rejects.jsonl')) if self.config.quarantine else None
+        self.flush_policy = self.config.create_flush_policy()
+        self.node_factory = SkolemNodeFactory() if self.config.deterministic else BlankNodeFactory()
+        self.checksums = {}
         self.graph_counter = 0
-        self.bord_register = {}
+        self.triples_written = 0
+        self.written_files = []
+        self.bord_code_index = BordCodeIndex()
         if bord_register is not None:
             self.add_borden_register(bord_register)
         self.bord_register_not_found = set()
+        self.merk_uris = {}
+        self.dimension_tables = DimensionTables()
+        self.beheerders = BeheerderCache()
+        # the agents whose triples are in the current file
+        self.file_agents = set()
+        if executor is not None:
+            self.merk_uris.update(executor.reference_data.merk_uris)
+            self.dimension_tables.add_sokkel_afmetingen(executor.reference_data.sokkel_afmetingen.values())
+            self.beheerders = executor.reference_data.beheerders
+        if self.beheerders.precedence != self.config.beheerder_precedence:
+            self.beheerders = self.beheerders.with_precedence(self.config.beheerder_precedence)
+
+    def process(self, batch_size: int = 100, write_size: int = 12500, joined: bool = False):
+        self.convert(batch_size=batch_size, write_size=write_size, joined=joined)
+        self.report_register_not_found(self.bord_register_not_found)
+        if self.quarantine is not None:
+            Quarantine.report(self.quarantine.counts, str(self.quarantine.path))
+        if self.flush_policy is not None:
+            self.flush_policy.log_summary()
+        self.metrics.log()
+        if self.config.metrics_path is not None:
+            self.metrics.write_json(self.config.metrics_path)
+
+    @staticmethod
+    def report_register_not_found(bord_register_not_found: set):
+        print('could not find info in register for following signs:')
+        print(', '.join(sorted(bord_register_not_found)))
+
+    def convert(self, batch_size: int = 100, write_size: int = 12500, joined: bool = False):
+        """Converts all opstellingen. By default the children are queried per batch of batch_size opstellingen,
+        with joined=True they are extracted in a single merge-join pass as complete opstelling aggregates."""
+        if self.checkpoint is not None and not joined:
+            raise ValueError('incremental conversion needs the joined extraction')
+        if self.quarantine is not None and not joined:
+            raise ValueError('quarantine needs the joined extraction')
+
+        journal = None
+        write_count = 0
+        if joined and self.checkpoint is None:
+            journal = self.get_journal(write_size)
+            if self.config.resume:
+                write_count = self.resume_from_journal(journal)
+        elif self.config.resume:
+            raise ValueError('resuming needs the joined extraction without a checkpoint')
+        if self.quarantine is not None and write_count == 0:
+            self.quarantine.start()
 
-    def process(self, batch_size: int = 100, write_size: int = 12500):
         g = self.write_and_create_graph(None)
+        flush_policy = self.flush_policy
+        if flush_policy is not None:
+            flush_policy.start_file()
+        if joined:
+            aggregates = self.metrics.timed_iter('extract', self.executor.get_all_opstelling_aggregates())
+            if self.checkpoint is not None:
+                aggregates = filter(self.register_change, aggregates)
+            batches = self.batched(aggregates, batch_size) if flush_policy is None else flush_policy.batches(aggregates)
+            for batch in batches:
+                geometries = self.get_geometries([aggregate.opstelling for aggregate in batch])
+                for aggregate, geometry in zip(batch, geometries):
+                    with self.metrics.measure('convert', items=1):
+                        self.convert_aggregate(g, aggregate, geometry)
+
+                    if flush_policy is None:
+                        full = write_count > 0 and write_count % write_size == 0
+                    else:
+                        full = flush_policy.should_flush(len(g))
+                    if full:
+                        g = self.flush(g)
+                        if journal is not None:
+                            self.save_journal(journal, aggregate.opstelling.id, write_count + 1)
+                    write_count += 1
+                if flush_policy is not None:
+                    flush_policy.after_batch(len(g))
+        else:
+            opstellingen = self.metrics.timed_iter('extract', self.executor.get_all_opstellingen())
+            batches = self.batched(opstellingen, batch_size) if flush_policy is None else flush_policy.batches(
+                opstellingen)
+            for batch in batches:
+                geometries = self.get_geometries(batch)
+                for opstelling, geometry in zip(batch, geometries):
+                    with self.metrics.measure('convert', items=1):
+                        self.process_opstelling(g, opstelling, geometry)
+
+                    if flush_policy is None and write_count > 0 and write_count % write_size == 0:
+                        g = self.write_and_create_graph(g)
+                    write_count += 1
+
+                self.process_batch(g, [opstelling.id for opstelling in batch])
+                # the children of a batch are added after its opstellingen, so the policy closes files per batch
+                if flush_policy is not None:
+                    flush_policy.after_batch(len(g))
+                    if flush_policy.should_flush(len(g)):
+                        g = self.flush(g)
 
-        opstelling_ids = []
-        for write_count, opstelling in enumerate(self.executor.get_all_opstellingen()):
-            opstelling_ids.append(opstelling.id)
-            self.process_opstelling(g, opstelling)
+        self.write_and_create_graph(g)
+        self.metrics.add_triples('convert' if joined else 'batch', self.triples_written)
+        self.write_checksums()
+        self.save_checkpoint()
+        if self.quarantine is not None:
+            self.quarantine.close()
+        if journal is not None:
+            journal.remove()
+        self.metrics.finish()
+
+    def flush(self, g: TripleSink) -> TripleSink:
+        """Closes the current file on a decision of the flush policy (or write_size) and starts the next one."""
+        amount_triples = len(g)
+        start = time.perf_counter()
+        g = self.write_and_create_graph(g)
+        if self.flush_policy is not None:
+            self.flush_policy.flushed(amount_triples, time.perf_counter() - start)
+        return g
 
-            if len(opstelling_ids) >= batch_size:
-                self.process_borden(g, opstelling_ids)
-                self.process_ophangingen(g, opstelling_ids)
-                opstelling_ids = []
+    def get_journal(self, write_size: int) -> ConversionJournal:
+        """The journal of this conversion, with the settings that determine the content of its files."""
+        id_range = self.executor.opstelling_id_range
+        config = self.config
+        return ConversionJournal(Path(f'{self.output_prefix}_journal.json'),
+                                 settings={'sink_type': config.sink_type, 'compression': config.compression,
+                                           'write_size': write_size, 'deterministic': config.deterministic,
+                                           'geometry_crs': config.geometry_crs, 'quarantine': config.quarantine,
+                                           'adaptive_flushing': config.adaptive_flushing,
+                                           'beheerder_precedence': list(config.beheerder_precedence),
+                                           'opstelling_id_range': None if id_range is None else list(id_range)})
+
+    def resume_from_journal(self, journal: ConversionJournal) -> int:
+        """Restores the state of the interrupted run and skips the opstellingen it wrote. Returns the amount of
+        opstellingen that were written."""
+        if not journal.load():
+            print(f'no journal {journal.path} to resume, converting all opstellingen')
+            return 0
+        self.graph_counter = journal.graph_counter
+        self.triples_written = journal.triples_written
+        self.written_files = list(journal.written_files)
+        self.checksums = dict(journal.checksums)
+        self.bord_register_not_found.update(journal.bord_register_not_found)
+        if self.quarantine is not None:
+            self.quarantine.restore(journal.rejects)
+        self.executor.start_after(journal.last_opstelling_id)
+        print(f'resuming after opstelling {journal.last_opstelling_id}: {journal.opstellingen} opstellingen in '
+              f'{journal.graph_counter} files were written')
+        return journal.opstellingen
+
+    def save_journal(self, journal: ConversionJournal, last_opstelling_id: int, opstellingen: int):
+        journal.save(last_opstelling_id, opstellingen, self.graph_counter - 1, self.triples_written,
+                     self.written_files, self.checksums, self.bord_register_not_found,
+                     None if self.quarantine is None else self.quarantine.get_state())
+
+    def register_change(self, aggregate: WDBOpstellingAggregate) -> bool:
+        """Registers the aggregate with its beheerder in the checkpoint, returns whether it has to be converted."""
+        return self.checkpoint.register(aggregate, self.beheerders.resolve(aggregate.opstelling))
+
+    def save_checkpoint(self):
+        """Writes the delete set and saves the checkpoint of an incremental conversion."""
+        if self.checkpoint is None:
+            return
+        deleted = self.checkpoint.write_delete_set(f'{self.output_prefix}_deleted.txt')
+        self.checkpoint.save()
+        print(f'{self.checkpoint.changed} opstellingen new or changed, {self.checkpoint.unchanged} unchanged, '
+              f'{deleted} assets deleted (last wijzigingsDatum {self.checkpoint.last_wijzigings_datum})')
+
+    @staticmethod
+    def batched(iterable: Iterable, size: int) -> Iterator[list]:
+        iterator = iter(iterable)
+        while True:
+            batch = list(itertools.islice(iterator, size))
+            if not batch:
+                return
+            yield batch
 
-            if write_count > 0 and write_count % write_size == 0:
-                g = self.write_and_create_graph(g)
+    def get_geometries(self, opstellingen: [WDBOpstelling]) -> [Literal]:
+        """Converts the geometries of a batch of opstellingen at once, measured in the 'geometry' stage."""
+        with self.metrics.measure('geometry', items=len(opstellingen)):
+            return self.geometry_converter.to_wkt_literals([opstelling.geometry for opstelling in opstellingen])
 
-        self.write_and_create_graph(g)
-        print('could not find info in register for following signs:')
-        print(', '.join(sorted(self.bord_register_not_found)))
+    def process_batch(self, g: Graph, opstelling_ids: [int]):
+        """Extracts and converts the children of a batch of opstellingen, measured in the 'batch' stage."""
+        with self.metrics.measure('batch', items=len(opstelling_ids)):
+            self.process_borden(g, opstelling_ids)
+            self.process_ophangingen(g, opstelling_ids)
 
-    def write_and_create_graph(self, g) -> Graph:
+    def write_and_create_graph(self, g) -> TripleSink:
+        """Closes the current sink (writing its file) and returns a new sink of sink_type for the next file."""
         if g is not None:
-            amount_triples = len(g)
-            if amount_triples > 0:
-                g.serialize(destination=f'test_{self.graph_counter}.ttl')
-                print(f'wrote test_{self.graph_counter}.ttl with {amount_triples} triples')
-
+            self.write_graph(g)
+        self.file_agents = set()
+        return self.create_graph()
+
+    def write_graph(self, g: TripleSink):
+        """Closes the sink, writing its file."""
+        amount_triples = len(g)
+        with self.metrics.measure('write', items=1 if amount_triples > 0 else 0) as stage:
+            g.close()
+            stage.triples += amount_triples
+            stage.bytes += g.size
+            stage.raw_bytes += g.raw_size
+        if amount_triples > 0:
+            self.triples_written += amount_triples
+            self.written_files.append(g.file_name)
+            self.add_checksum(g.file_name)
+            print(f'wrote {g.file_name} with {amount_triples} triples{self.get_size_report(g, amount_triples)}')
+
+    def create_graph(self) -> TripleSink:
+        """A new sink of sink_type for the next file."""
         self.graph_counter += 1
-        g = Graph()
-        g.bind('asset', Namespace('https://data.awvvlaanderen.be/id/asset/'))
-        g.bind('installatie', Namespace('https://wegenenverkeer.data.vlaanderen.be/ns/installatie#'))
-        g.bind('wr', Namespace('https://www.vlaanderen.be/digitaal-vlaanderen/onze-oplossingen/wegenregister/'))
-        g.bind('imel', Namespace('https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#'))
-        g.bind('abs', Namespace('https://wegenenverkeer.data.vlaanderen.be/ns/abstracten#'))
-        g.bind('sign', Namespace('https://wegenenverkeer.data.vlaanderen.be/doc/implementatiemodel/signalisatie/#'))
-        g.bind('kl', Namespace('https://wegenenverkeer.data.vlaanderen.be/id/concept/'))
-        g.bind('onderdeel', Namespace('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#'))
-        g.bind('wegcode', Namespace('https://www.wegcode.be/media/image/orig/'))
-        return g
-
-    def process_opstelling(self, g, opstelling):
-        self_uri = URIRef(f'https://data.awvvlaanderen.be/id/asset/opstelling_{opstelling.id}')
-        g.add((self_uri, RDF.type, URIRef(
-            'https://wegenenverkeer.data.vlaanderen.be/doc/implementatiemodel/signalisatie/#Verkeersbordopstelling')))
-
-        # TODO beheerder
-
-        # TODO geometry
+        return create_sink(self.config.sink_type, f'{self.output_prefix}_{self.graph_counter}',
+                           sort=self.config.deterministic, compression=self.config.compression)
+
+    @staticmethod
+    def get_size_report(sink: TripleSink, amount_triples: int) -> str:
+        if not sink.size:
+            return ''
+        report = f', {sink.size} bytes ({sink.size / amount_triples:.1f} B/triple'
+        if sink.raw_size != sink.size:
+            report += f', compression ratio {sink.raw_size / sink.size:.2f}'
+        return report + ')'
+
+    def add_checksum(self, file_name: str):
+        if self.config.deterministic:
+            self.checksums[file_name] = get_file_checksum(file_name)
+
+    def write_checksums(self):
+        """Writes the checksums in the format of sha256sum, so they can be checked with sha256sum -c."""
+        if not self.checksums:
+            return
+        with open(f'{self.output_prefix}_checksums.sha256', 'w', encoding='utf-8') as checksum_file:
+            checksum_file.writelines(f'{checksum}  {Path(file_name).name}\n'
+                                     for file_name, checksum in self.checksums.items())
+
+    def process_aggregate(self, g: Graph, aggregate: WDBOpstellingAggregate, geometry: Literal = None):
+        self.process_opstelling(g, aggregate.opstelling, geometry)
+        for bord in aggregate.borden:
+            self.process_bord(g, bord)
+        for ophanging in aggregate.ophangingen:
+            self.process_ophanging(g, ophanging)
+        for beugel in aggregate.beugels:
+            self.process_beugel(g, beugel)
+
+    def convert_aggregate(self, g: Graph, aggregate: WDBOpstellingAggregate, geometry: Literal = None) -> bool:
+        """Converts the aggregate into g. In quarantine mode its triples and side effects are collected first and only
+        added to g and the state of the conversion when the whole aggregate converted, an aggregate that fails is
+        rejected. Returns whether it was converted."""
+        if self.quarantine is None:
+            self.process_aggregate(g, aggregate, geometry)
+            return True
+        triples = TripleList()
+        if not self.try_process_aggregate(triples, aggregate, geometry):
+            return False
+        add = g.add
+        for triple in triples:
+            add(triple)
+        return True
+
+    def try_process_aggregate(self, g, aggregate: WDBOpstellingAggregate, geometry: Literal = None) -> bool:
+        """Converts the aggregate on copies of the state its conversion adds to (the codes missing from the register,
+        the merk IRIs and the agents of the file). The copies replace the state when the aggregate converted; when
+        it fails it is rejected and the state is left as it was. The triples added to g are not rolled back."""
+        state = self.bord_register_not_found, self.merk_uris, self.file_agents
+        self.bord_register_not_found, self.merk_uris, self.file_agents = set(state[0]), dict(state[1]), set(state[2])
+        try:
+            self.process_aggregate(g, aggregate, geometry)
+        except Exception as error:
+            self.reject(aggregate, geometry, error)
+            self.bord_register_not_found, self.merk_uris, self.file_agents = state
+            return False
+        return True
+
+    def reject(self, aggregate: WDBOpstellingAggregate, geometry: Literal, error: Exception):
+        self.quarantine.reject(aggregate, error, self.get_failing_records(aggregate, geometry))
+        if self.checkpoint is not None:
+            self.checkpoint.reject(aggregate)
+
+    def get_failing_records(self, aggregate: WDBOpstellingAggregate, geometry: Literal = None) -> [str]:
+        """Converts the records of a rejected aggregate one by one to find the ones that fail."""
+        failing = []
+
+        def check(record: str, process, *args):
+            try:
+                process(TripleList(), *args)
+            except Exception:
+                failing.append(record)
+
+        check(f'opstelling_{aggregate.opstelling.id}', self.process_opstelling, aggregate.opstelling, geometry)
+        for bord in aggregate.borden:
+            check(f'bord_{bord.id}', self.process_bord, bord)
+        for ophanging in aggregate.ophangingen:
+            check(f'ophanging_{ophanging.id}', self.process_ophanging, ophanging)
+        for beugel in aggregate.beugels:
+            check(f'beugel_{beugel.id}', self.process_beugel, beugel)
+        return failing
+
+    def process_opstelling(self, g, opstelling, geometry: Literal = None):
+        self_uri = URIRef(f'{otl.ASSET}opstelling_{opstelling.id}')
+        g.add((self_uri, RDF.type, otl.VERKEERSBORDOPSTELLING))
+
+        beheerder = self.beheerders.resolve(opstelling)
+        if beheerder is not None:
+            self.add_beheerder_to_asset(g, self_uri, beheerder)
+
+        if geometry is not None:
+            geometry_node = self.node_factory.new_node(self_uri, otl.GEO_HAS_GEOMETRY)
+            g.add((self_uri, otl.GEO_HAS_GEOMETRY, geometry_node))
+            g.add((geometry_node, otl.GEO_AS_WKT, geometry))
 
         if opstelling.wegsegment_id is not None:
-            wegsegment_node = BNode()
-            g.add((self_uri,
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/installatie#Verkeersbordopstelling.wegSegment'),
-                   wegsegment_node))
+            wegsegment_node = self.node_factory.new_node(self_uri, otl.VERKEERSBORDOPSTELLING_WEG_SEGMENT)
+            g.add((self_uri, otl.VERKEERSBORDOPSTELLING_WEG_SEGMENT, wegsegment_node))
             g.add((wegsegment_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#DtcExterneReferentie.externReferentienummer'),
+                   otl.DTC_EXTERNE_REFERENTIE_EXTERN_REFERENTIENUMMER,
                    Literal(str(opstelling.wegsegment_id))))
-            g.add((wegsegment_node,
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#DtcExterneReferentie.externePartij'),
-                   Literal('WegenRegister')))
+            g.add((wegsegment_node, otl.DTC_EXTERNE_REFERENTIE_EXTERNE_PARTIJ, otl.WEGENREGISTER))
 
         self.add_positie_rijweg_to_opstelling(g, self_uri, opstelling)
-        asset_id_node = BNode()
-        g.add((self_uri, URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#AIMObject.assetId'),
-               asset_id_node))
-        g.add((asset_id_node, URIRef(
-            'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#DtcIdentificator.identificator'),
-               Literal(f'opstelling_{opstelling.id}')))
+        asset_id_node = self.node_factory.new_node(self_uri, otl.AIMOBJECT_ASSET_ID)
+        g.add((self_uri, otl.AIMOBJECT_ASSET_ID, asset_id_node))
+        g.add((asset_id_node, otl.DTC_IDENTIFICATOR_IDENTIFICATOR, Literal(f'opstelling_{opstelling.id}')))
+
+    def add_beheerder_to_asset(self, g: Graph, self_uri: URIRef, beheerder: Beheerder):
+        relatie_uri = URIRef(f'{self_uri}{beheerder.relatie_suffix}')
+        g.add((relatie_uri, RDF.type, otl.HEEFT_BETROKKENE))
+        g.add((relatie_uri, otl.RELATIE_OBJECT_BRON, self_uri))
+        g.add((relatie_uri, otl.RELATIE_OBJECT_DOEL, beheerder.uri))
+        g.add((relatie_uri, otl.HEEFT_BETROKKENE_ROL, otl.KL_BETROKKENHEID_ROL_BEHEERDER))
+        if beheerder.uri not in self.file_agents:
+            self.file_agents.add(beheerder.uri)
+            beheerder.template.emit(g, beheerder.uri, self.node_factory)
 
     def add_positie_rijweg_to_opstelling(self, g: Graph, self_uri: URIRef, opstelling: WDBOpstelling):
         if opstelling.zijde_van_de_rijweg is None:
             return
 
-        if opstelling.zijde_van_de_rijweg == "LINKS":
-            g.add((self_uri,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/installatie#Verkeersbordopstelling.positieTovRijweg'),
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/id/concept/KlPositieSoort/linkerrand')))
-        elif opstelling.zijde_van_de_rijweg == "RECHTS":
-            g.add((self_uri,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/installatie#Verkeersbordopstelling.positieTovRijweg'),
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/id/concept/KlPositieSoort/rechterrand')))
-        elif opstelling.zijde_van_de_rijweg == "MIDDEN":
-            g.add((self_uri,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/installatie#Verkeersbordopstelling.positieTovRijweg'),
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/id/concept/KlPositieSoort/midden')))
-        else:
-            if opstelling.zijde_van_de_rijweg == "BOVEN":
-                return
-            else:
-                raise ValueError(f"Verkeersbordopstelling.positieTovRijweg can't be mapped to it: "
-                                 f"{opstelling.zijde_van_de_rijweg}")
+        if opstelling.zijde_van_de_rijweg not in otl.POSITIE_TOV_RIJWEG:
+            raise ValueError(f"Verkeersbordopstelling.positieTovRijweg can't be mapped to it: "
+                             f"{opstelling.zijde_van_de_rijweg}")
+        positie = otl.POSITIE_TOV_RIJWEG[opstelling.zijde_van_de_rijweg]
+        if positie is not None:
+            g.add((self_uri, otl.VERKEERSBORDOPSTELLING_POSITIE_TOV_RIJWEG, positie))
 
     def process_ophangingen(self, g: Graph, opstelling_ids: [int]):
         ophanging_ids = []
@@ -121,622 +399,210 @@ class Processor:
             if ophanging.id is None:
                 continue
             ophanging_ids.append(ophanging.id)
-            self_uri = URIRef(f'https://data.awvvlaanderen.be/id/asset/ophanging_{ophanging.id}')
-            opstelling_uri = URIRef(f'https://data.awvvlaanderen.be/id/asset/opstelling_{ophanging.opstelling_id}')
-            if 'steun' in ophanging.client_id:
-                g.add((self_uri, RDF.type,
-                       URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Verkeersbordsteun')))
-                g.add(
-                    (self_uri, URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Verkeersbordsteun.type'),
-                     URIRef(
-                         'https://wegenenverkeer.data.vlaanderen.be/id/concept/KlVerkeersbordsteunType/rechte-paal')))
-            else:
-                raise ValueError(f"can't create a type for this ophanging: {ophanging}")
-
-            # hoortbij relatie naar opstelling
-            relatie_uri = URIRef(
-                f'https://data.awvvlaanderen.be/id/asset/ophanging_{ophanging.id}-opstelling_{ophanging.opstelling_id}')
-            g.add((relatie_uri, RDF.type, URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#HoortBij')))
-            g.add((relatie_uri,
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#RelatieObject.bron'),
-                   self_uri))
-            g.add((relatie_uri,
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#RelatieObject.doel'),
-                   opstelling_uri))
-
-            if ophanging.lengte is not None and ophanging.lengte > -1:
-                lengte_node = BNode()
-                g.add((self_uri,
-                       URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Verkeersbordsteun.lengte'),
-                       lengte_node))
-                g.add((lengte_node,
-                       URIRef(
-                           'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInMeter.waarde'),
-                       Literal(ophanging.lengte / 1000.0, datatype=XSD.decimal)))
-
-            if ophanging.diameter is not None and ophanging.diameter > -1:
-                diameter_node = BNode()
-                g.add((self_uri,
-                       URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Verkeersbordsteun.diameter'),
-                       diameter_node))
-                g.add((diameter_node,
-                       URIRef(
-                           'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInMillimeter.waarde'),
-                       Literal(ophanging.diameter * 1.0, datatype=XSD.decimal)))
-
-            fundering_uri = URIRef(f'https://data.awvvlaanderen.be/id/asset/fundering_{ophanging.id}')
-            g.add((fundering_uri, RDF.type,
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Funderingsmassief')))
-
-            # Bevestiging relatie naar fundering
-            relatie_uri = URIRef(
-                f'https://data.awvvlaanderen.be/id/asset/ophanging_{ophanging.id}-fundering_{ophanging.id}')
-            g.add((relatie_uri, RDF.type, URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Bevestiging')))
-            g.add((relatie_uri,
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#RelatieObject.bron'),
-                   self_uri))
-            g.add((relatie_uri,
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#RelatieObject.doel'),
-                   fundering_uri))
-
-            self.add_afmetingen_to_fundering(g=g, self_uri=fundering_uri, sokkel_naam=ophanging.sokkel_naam)
+            self.process_ophanging(g, ophanging)
 
         self.process_beugels(g=g, ophanging_ids=ophanging_ids)
 
+    def process_ophanging(self, g: Graph, ophanging: WDBOphanging):
+        if ophanging.id is None:
+            return
+        self_uri = URIRef(f'{otl.ASSET}ophanging_{ophanging.id}')
+        opstelling_uri = URIRef(f'{otl.ASSET}opstelling_{ophanging.opstelling_id}')
+        for client_id_part, ophanging_type, steun_type in otl.STEUN_TYPES:
+            if client_id_part in ophanging.client_id:
+                g.add((self_uri, RDF.type, ophanging_type))
+                g.add((self_uri, otl.VERKEERSBORDSTEUN_TYPE, steun_type))
+                break
+        else:
+            raise ValueError(f"can't create a type for this ophanging: {ophanging}")
+
+        # hoortbij relatie naar opstelling
+        relatie_uri = URIRef(f'{otl.ASSET}ophanging_{ophanging.id}-opstelling_{ophanging.opstelling_id}')
+        g.add((relatie_uri, RDF.type, otl.HOORT_BIJ))
+        g.add((relatie_uri, otl.RELATIE_OBJECT_BRON, self_uri))
+        g.add((relatie_uri, otl.RELATIE_OBJECT_DOEL, opstelling_uri))
+
+        if ophanging.lengte is not None and ophanging.lengte > -1:
+            lengte_node = self.node_factory.new_node(self_uri, otl.VERKEERSBORDSTEUN_LENGTE)
+            g.add((self_uri, otl.VERKEERSBORDSTEUN_LENGTE, lengte_node))
+            g.add((lengte_node,
+                   otl.KWANT_WRD_IN_METER_WAARDE,
+                   Literal(ophanging.lengte / 1000.0, datatype=XSD.decimal)))
+
+        if ophanging.diameter is not None and ophanging.diameter > -1:
+            diameter_node = self.node_factory.new_node(self_uri, otl.VERKEERSBORDSTEUN_DIAMETER)
+            g.add((self_uri, otl.VERKEERSBORDSTEUN_DIAMETER, diameter_node))
+            g.add((diameter_node,
+                   otl.KWANT_WRD_IN_MILLIMETER_WAARDE,
+                   Literal(ophanging.diameter * 1.0, datatype=XSD.decimal)))
+
+        fundering_uri = URIRef(f'{otl.ASSET}fundering_{ophanging.id}')
+        g.add((fundering_uri, RDF.type, otl.FUNDERINGSMASSIEF))
+
+        # Bevestiging relatie naar fundering
+        relatie_uri = URIRef(f'{otl.ASSET}ophanging_{ophanging.id}-fundering_{ophanging.id}')
+        g.add((relatie_uri, RDF.type, otl.BEVESTIGING))
+        g.add((relatie_uri, otl.RELATIE_OBJECT_BRON, self_uri))
+        g.add((relatie_uri, otl.RELATIE_OBJECT_DOEL, fundering_uri))
+
+        self.add_afmetingen_to_fundering(g=g, self_uri=fundering_uri, sokkel_naam=ophanging.sokkel_naam)
+
     def process_beugels(self, g: Graph, ophanging_ids: [int]):
         for beugel in self.executor.get_all_beugels(ophanging_ids):
-            if beugel.id is None:
-                continue
+            self.process_beugel(g, beugel)
+
+    def process_beugel(self, g: Graph, beugel: WDBBeugel):
+        if beugel.id is None:
+            return
+
+        self_uri = URIRef(f'{otl.ASSET}beugel_{beugel.id}')
+        ophanging_uri = URIRef(f'{otl.ASSET}ophanging_{beugel.ophanging_id}')
+        bord_uri = URIRef(f'{otl.ASSET}bord_{beugel.bord_id}')
+
+        g.add((self_uri, RDF.type, otl.BEVESTIGINGSBEUGEL))
 
-            self_uri = URIRef(f'https://data.awvvlaanderen.be/id/asset/beugel_{beugel.id}')
-            ophanging_uri = URIRef(f'https://data.awvvlaanderen.be/id/asset/ophanging_{beugel.ophanging_id}')
-            bord_uri = URIRef(f'https://data.awvvlaanderen.be/id/asset/bord_{beugel.bord_id}')
-
-            g.add((self_uri, RDF.type,
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Bevestigingsbeugel')))
-
-            # Bevestiging relatie naar ophanging
-            relatie_uri = URIRef(
-                f'https://data.awvvlaanderen.be/id/asset/beugel_{beugel.id}-ophanging_{beugel.ophanging_id}')
-            g.add((relatie_uri, RDF.type, URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Bevestiging')))
-            g.add((relatie_uri,
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#RelatieObject.bron'),
-                   self_uri))
-            g.add((relatie_uri,
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#RelatieObject.doel'),
-                   ophanging_uri))
-
-            # Bevestiging relatie naar bord
-            relatie_uri = URIRef(
-                f'https://data.awvvlaanderen.be/id/asset/beugel_{beugel.id}-bord_{beugel.bord_id}')
-            g.add((relatie_uri, RDF.type, URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Bevestiging')))
-            g.add((relatie_uri,
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#RelatieObject.bron'),
-                   self_uri))
-            g.add((relatie_uri,
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#RelatieObject.doel'),
-                   bord_uri))
+        # Bevestiging relatie naar ophanging
+        relatie_uri = URIRef(f'{otl.ASSET}beugel_{beugel.id}-ophanging_{beugel.ophanging_id}')
+        g.add((relatie_uri, RDF.type, otl.BEVESTIGING))
+        g.add((relatie_uri, otl.RELATIE_OBJECT_BRON, self_uri))
+        g.add((relatie_uri, otl.RELATIE_OBJECT_DOEL, ophanging_uri))
+
+        # Bevestiging relatie naar bord
+        relatie_uri = URIRef(f'{otl.ASSET}beugel_{beugel.id}-bord_{beugel.bord_id}')
+        g.add((relatie_uri, RDF.type, otl.BEVESTIGING))
+        g.add((relatie_uri, otl.RELATIE_OBJECT_BRON, self_uri))
+        g.add((relatie_uri, otl.RELATIE_OBJECT_DOEL, bord_uri))
 
     def add_afmetingen_to_fundering(self, g: Graph, self_uri: URIRef, sokkel_naam: str):
         if sokkel_naam is None:
             return
 
-        afmeting_node = BNode()
-        vorm_node = BNode()
-        kwant_wrd1_node = BNode()
-        hoogte_node = BNode()
-
-        if sokkel_naam == '300x300x600, LG-51/VG-51/VG-76':
-            g.add(
-                (self_uri,
-                 URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Funderingsmassief.afmetingGrondvlak'),
-                 afmeting_node))
-            g.add((afmeting_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#DtuAfmetingGrondvlak.rechthoekig'),
-                   vorm_node))
-            g.add((vorm_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#DtcAfmetingBxlInCm.breedte'),
-                   kwant_wrd1_node))
-            g.add((kwant_wrd1_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInCentimeter.waarde'),
-                   Literal(30, datatype=XSD.decimal)))
-            kwant_wrd2_node = BNode()
-            g.add((vorm_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#DtcAfmetingBxlInCm.lengte'),
-                   kwant_wrd2_node))
-            g.add((kwant_wrd2_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInCentimeter.waarde'),
-                   Literal(30, datatype=XSD.decimal)))
-            g.add(
-                (self_uri,
-                 URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Funderingsmassief.funderingshoogte'),
-                 hoogte_node))
-            g.add((hoogte_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInCentimeter.waarde'),
-                   Literal(60, datatype=XSD.decimal)))
-        elif sokkel_naam == '400x400x700, LG-76/VG-89':
-            g.add(
-                (self_uri,
-                 URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Funderingsmassief.afmetingGrondvlak'),
-                 afmeting_node))
-            g.add((afmeting_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#DtuAfmetingGrondvlak.rechthoekig'),
-                   vorm_node))
-            g.add((vorm_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#DtcAfmetingBxlInCm.breedte'),
-                   kwant_wrd1_node))
-            g.add((kwant_wrd1_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInCentimeter.waarde'),
-                   Literal(40, datatype=XSD.decimal)))
-            kwant_wrd2_node = BNode()
-            g.add((vorm_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#DtcAfmetingBxlInCm.lengte'),
-                   kwant_wrd2_node))
-            g.add((kwant_wrd2_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInCentimeter.waarde'),
-                   Literal(40, datatype=XSD.decimal)))
-            g.add(
-                (self_uri,
-                 URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Funderingsmassief.funderingshoogte'),
-                 hoogte_node))
-            g.add((hoogte_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInCentimeter.waarde'),
-                   Literal(70, datatype=XSD.decimal)))
-        elif sokkel_naam == '500x500x700, LG-89/VG-114':
-            g.add(
-                (self_uri,
-                 URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Funderingsmassief.afmetingGrondvlak'),
-                 afmeting_node))
-            g.add((afmeting_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#DtuAfmetingGrondvlak.rechthoekig'),
-                   vorm_node))
-            g.add((vorm_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#DtcAfmetingBxlInCm.breedte'),
-                   kwant_wrd1_node))
-            g.add((kwant_wrd1_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInCentimeter.waarde'),
-                   Literal(50, datatype=XSD.decimal)))
-            kwant_wrd2_node = BNode()
-            g.add((vorm_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#DtcAfmetingBxlInCm.lengte'),
-                   kwant_wrd2_node))
-            g.add((kwant_wrd2_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInCentimeter.waarde'),
-                   Literal(50, datatype=XSD.decimal)))
-            g.add(
-                (self_uri,
-                 URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Funderingsmassief.funderingshoogte'),
-                 hoogte_node))
-            g.add((hoogte_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInCentimeter.waarde'),
-                   Literal(70, datatype=XSD.decimal)))
-        elif sokkel_naam == 'Bodemhuls Ø76':
-            g.add(
-                (self_uri,
-                 URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Funderingsmassief.afmetingGrondvlak'),
-                 afmeting_node))
-            g.add((afmeting_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#DtuAfmetingGrondvlak.rond'),
-                   vorm_node))
-            g.add((vorm_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#DtcAfmetingDiameterInCm.diameter'),
-                   kwant_wrd1_node))
-            g.add((kwant_wrd1_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInCentimeter.waarde'),
-                   Literal(11, datatype=XSD.decimal)))
-            g.add((hoogte_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInCentimeter.waarde'),
-                   Literal(37, datatype=XSD.decimal)))
+        template = self.dimension_tables.get_sokkel_template(sokkel_naam)
+        if template is not None:
+            template.emit(g, self_uri, self.node_factory)
 
     def process_borden(self, g: Graph, opstelling_ids: [int]):
-        bord_ids = []
         for bord in self.executor.get_all_borden(opstelling_ids):
-            if bord.id is None:
-                continue
-            bord_ids.append(bord.id)
-            self_uri = URIRef(f'https://data.awvvlaanderen.be/id/asset/bord_{bord.id}')
-            opstelling_uri = URIRef(f'https://data.awvvlaanderen.be/id/asset/opstelling_{bord.opstelling_id}')
-
-            # TODO onderbord details (relatie tekens)
-            # TODO calamiteitenbord details
-            if bord.code is not None and bord.code[0] in ['G', 'M']:
-                g.add((self_uri, RDF.type,
-                       URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Onderbord')))
-            elif bord.code is not None and bord.code[0:4] == 'ITRS':
-                g.add((self_uri, RDF.type,
-                       URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#CalamiteitsBord')))
-            else:
-                g.add((self_uri, RDF.type,
-                       URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#RetroreflecterendVerkeersbord')))
-
-            # hoortbij relatie
-            relatie_uri = URIRef(
-                f'https://data.awvvlaanderen.be/id/asset/bord_{bord.id}-opstelling_{bord.opstelling_id}')
-            g.add((relatie_uri, RDF.type, URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#HoortBij')))
-            g.add((relatie_uri,
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#RelatieObject.bron'),
-                   self_uri))
-            g.add((relatie_uri,
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#RelatieObject.doel'),
-                   opstelling_uri))
-
-            # aanzicht
-            aanzicht_hoek = round(bord.hoek * 180.0 / math.pi, 1)
-            while aanzicht_hoek < 0:
-                aanzicht_hoek += 360.0
-            if aanzicht_hoek > 360.0:
-                aanzicht_hoek = aanzicht_hoek % 360.0
-            aanzicht_kwant_node = BNode()
-            g.add((self_uri,
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/abstracten#Verkeersbord.aanzicht'),
-                   aanzicht_kwant_node))
-            g.add((aanzicht_kwant_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInDecimaleGraden.waarde'),
-                   Literal(aanzicht_hoek, datatype=XSD.decimal)))
-
-            # merk
-            if bord.leverancier is not None:
-                g.add((self_uri,
-                       URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#RetroreflecterendVerkeersbord.merk'),
-                       URIRef(f'https://wegenenverkeer.data.vlaanderen.be/id/conceptscheme/KlRetroreflecterendVerkeersbordMerk/{bord.leverancier.replace(" ","-")}')))
-
-            # fabricagevoorschrift
-            if bord.fabricage is not None:
-                g.add((self_uri,
-                       URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/abstracten#Verkeersbord.fabricagevoorschrift'),
-                       Literal(bord.fabricage)))
-
-            # opstelhoogte
-            if bord.y is not None and bord.y > 0:
-                hoogte_kwant_node = BNode()
-                g.add((self_uri,
-                       URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/abstracten#Verkeersbord.opstelhoogte'),
-                       hoogte_kwant_node))
-                g.add((hoogte_kwant_node,
-                       URIRef(
-                           'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInMeter.waarde'),
-                       Literal(bord.y / 1000.0, datatype=XSD.decimal)))
-
-            self.add_afmetingen_to_bord(g=g, self_uri=self_uri, bord=bord)
-
-            self.process_teken(g=g, bord=bord, bord_uri=self_uri)
-            self.process_folie(g=g, bord=bord, bord_uri=self_uri)
+            self.process_bord(g, bord)
+
+    def process_bord(self, g: Graph, bord: WDBBord):
+        if bord.id is None:
+            return
+        self_uri = URIRef(f'{otl.ASSET}bord_{bord.id}')
+        opstelling_uri = URIRef(f'{otl.ASSET}opstelling_{bord.opstelling_id}')
+
+        # TODO onderbord details (relatie tekens)
+        # TODO calamiteitenbord details
+        g.add((self_uri, RDF.type, self.bord_code_index.get(bord.code).type_uri))
+
+        # hoortbij relatie
+        relatie_uri = URIRef(f'{otl.ASSET}bord_{bord.id}-opstelling_{bord.opstelling_id}')
+        g.add((relatie_uri, RDF.type, otl.HOORT_BIJ))
+        g.add((relatie_uri, otl.RELATIE_OBJECT_BRON, self_uri))
+        g.add((relatie_uri, otl.RELATIE_OBJECT_DOEL, opstelling_uri))
+
+        # aanzicht
+        aanzicht_hoek = round(bord.hoek * 180.0 / math.pi, 1)
+        while aanzicht_hoek < 0:
+            aanzicht_hoek += 360.0
+        if aanzicht_hoek > 360.0:
+            aanzicht_hoek = aanzicht_hoek % 360.0
+        aanzicht_kwant_node = self.node_factory.new_node(self_uri, otl.VERKEERSBORD_AANZICHT)
+        g.add((self_uri, otl.VERKEERSBORD_AANZICHT, aanzicht_kwant_node))
+        g.add((aanzicht_kwant_node,
+               otl.KWANT_WRD_IN_DECIMALE_GRADEN_WAARDE,
+               Literal(aanzicht_hoek, datatype=XSD.decimal)))
+
+        # merk
+        if bord.leverancier is not None:
+            merk_uri = self.merk_uris.get(bord.leverancier)
+            if merk_uri is None:
+                merk_uri = ReferenceDataCache.get_merk_uri(bord.leverancier)
+                self.merk_uris[bord.leverancier] = merk_uri
+            g.add((self_uri, otl.RETROREFLECTEREND_VERKEERSBORD_MERK, merk_uri))
+
+        # fabricagevoorschrift
+        if bord.fabricage is not None:
+            g.add((self_uri, otl.VERKEERSBORD_FABRICAGEVOORSCHRIFT, Literal(bord.fabricage)))
+
+        # opstelhoogte
+        if bord.y is not None and bord.y > 0:
+            hoogte_kwant_node = self.node_factory.new_node(self_uri, otl.VERKEERSBORD_OPSTELHOOGTE)
+            g.add((self_uri, otl.VERKEERSBORD_OPSTELHOOGTE, hoogte_kwant_node))
+            g.add((hoogte_kwant_node, otl.KWANT_WRD_IN_METER_WAARDE, Literal(bord.y / 1000.0, datatype=XSD.decimal)))
+
+        self.add_afmetingen_to_bord(g=g, self_uri=self_uri, bord=bord)
+
+        self.process_teken(g=g, bord=bord, bord_uri=self_uri)
+        self.process_folie(g=g, bord=bord, bord_uri=self_uri)
 
     def add_afmetingen_to_bord(self, g: Graph, self_uri: URIRef, bord: WDBBord):
         if bord.vorm is None or bord.breedte is None:
             return
 
-        afmeting_node = BNode()
-        vorm_node = BNode()
-        kwant_wrd1_node = BNode()
-        area = -1
-
-        if bord.vorm in ['rh', 'wwr', 'wwl', 'rt'] and bord.breedte is not None:
-            g.add((self_uri, URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#DtuAfmetingVerkeersbord'),
-                   afmeting_node))
-            g.add((afmeting_node,
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#DtuAfmetingVerkeersbord.vierhoekig'),
-                   vorm_node))
-            g.add((vorm_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#DtcAfmetingBxhInMm.breedte'),
-                   kwant_wrd1_node))
-            g.add((kwant_wrd1_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInMillimeter.waarde'),
-                   Literal(bord.breedte, datatype=XSD.decimal)))
-            kwant_wrd2_node = BNode()
-            g.add((vorm_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#DtcAfmetingBxhInMm.hoogte'),
-                   kwant_wrd2_node))
-            g.add((kwant_wrd2_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInMillimeter.waarde'),
-                   Literal(bord.hoogte, datatype=XSD.decimal)))
-            if bord.vorm == 'rt':
-                if bord.hoogte is not None:
-                    if bord.hoogte != bord.breedte:
-                        logging.warning('Ruitvormig bord met verschillende breedte en hoogte')
-                    area = round((bord.breedte / 1000.0) ** 2 / 2, 6)
-                    opp_node = BNode()
-                    g.add((self_uri, URIRef(
-                        'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#RetroreflecterendVerkeersbord.oppervlakte'),
-                           opp_node))
-                    g.add((opp_node, URIRef(
-                        'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInVierkanteMeter.waarde'),
-                           Literal(area, datatype=XSD.decimal)))
-            elif bord.vorm == 'rh':
-                if bord.hoogte is not None:
-                    area = round(bord.breedte * bord.hoogte / 1000000.0, 6)
-                    opp_node = BNode()
-                    g.add((self_uri, URIRef(
-                        'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#RetroreflecterendVerkeersbord.oppervlakte'),
-                           opp_node))
-                    g.add((opp_node, URIRef(
-                        'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInVierkanteMeter.waarde'),
-                           Literal(area, datatype=XSD.decimal)))
-            elif bord.vorm in ['wwr', 'wwl']:
-                if bord.hoogte is not None:
-                    h = bord.hoogte / 1000.0
-                    b = bord.breedte / 1000.0
-                    if bord.hoogte == 200:
-                        pijl = 0.172
-                    elif bord.hoogte == 300:
-                        pijl = 0.25
-                    elif bord.hoogte > 400:
-                        pijl = 0.428
-                    else:
-                        raise NotImplementedError('Onbekende hoogte voor het berekenen van de oppervlakte van een pijlbord')
-                    area = round(h * (b - pijl / 2), 6)
-                    opp_node = BNode()
-                    g.add((self_uri, URIRef(
-                        'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#RetroreflecterendVerkeersbord.oppervlakte'),
-                           opp_node))
-                    g.add((opp_node, URIRef(
-                        'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInVierkanteMeter.waarde'),
-                           Literal(area, datatype=XSD.decimal)))
-
-        elif bord.vorm in ['dh', 'odh']:
-            g.add((self_uri, URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#DtuAfmetingVerkeersbord'),
-                   afmeting_node))
-            g.add((afmeting_node,
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#DtuAfmetingVerkeersbord.driehoekig'),
-                   vorm_node))
-            g.add((vorm_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#DtcAfmetingZijdeInMm.zijde'),
-                   kwant_wrd1_node))
-            g.add((kwant_wrd1_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInMillimeter.waarde'),
-                   Literal(bord.breedte, datatype=XSD.decimal)))
-            if bord.hoogte is not None:
-                if bord.hoogte != bord.breedte:
-                    logging.warning('Driehoekig bord met verschillende breedte en hoogte')
-                area = round(math.sqrt(3) / 4 * (bord.breedte / 1000.0) ** 2, 6)
-                opp_node = BNode()
-                g.add((self_uri, URIRef(
-                    'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#RetroreflecterendVerkeersbord.oppervlakte'),
-                       opp_node))
-                g.add((opp_node, URIRef(
-                    'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInVierkanteMeter.waarde'),
-                       Literal(area, datatype=XSD.decimal)))
-        elif bord.vorm in ['zh']:
-            g.add((self_uri, URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#DtuAfmetingVerkeersbord'),
-                   afmeting_node))
-            g.add((afmeting_node,
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#DtuAfmetingVerkeersbord.zeshoekig'),
-                   vorm_node))
-            g.add((vorm_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#DtcAfmetingZijdeInMm.zijde'),
-                   kwant_wrd1_node))
-            g.add((kwant_wrd1_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInMillimeter.waarde'),
-                   Literal(bord.breedte, datatype=XSD.decimal)))
-            if bord.hoogte is not None:
-                if bord.hoogte != bord.breedte:
-                    logging.warning('Zeshoekig bord met verschillende breedte en hoogte')
-                area = round(math.sqrt(3) * 3 / 2 * (bord.breedte / 1000.0) ** 2, 6)
-                opp_node = BNode()
-                g.add((self_uri, URIRef(
-                    'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#RetroreflecterendVerkeersbord.oppervlakte'),
-                       opp_node))
-                g.add((opp_node, URIRef(
-                    'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInVierkanteMeter.waarde'),
-                       Literal(area, datatype=XSD.decimal)))
-        elif bord.vorm in ['ah']:
-            g.add((self_uri, URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#DtuAfmetingVerkeersbord'),
-                   afmeting_node))
-            g.add((afmeting_node,
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#DtuAfmetingVerkeersbord.achthoekig'),
-                   vorm_node))
-            g.add((vorm_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#DtcAfmetingZijdeInMm.zijde'),
-                   kwant_wrd1_node))
-            g.add((kwant_wrd1_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInMillimeter.waarde'),
-                   Literal(bord.breedte, datatype=XSD.decimal)))
-            if bord.hoogte is not None:
-                if bord.hoogte != bord.breedte:
-                    logging.warning('Zeshoekig bord met verschillende breedte en hoogte')
-                area = round(8 * (bord.breedte / 2000.0) ** 2 * (math.sqrt(2) - 1), 6)
-                opp_node = BNode()
-                g.add((self_uri, URIRef(
-                    'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#RetroreflecterendVerkeersbord.oppervlakte'),
-                       opp_node))
-                g.add((opp_node, URIRef(
-                    'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInVierkanteMeter.waarde'),
-                       Literal(area, datatype=XSD.decimal)))
-        elif bord.vorm in ['ro']:
-            g.add((self_uri, URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#DtuAfmetingVerkeersbord'),
-                   afmeting_node))
-            g.add((afmeting_node,
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#DtuAfmetingVerkeersbord.rond'),
-                   vorm_node))
-            g.add((vorm_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#DtcAfmetingDiameterInMm.diameter'),
-                   kwant_wrd1_node))
-            g.add((kwant_wrd1_node,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInMillimeter.waarde'),
-                   Literal(bord.breedte, datatype=XSD.decimal)))
-            if bord.hoogte is not None:
-                if bord.hoogte != bord.breedte:
-                    logging.warning('Rond bord met verschillende breedte en hoogte')
-                area = round(math.pi * (bord.breedte / 2000.0) ** 2, 6)
-                opp_node = BNode()
-                g.add((self_uri, URIRef(
-                    'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#RetroreflecterendVerkeersbord.oppervlakte'),
-                       opp_node))
-                g.add((opp_node, URIRef(
-                    'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#KwantWrdInVierkanteMeter.waarde'),
-                       Literal(area, datatype=XSD.decimal)))
-        else:
-            raise ValueError(f"bord.vorm can't be mapped: {bord.vorm}")
-
-        if area != -1:
-            if area <= 1:
-                g.add((self_uri, URIRef(
-                    'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#RetroreflecterendVerkeersbord.grootteorde'),
-                       URIRef(
-                           'https://wegenenverkeer.data.vlaanderen.be/id/concept/KlRetroreflecterendVerkeersbordGrootteorde/klein')))
-            elif area <= 2:
-                g.add((self_uri, URIRef(
-                    'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#RetroreflecterendVerkeersbord.grootteorde'),
-                       URIRef(
-                           'https://wegenenverkeer.data.vlaanderen.be/id/concept/KlRetroreflecterendVerkeersbordGrootteorde/middelgroot')))
-            else:
-                g.add((self_uri, URIRef(
-                    'https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#RetroreflecterendVerkeersbord.grootteorde'),
-                       URIRef(
-                           'https://wegenenverkeer.data.vlaanderen.be/id/concept/KlRetroreflecterendVerkeersbordGrootteorde/groot')))
+        template = self.dimension_tables.get_bord_template(bord.vorm, bord.breedte, bord.hoogte)
+        template.emit(g, self_uri, self.node_factory)
 
     def process_folie(self, g: Graph, bord: WDBBord, bord_uri: URIRef):
-        self_uri = URIRef(f'https://data.awvvlaanderen.be/id/asset/folie_{bord.id}')
+        self_uri = URIRef(f'{otl.ASSET}folie_{bord.id}')
 
-        g.add((self_uri, RDF.type,
-               URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#RetroreflecterendeFolie')))
+        g.add((self_uri, RDF.type, otl.RETROREFLECTERENDE_FOLIE))
 
         # Bevestiging relatie
-        relatie_uri = URIRef(f'https://data.awvvlaanderen.be/id/asset/bord_{bord.id}-folie_{bord.id}')
-        g.add((relatie_uri, RDF.type, URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#Bevestiging')))
-        g.add((relatie_uri,
-               URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#RelatieObject.bron'),
-               bord_uri))
-        g.add((relatie_uri,
-               URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#RelatieObject.doel'),
-               self_uri))
-
-        if bord.folie_type == 'Onbekend' or bord.folie_type == '' or bord.folie_type is None or bord.folie_type == 'nvt':
-            return
-        elif bord.folie_type == '3.a':
-            g.add((self_uri,
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#RetroreflecterendeFolie.folietype'),
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/id/concept/KlFolieType/folietype-3a')))
-        elif bord.folie_type == '3.b':
-            g.add((self_uri,
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#RetroreflecterendeFolie.folietype'),
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/id/concept/KlFolieType/folietype-3b')))
-        elif bord.folie_type == '3':
-            g.add((self_uri,
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#RetroreflecterendeFolie.folietype'),
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/id/concept/KlFolieType/folietype-3a-en-3b')))
-        elif bord.folie_type == '1':
-            g.add((self_uri,
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#RetroreflecterendeFolie.folietype'),
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/id/concept/KlFolieType/folietype-1')))
-        elif bord.folie_type == '2':
-            g.add((self_uri,
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#RetroreflecterendeFolie.folietype'),
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/id/concept/KlFolieType/folietype-2')))
-        else:
+        relatie_uri = URIRef(f'{otl.ASSET}bord_{bord.id}-folie_{bord.id}')
+        g.add((relatie_uri, RDF.type, otl.BEVESTIGING))
+        g.add((relatie_uri, otl.RELATIE_OBJECT_BRON, bord_uri))
+        g.add((relatie_uri, otl.RELATIE_OBJECT_DOEL, self_uri))
+
+        if bord.folie_type not in otl.FOLIE_TYPES:
             raise ValueError(f"bord.folie_type can't be mapped to it: {bord.folie_type}")
+        folie_type = otl.FOLIE_TYPES[bord.folie_type]
+        if folie_type is not None:
+            g.add((self_uri, otl.RETROREFLECTERENDE_FOLIE_FOLIETYPE, folie_type))
 
     def process_teken(self, g: Graph, bord: WDBBord, bord_uri: URIRef):
-        self_uri = URIRef(f'https://data.awvvlaanderen.be/id/asset/verkeersteken_{bord.id}')
+        self_uri = URIRef(f'{otl.ASSET}verkeersteken_{bord.id}')
 
-        g.add((self_uri, RDF.type,
-               URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/installatie#VerkeersbordVerkeersteken')))
+        g.add((self_uri, RDF.type, otl.VERKEERSBORD_VERKEERSTEKEN))
 
         # hoortbij relatie
-        relatie_uri = URIRef(f'https://data.awvvlaanderen.be/id/asset/bord_{bord.id}-verkeersteken_{bord.id}')
-        g.add((relatie_uri, RDF.type, URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#HoortBij')))
-        g.add((relatie_uri,
-               URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#RelatieObject.bron'),
-               bord_uri))
-        g.add((relatie_uri,
-               URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#RelatieObject.doel'),
-               self_uri))
+        relatie_uri = URIRef(f'{otl.ASSET}bord_{bord.id}-verkeersteken_{bord.id}')
+        g.add((relatie_uri, RDF.type, otl.HOORT_BIJ))
+        g.add((relatie_uri, otl.RELATIE_OBJECT_BRON, bord_uri))
+        g.add((relatie_uri, otl.RELATIE_OBJECT_DOEL, self_uri))
 
         # variabelOpschrift
         if bord.parameters is not None:
-            g.add((self_uri,
-                   URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/abstracten#Verkeersteken.variabelOpschrift'),
-                   Literal(bord.parameters)))
+            g.add((self_uri, otl.VERKEERSTEKEN_VARIABEL_OPSCHRIFT, Literal(bord.parameters)))
 
         self.process_concept(g, bord=bord, concept_uri=self_uri)
 
     def process_concept(self, g: Graph, bord: WDBBord, concept_uri: URIRef):
-        self_uri = URIRef(f'https://data.awvvlaanderen.be/id/asset/verkeersbordconcept_{bord.id}')
+        self_uri = URIRef(f'{otl.ASSET}verkeersbordconcept_{bord.id}')
 
-        g.add((self_uri, RDF.type,
-               URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/installatie#VerkeersbordConcept')))
+        g.add((self_uri, RDF.type, otl.VERKEERSBORD_CONCEPT))
 
         # hoortbij relatie
-        relatie_uri = URIRef(
-            f'https://data.awvvlaanderen.be/id/asset/verkeersteken_{bord.id}-verkeersbordconcept_{bord.id}')
-        g.add((relatie_uri, RDF.type, URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/onderdeel#HoortBij')))
-        g.add((relatie_uri,
-               URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#RelatieObject.bron'),
-               concept_uri))
-        g.add((relatie_uri,
-               URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#RelatieObject.doel'),
-               self_uri))
+        relatie_uri = URIRef(f'{otl.ASSET}verkeersteken_{bord.id}-verkeersbordconcept_{bord.id}')
+        g.add((relatie_uri, RDF.type, otl.HOORT_BIJ))
+        g.add((relatie_uri, otl.RELATIE_OBJECT_BRON, concept_uri))
+        g.add((relatie_uri, otl.RELATIE_OBJECT_DOEL, self_uri))
 
         # code
         if bord.code != 'Unknown' and bord.code is not None:
-            g.add((self_uri,
-                   URIRef(
-                       'https://wegenenverkeer.data.vlaanderen.be/ns/installatie#VerkeersbordConcept.verkeersbordCode'),
-                   Literal(bord.code)))
-
-            if bord.code in self.bord_register:
-                g.add((self_uri,
-                       URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/installatie#VerkeersbordConcept.betekenis'),
-                       Literal(self.bord_register[bord.code]['betekenis'])))
-                image_uri = URIRef(f"https://www.wegcode.be{self.bord_register[bord.code]['image']}")
-                image_filename = self.bord_register[bord.code]['image'].split('/')[-1]
-                afbeelding_node = BNode()
-                g.add((self_uri,
-                       URIRef(
-                           'https://wegenenverkeer.data.vlaanderen.be/ns/installatie#VerkeersbordConcept.afbeelding'),
-                       afbeelding_node))
-                g.add((afbeelding_node,
-                       URIRef(
-                           'https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#DtcDocument.bestandsnaam'),
-                       Literal(image_filename)))
-                g.add((afbeelding_node,
-                       URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#DtcDocument.uri'),
-                       image_uri))
-                g.add((afbeelding_node,
-                       URIRef('https://wegenenverkeer.data.vlaanderen.be/ns/implementatieelement#DtcDocument.mimeType'),
-                       URIRef('https://wegenenverkeer.data.vlaanderen.be/id/concept/KlAlgMimeType/image-png')))
+            g.add((self_uri, otl.VERKEERSBORD_CONCEPT_VERKEERSBORD_CODE, Literal(bord.code)))
 
+            bord_code_info = self.bord_code_index.get(bord.code)
+            if bord_code_info.entry is not None:
+                bord_code_info.entry.template.emit(g, self_uri, self.node_factory)
+                self.bord_register_not_found.update(bord_code_info.unresolved)
             else:
                 self.bord_register_not_found.add(bord.code)
 
     def add_borden_register(self, bord_register: Path):
-        with open(bord_register, newline='') as csvfile:
-            reader = csv.reader(csvfile, delimiter=';')
-            for row in reader:
-                splitted = row[1].split('. ', 2)
-                self.bord_register[splitted[0]] = {'image': row[0], 'betekenis': splitted[1]}
+        """Loads the wegcode register into the bord code index, see BordCodeIndex for how codes are matched. The first
+        register is loaded from its compiled artifact (see CompiledRegister)."""
+        if len(self.bord_code_index) == 0:
+            self.bord_code_index = load_register(bord_register)
+        else:
+            self.bord_code_index.add_register(bord_register)
@@ -0,0 +1,101 @@
+import dataclasses
+from pathlib import Path
+
+from AdaptiveFlushPolicy import AdaptiveFlushPolicy
+from BeheerderCache import BEHEERDER_SOURCES, DEFAULT_PRECEDENCE
+from CompressedOutput import check_compression
+from GeometryConverter import check_crs
+from TripleSink import SINKS
+
+# the options a conversion mode can't be combined with, checked by ProcessorConfig.check_mode
+UNSUPPORTED_OPTIONS = {'sequential': (),
+                       'pipelined': ('resume', 'adaptive_flushing'),
+                       'parallel': ('checkpoint', 'resume', 'adaptive_flushing'),
+                       'tiled': ('checkpoint', 'resume', 'adaptive_flushing', 'rdflib')}
+OPTION_NAMES = {'checkpoint': 'incremental conversion (checkpoint_path)',
+                'resume': 'resuming (resume)',
+                'adaptive_flushing': 'adaptive flushing (memory_budget, triple_budget)',
+                'rdflib': "the 'rdflib' sink, it would keep the graphs of all files in memory"}
+
+
+@dataclasses.dataclass(frozen=True)
+class ProcessorConfig:
+    """The options of a conversion, shared by Processor, its subclasses and ParallelProcessor. The options are
+    validated when the config is created, check_mode() checks whether they can be used in a conversion mode.
+    sink_type selects how triples are written: 'rdflib' collects them in a Graph that is serialized to turtle, 'nt' and
+    'ttl' stream them straight to an N-Triples or turtle file, 'binary' to a dictionary encoded binary file (see
+    BinaryRDF). compression 'gzip' or 'zstd' compresses the files in a background thread.
+    With a checkpoint_path the conversion is incremental: only opstellingen that changed since the run that wrote the
+    checkpoint are converted and the deleted assets are written to <output_prefix>_deleted.txt. output_prefix
+    defaults to 'delta' then instead of 'test', so a delta doesn't overwrite the files of a full conversion.
+    The stages of the conversion are logged and written to metrics_path as JSON when given.
+    The geometries are written as GeoSPARQL wktLiterals in geometry_crs, 'lambert72' or 'wgs84'.
+    deterministic replaces the blank nodes by skolem IRIs derived from the asset and the predicates leading to the
+    node, sorts the triples of every file and writes the sha256 of the files to <output_prefix>_checksums.sha256, so
+    two runs over the same data give identical files.
+    Without a checkpoint, the joined conversion records its progress in <output_prefix>_journal.json after every file
+    it writes (see ConversionJournal). With resume, a run that was interrupted continues after the last opstelling of
+    its last complete file. The journal is removed when the run completes.
+    In quarantine mode an opstelling aggregate that fails to convert is left out of the output and written with the
+    error to <output_prefix>_rejects.jsonl (see Quarantine) instead of aborting the conversion.
+    With a memory_budget (MiB) or triple_budget the files are closed on that budget instead of every write_size
+    opstellingen, and the batch size is tuned while converting (see AdaptiveFlushPolicy).
+    Every opstelling gets the beheerder of the first of its gekozenBeheerder, beheerder and berekendeBeheerder in
+    beheerder_precedence (see BeheerderCache)."""
+    output_prefix: str = None
+    sink_type: str = 'rdflib'
+    compression: str = None
+    deterministic: bool = False
+    geometry_crs: str = 'lambert72'
+    checkpoint_path: Path = None
+    resume: bool = False
+    quarantine: bool = False
+    memory_budget: float = None
+    triple_budget: int = None
+    beheerder_precedence: (str,) = DEFAULT_PRECEDENCE
+    metrics_path: Path = None
+
+    def __post_init__(self):
+        if self.output_prefix is None:
+            object.__setattr__(self, 'output_prefix', 'test' if self.checkpoint_path is None else 'delta')
+        if self.sink_type not in SINKS:
+            raise ValueError(f'unknown sink type {self.sink_type}, expected one of {", ".join(SINKS)}')
+        check_compression(self.compression)
+        check_crs(self.geometry_crs)
+        object.__setattr__(self, 'beheerder_precedence', tuple(self.beheerder_precedence))
+        unknown = [source for source in self.beheerder_precedence if source not in BEHEERDER_SOURCES]
+        if unknown:
+            raise ValueError(f'unknown beheerder source(s) {", ".join(unknown)} in the precedence, expected '
+                             f'{", ".join(BEHEERDER_SOURCES)}')
+        if self.resume and self.checkpoint_path is not None:
+            raise ValueError('resuming can only be used without a checkpoint')
+        if self.memory_budget is not None and self.memory_budget <= 0:
+            raise ValueError('memory_budget must be positive')
+        if self.triple_budget is not None and self.triple_budget <= 0:
+            raise ValueError('triple_budget must be positive')
+
+    @property
+    def adaptive_flushing(self) -> bool:
+        return self.memory_budget is not None or self.triple_budget is not None
+
+    def get_options(self) -> [str]:
+        """The options of UNSUPPORTED_OPTIONS this config uses."""
+        used = {'checkpoint': self.checkpoint_path is not None, 'resume': self.resume,
+                'adaptive_flushing': self.adaptive_flushing, 'rdflib': self.sink_type == 'rdflib'}
+        return [option for option, is_used in used.items() if is_used]
+
+    def check_mode(self, mode: str):
+        """Raises when an option can't be used in the conversion mode: 'sequential', 'pipelined', 'parallel' or
+        'tiled'."""
+        if mode not in UNSUPPORTED_OPTIONS:
+            raise ValueError(f'unknown conversion mode {mode}, expected one of {", ".join(UNSUPPORTED_OPTIONS)}')
+        unsupported = [option for option in self.get_options() if option in UNSUPPORTED_OPTIONS[mode]]
+        if unsupported:
+            raise ValueError(f'the {mode} conversion does not support '
+                             f'{"; ".join(OPTION_NAMES[option] for option in unsupported)}')
+
+    def create_flush_policy(self) -> AdaptiveFlushPolicy:
+        """A new AdaptiveFlushPolicy on the budgets, or None without adaptive flushing."""
+        if not self.adaptive_flushing:
+            return None
+        return AdaptiveFlushPolicy(self.memory_budget, self.triple_budget)
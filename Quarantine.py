@@ -0,0 +1,68 @@
+import json
+import os
+from collections import Counter
+from pathlib import Path
+
+from WDBDataclasses.WDBOpstellingAggregate import WDBOpstellingAggregate
+
+
+class Quarantine:
+    """Writes the opstelling aggregates that can't be converted to a JSON lines file, one line per aggregate with the
+    error, the records that fail on their own (e.g. bord_12) and the rows of the aggregate, and counts the rejects
+    per reason. The reason is the error type and its message up to the first ':', which is where the messages of
+    the Processor put the offending value. The file is created on the first reject."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.counts = Counter()
+        self._file = None
+
+    @staticmethod
+    def get_reason(error: Exception) -> str:
+        return f'{type(error).__name__}: {str(error).split(":", 1)[0]}'
+
+    @staticmethod
+    def get_rows(aggregate: WDBOpstellingAggregate) -> dict:
+        return {'opstelling': aggregate.opstelling._asdict(),
+                'borden': [bord._asdict() for bord in aggregate.borden],
+                'ophangingen': [ophanging._asdict() for ophanging in aggregate.ophangingen],
+                'beugels': [beugel._asdict() for beugel in aggregate.beugels]}
+
+    def reject(self, aggregate: WDBOpstellingAggregate, error: Exception, records: [str]):
+        reason = self.get_reason(error)
+        self.counts[reason] += 1
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.write(json.dumps({'opstelling_id': aggregate.opstelling.id, 'reason': reason,
+                                     'error': str(error), 'records': records, 'rows': self.get_rows(aggregate)},
+                                    separators=(',', ':'), default=str) + '\n')
+
+    def get_state(self) -> dict:
+        """The size of the file and the counts, to restore the quarantine of a resumed run."""
+        if self._file is not None:
+            self._file.flush()
+        return {'size': os.path.getsize(self.path) if os.path.isfile(self.path) else 0, 'counts': dict(self.counts)}
+
+    def restore(self, state: dict):
+        """Drops the rejects written after the state was taken and continues its counts."""
+        self.counts = Counter(state['counts'])
+        if os.path.isfile(self.path):
+            os.truncate(self.path, state['size'])
+
+    def start(self):
+        """Removes the rejects file of an earlier run."""
+        if os.path.isfile(self.path):
+            os.remove(self.path)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @staticmethod
+    def report(counts: Counter, location: str):
+        if not counts:
+            return
+        print(f'{sum(counts.values())} opstellingen rejected, written to {location}:')
+        for reason, count in counts.most_common():
+            print(f'    {count:>7} {reason}')
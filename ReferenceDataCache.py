@@ -0,0 +1,68 @@
+from rdflib import URIRef
+
+import OTLVocabulary as otl
+from BeheerderCache import BeheerderCache
+from SQLDbReader import SQLDbReader
+from WDBDataclasses.WDBBord import WDBBord
+from WDBDataclasses.WDBOphanging import WDBOphanging
+from WDBDataclasses.WDBSokkelAfmeting import WDBSokkelAfmeting
+
+
+class ReferenceDataCache:
+    """Holds the small reference tables of a WDB export (leverancierItem, fabricageType, sokkelAfmetingen, kleur and
+    ondergrondType) as dicts keyed on their key, so the record queries select the foreign keys instead of joining these
+    tables and the row factories resolve them to names. The tables are read once, by load().
+    merk_uris holds the KlRetroreflecterendVerkeersbordMerk concept of every leverancier, keyed on its naam.
+    beheerders holds the beheerder, berekendeBeheerder and gekozenBeheerder tables with their gebied."""
+
+    def __init__(self, leveranciers: dict = None, fabricage_types: dict = None, sokkel_afmetingen: dict = None,
+                 kleuren: dict = None, ondergronden: dict = None, beheerders: BeheerderCache = None):
+        self.leveranciers = {} if leveranciers is None else leveranciers
+        self.fabricage_types = {} if fabricage_types is None else fabricage_types
+        self.sokkel_afmetingen = {} if sokkel_afmetingen is None else sokkel_afmetingen
+        self.kleuren = {} if kleuren is None else kleuren
+        self.ondergronden = {} if ondergronden is None else ondergronden
+        self.beheerders = BeheerderCache() if beheerders is None else beheerders
+        self.sokkel_namen = {key: afmeting.naam for key, afmeting in self.sokkel_afmetingen.items()}
+        self.merk_uris = {naam: self.get_merk_uri(naam) for naam in self.leveranciers.values() if naam is not None}
+
+    @classmethod
+    def load(cls, sql_db_reader: SQLDbReader) -> 'ReferenceDataCache':
+        def read_names(table: str) -> dict:
+            return dict(sql_db_reader.perform_read_query(f'SELECT key, naam FROM {table} ORDER BY key', {}))
+
+        sokkel_afmetingen = {
+            row[0]: WDBSokkelAfmeting(naam=row[1], hoogte=row[2], breedte=row[3], diepte=row[4])
+            for row in sql_db_reader.perform_read_query(
+                'SELECT key, naam, hoogte, breedte, diepte FROM sokkelAfmetingen ORDER BY key', {})}
+        return cls(leveranciers=read_names('leverancierItem'), fabricage_types=read_names('fabricageType'),
+                   sokkel_afmetingen=sokkel_afmetingen, kleuren=read_names('kleur'),
+                   ondergronden=read_names('ondergrondType'), beheerders=BeheerderCache.load(sql_db_reader))
+
+    @staticmethod
+    def get_merk_uri(leverancier: str) -> URIRef:
+        return URIRef(f'{otl.MERK}{leverancier.replace(" ", "-")}')
+
+    def get_bord_row_factory(self):
+        """Row factory for the borden query, which ends with leverancierItem_fk and fabricageType_fk."""
+        new = tuple.__new__
+        leveranciers = self.leveranciers.get
+        fabricage_types = self.fabricage_types.get
+
+        def row_factory(cursor, row):
+            return new(WDBBord, row[:10] + (leveranciers(row[10]), fabricage_types(row[11])))
+
+        return row_factory
+
+    def get_ophanging_row_factory(self):
+        """Row factory for the ophangingen query, which ends with sokkelAfmetingen_fk, kleur_fk and
+        ondergrondType_fk."""
+        new = tuple.__new__
+        sokkel_namen = self.sokkel_namen.get
+        kleuren = self.kleuren.get
+        ondergronden = self.ondergronden.get
+
+        def row_factory(cursor, row):
+            return new(WDBOphanging, row[:5] + (sokkel_namen(row[5]), kleuren(row[6]), ondergronden(row[7])))
+
+        return row_factory
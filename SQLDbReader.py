@@ -1,13 +1,37 @@
+import atexit
+import contextlib
 import os
 import sqlite3
+import threading
 from pathlib import Path
+from typing import Iterator
+
+from ProcessingMetrics import ProcessingMetrics
 
 
 class SQLDbReader:
     """SQLDbReader performs read query's. It first checks if the provided path has a file. Provides an easy way to
-    override querying for testing purposes. """
+    override querying for testing purposes.
+    Connections are opened read-only and immutable, once per thread, and reused for every query until close() is
+    called (automatically at process end, a reader with open connections is kept until then). The pragmas are
+    applied to every new connection.
+    iterate_read_query streams the result in chunks of chunk_size rows instead of materialising it. When metrics are
+    given, the time spent executing and fetching is measured in the 'sqlite fetch' stage."""
+
+    default_pragmas = {'mmap_size': 268435456, 'cache_size': -65536, 'temp_store': 'MEMORY'}
+
+    def __init__(self, path: Path = None, pragmas: dict = None, chunk_size: int = 1000,
+                 metrics: ProcessingMetrics = None):
+        self.chunk_size = chunk_size
+        self.metrics = metrics
+        self.pragmas = dict(self.default_pragmas)
+        if pragmas is not None:
+            self.pragmas.update(pragmas)
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
 
-    def __init__(self, path: Path = None):
         if path is None or path == '':
             self.file_exists = False
         else:
@@ -16,15 +40,90 @@ class SQLDbReader:
             if not self.file_exists:
                 raise FileNotFoundError(str(self.path) + " is not a valid path. File does not exist.")
 
-    def perform_read_query(self, query: str, params: dict):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def get_connection(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            # connections can't be shared with a forked child process, start with a fresh pool
+            self._local = threading.local()
+            self._connections = []
+            self._pid = os.getpid()
+
+        con = getattr(self._local, 'connection', None)
+        if con is None:
+            con = self._connect()
+            self._local.connection = con
+            with self._lock:
+                if not self._connections:
+                    # close the connections at process end, until close() is called
+                    atexit.register(self.close)
+                self._connections.append(con)
+        return con
+
+    def _connect(self) -> sqlite3.Connection:
         self.file_exists = os.path.isfile(self.path)
         if not self.file_exists:
             raise FileNotFoundError(str(self.path) + " is not a valid path. File does not exist.")
 
-        con = sqlite3.connect(self.path)
-        cur = con.cursor()
-        data = []
-        for row in cur.execute(query, params):
-            data.append(row)
-        con.close()
-        return data
+        con = sqlite3.connect(f'{self.path.as_uri()}?mode=ro&immutable=1', uri=True, check_same_thread=False)
+        for name, value in self.pragmas.items():
+            con.execute(f'PRAGMA {name} = {value}')
+        return con
+
+    def perform_read_query(self, query: str, params: dict):
+        cur = self.get_connection().cursor()
+        try:
+            return cur.execute(query, params).fetchall()
+        finally:
+            cur.close()
+
+    def iterate_read_query(self, query: str, params: dict, chunk_size: int = None, row_factory=None) -> Iterator:
+        """row_factory is set on the cursor, so the rows are yielded as whatever it builds from them."""
+        for rows in self.iterate_read_query_chunks(query, params, chunk_size, row_factory):
+            yield from rows
+
+    def iterate_read_query_chunks(self, query: str, params: dict, chunk_size: int = None,
+                                  row_factory=None) -> Iterator[list]:
+        """Like iterate_read_query, but yields the lists of (at most) chunk_size rows as they are fetched. A chunk is
+        released before the next one is fetched, so a consumer that drops it holds one chunk at a time."""
+        if chunk_size is None:
+            chunk_size = self.chunk_size
+
+        cur = self.get_connection().cursor()
+        if row_factory is not None:
+            cur.row_factory = row_factory
+        try:
+            if self.metrics is None:
+                cur.execute(query, params)
+            else:
+                with self.metrics.measure('sqlite fetch'):
+                    cur.execute(query, params)
+            while True:
+                if self.metrics is None:
+                    rows = cur.fetchmany(chunk_size)
+                else:
+                    with self.metrics.measure('sqlite fetch') as stage:
+                        rows = cur.fetchmany(chunk_size)
+                        stage.items += len(rows)
+                if not rows:
+                    break
+                yield rows
+                rows = None
+        finally:
+            # the reader may have been closed while the generator was suspended, closing its connection and cursors
+            with contextlib.suppress(sqlite3.ProgrammingError):
+                cur.close()
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        atexit.unregister(self.close)
+        self._local = threading.local()
+        if self._pid != os.getpid():
+            return
+        for con in connections:
+            con.close()
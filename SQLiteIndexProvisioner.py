@@ -0,0 +1,120 @@
+import logging
+import os
+import sqlite3
+from pathlib import Path
+
+from SQLDbReader import SQLDbReader
+from SQLiteQueryExecutor import SQLiteQueryExecutor
+
+
+class SQLiteIndexProvisioner:
+    """Checks the query plans of the SQLiteQueryExecutor queries against a WDB export and, when allowed, builds the
+    missing indexes in an indexed side copy of the export. The original export is never modified: SQLite can only
+    index tables in their own database file, so an attached index database is not an option.
+    The copy records the size and modification time of the export it was built from in its indexed_copy_source table,
+    it is only reused while the export still has them."""
+
+    required_indexes = {
+        'idx_aanzichten_opstelling_fk': 'CREATE INDEX IF NOT EXISTS idx_aanzichten_opstelling_fk '
+                                        'ON aanzichten (opstelling_fk, id, hoek)',
+        'idx_borden_aanzicht_fk': 'CREATE INDEX IF NOT EXISTS idx_borden_aanzicht_fk ON borden (aanzicht_fk, id)',
+        'idx_ophangingen_opstelling_fk': 'CREATE INDEX IF NOT EXISTS idx_ophangingen_opstelling_fk '
+                                         'ON ophangingen (opstelling_fk, id)',
+        'idx_bevestigingen_ophanging_fk': 'CREATE INDEX IF NOT EXISTS idx_bevestigingen_ophanging_fk '
+                                          'ON bevestigingen (ophanging_fk, id, bevestigingsprofiel_fk)'}
+
+    def __init__(self, path: Path, indexed_path: Path = None):
+        self.path = path.resolve()
+        if indexed_path is None:
+            indexed_path = self.path.with_name(f'{self.path.stem}.indexed{self.path.suffix}')
+        self.indexed_path = indexed_path.resolve()
+
+    @staticmethod
+    def get_plan_warnings(sql_db_reader: SQLDbReader, queries: dict = None) -> dict:
+        """Runs EXPLAIN QUERY PLAN for every query and returns the plan steps that scan a complete table, build an
+        automatic index or sort in a temporary b-tree, keyed on the query name. Queries without a WHERE clause read
+        the whole table by design, so only their automatic indexes and sorts are reported."""
+        if queries is None:
+            queries = SQLiteQueryExecutor.get_queries()
+
+        warnings = {}
+        for name, query in queries.items():
+            full_pass = 'WHERE' not in query.upper()
+            steps = [row[3] for row in sql_db_reader.perform_read_query(f'EXPLAIN QUERY PLAN {query}', {})]
+            bad_steps = [step for step in steps
+                         if (not full_pass and step.startswith('SCAN ') and ' USING ' not in step)
+                         or 'AUTOMATIC' in step or 'TEMP B-TREE' in step]
+            if bad_steps:
+                warnings[name] = bad_steps
+        return warnings
+
+    @staticmethod
+    def report(warnings: dict, path: Path):
+        if not warnings:
+            logging.info(f'query plans on {path} use indexes for all queries')
+            return
+        for name, steps in warnings.items():
+            logging.warning(f'query plan for {name} on {path}: {"; ".join(steps)}')
+
+    def get_source_stamp(self) -> (int, int):
+        """The size and modification time (ns) of the export."""
+        stat = os.stat(self.path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def is_indexed_copy_current(self) -> bool:
+        if not os.path.isfile(self.indexed_path):
+            return False
+        with SQLDbReader(self.indexed_path) as reader:
+            existing = {row[0] for row in reader.perform_read_query(
+                "SELECT name FROM sqlite_master WHERE type IN ('index', 'table')", {})}
+            if 'indexed_copy_source' not in existing:
+                return False
+            source_stamps = reader.perform_read_query('SELECT size, mtime_ns FROM indexed_copy_source', {})
+        if source_stamps != [self.get_source_stamp()]:
+            return False
+        return all(name in existing for name in self.required_indexes)
+
+    def build_indexed_copy(self) -> Path:
+        """Copies the export with the sqlite backup api into a temporary file, creates the indexes, analyzes the
+        tables and moves the result in place."""
+        temp_path = self.indexed_path.with_name(self.indexed_path.name + '.tmp')
+        if os.path.isfile(temp_path):
+            os.remove(temp_path)
+
+        source_stamp = self.get_source_stamp()
+        source = sqlite3.connect(f'{self.path.as_uri()}?mode=ro&immutable=1', uri=True)
+        target = sqlite3.connect(temp_path)
+        try:
+            source.backup(target)
+            for create_statement in self.required_indexes.values():
+                target.execute(create_statement)
+            target.execute('CREATE TABLE indexed_copy_source (size INTEGER, mtime_ns INTEGER)')
+            target.execute('INSERT INTO indexed_copy_source VALUES (?, ?)', source_stamp)
+            target.execute('ANALYZE')
+            target.commit()
+        finally:
+            target.close()
+            source.close()
+
+        os.replace(temp_path, self.indexed_path)
+        logging.info(f'built indexed copy of {self.path} at {self.indexed_path}')
+        return self.indexed_path
+
+    def prepare(self, build_indexes: bool = False) -> Path:
+        """Reports the query plans on the export and returns the path that should be read from: the indexed copy when
+        it is current or build_indexes allows building it, the original export otherwise."""
+        if self.is_indexed_copy_current():
+            with SQLDbReader(self.indexed_path) as reader:
+                self.report(self.get_plan_warnings(reader), self.indexed_path)
+            return self.indexed_path
+
+        with SQLDbReader(self.path) as reader:
+            warnings = self.get_plan_warnings(reader)
+        self.report(warnings, self.path)
+        if not warnings or not build_indexes:
+            return self.path
+
+        self.build_indexed_copy()
+        with SQLDbReader(self.indexed_path) as reader:
+            self.report(self.get_plan_warnings(reader), self.indexed_path)
+        return self.indexed_path
@@ -1,63 +1,257 @@
+import logging
+from functools import lru_cache
 from typing import Iterator
 
+from ReferenceDataCache import ReferenceDataCache
 from SQLDbReader import SQLDbReader
 from WDBDataclasses.WDBBeugel import WDBBeugel
+from WDBDataclasses.WDBBinaireData import WDBBinaireData
 from WDBDataclasses.WDBBord import WDBBord
 from WDBDataclasses.WDBOphanging import WDBOphanging
 from WDBDataclasses.WDBOpstelling import WDBOpstelling
+from WDBDataclasses.WDBOpstellingAggregate import WDBOpstellingAggregate
+
+
+@lru_cache(maxsize=None)
+def get_row_factory(record_type):
+    """Returns a sqlite3 row factory that builds a record_type named tuple straight from the row tuple, without
+    keyword arguments or intermediate lists. The columns of the query must be in the order of the fields; fields
+    missing at the end of the row get their default."""
+    new = tuple.__new__
+    fields = record_type._fields
+    field_count = len(fields)
+    tails = {missing: tuple(record_type._field_defaults[field] for field in fields[field_count - missing:])
+             for missing in range(1, field_count + 1)}
+
+    def row_factory(cursor, row):
+        if len(row) == field_count:
+            return new(record_type, row)
+        return new(record_type, row + tails[field_count - len(row)])
+
+    return row_factory
 
 
 class SQLiteQueryExecutor:
-    def __init__(self, sql_db_reader: SQLDbReader):
+    """Reads the WDB records. When opstelling_id_range (min_id, max_id) is given, only the opstellingen in that
+    inclusive id range and their children are read.
+    The reference tables (leverancierItem, fabricageType, sokkelAfmetingen, kleur, ondergrondType) are read once into
+    reference_data, the record queries select their foreign keys and the names are filled in while mapping the rows.
+    The beheerder keys of the opstellingen are resolved by the Processor (see BeheerderCache)."""
+
+    def __init__(self, sql_db_reader: SQLDbReader, opstelling_id_range: (int, int) = None,
+                 reference_data: ReferenceDataCache = None):
         self.sql_db_reader = sql_db_reader
+        self.opstelling_id_range = opstelling_id_range
+        self._reference_data = reference_data
+
+    @property
+    def reference_data(self) -> ReferenceDataCache:
+        if self._reference_data is None:
+            self._reference_data = ReferenceDataCache.load(self.sql_db_reader)
+        return self._reference_data
+
+    @property
+    def id_range_params(self) -> dict:
+        if self.opstelling_id_range is None:
+            return {}
+        return {'min_id': self.opstelling_id_range[0], 'max_id': self.opstelling_id_range[1]}
+
+    @staticmethod
+    def opstellingen_query(id_range: bool = False) -> str:
+        query = "SELECT id, zijdeVanDeRijweg, status, wegsegmentid, geometry, gemeente, wijzigingsDatum, toDelete, " \
+                "   gekozenBeheerder_fk, beheerder_fk, berekendeBeheerder_fk " \
+                "FROM opstelling "
+        if id_range:
+            query += "WHERE id BETWEEN :min_id AND :max_id "
+        query += "ORDER BY id"
+        return query
 
     def get_all_opstellingen(self) -> Iterator[WDBOpstelling]:
-        data = self.sql_db_reader.perform_read_query(
-            "SELECT id, zijdeVanDeRijweg, status, wegsegmentid FROM opstelling ORDER BY id",
-            {})
+        return self.sql_db_reader.iterate_read_query(
+            self.opstellingen_query(id_range=self.opstelling_id_range is not None), self.id_range_params,
+            row_factory=get_row_factory(WDBOpstelling))
 
-        for row in data:
-            yield WDBOpstelling(id=row[0], zijde_van_de_rijweg=row[1], status=row[2], wegsegment_id=row[3])
+    def _iterate_children(self, query_builder, ids: [int] = None, row_factory=None) -> Iterator:
+        if ids is not None:
+            return self.sql_db_reader.iterate_read_query(query_builder(ids), {}, row_factory=row_factory)
+        return self.sql_db_reader.iterate_read_query(query_builder(id_range=self.opstelling_id_range is not None),
+                                                     self.id_range_params, row_factory=row_factory)
 
-    def get_all_borden(self, opstelling_ids: [int]) -> Iterator[WDBBord]:
-        idstring = '(' + ','.join(map(str, opstelling_ids)) + ')'
+    @staticmethod
+    def borden_query(opstelling_ids: [int] = None, id_range: bool = False) -> str:
         query = "SELECT borden.id, aanzichten.hoek, aanzichten.opstelling_fk, y, borden.parameters, borden.code, " \
-                "   borden.folieType, borden.vorm, borden.breedte, borden.hoogte, leverancierItem.naam, fabricageType.naam " \
+                "   borden.folieType, borden.vorm, borden.breedte, borden.hoogte, borden.leverancierItem_fk, " \
+                "   borden.fabricageType_fk " \
                 "FROM aanzichten " \
-                "   LEFT JOIN borden on borden.aanzicht_fk = aanzichten.id " \
-                "   LEFT JOIN leverancierItem on borden.leverancierItem_fk = leverancierItem.key " \
-                "   LEFT JOIN fabricageType on borden.fabricageType_fk = fabricageType.key " \
-                f"WHERE aanzichten.opstelling_fk in {idstring} " \
-                "ORDER BY aanzichten.opstelling_fk, aanzichten.id , borden.id"
-        data = self.sql_db_reader.perform_read_query(query, {})
-
-        for row in data:
-            yield WDBBord(id=row[0], hoek=row[1], opstelling_id=row[2], y=row[3], parameters=row[4], code=row[5],
-                          folie_type=row[6], vorm=row[7], breedte=row[8], hoogte=row[9], leverancier=row[10],
-                          fabricage=row[11])
-
-    def get_all_ophangingen(self, opstelling_ids: [int]) -> Iterator[WDBOphanging]:
-        idstring = '(' + ','.join(map(str, opstelling_ids)) + ')'
-        query = "SELECT ophangingen.id, clientId, ophangingen.lengte, diameter, opstelling_fk, sokkelAfmetingen.naam " \
-                "FROM ophangingen " \
-                "LEFT JOIN sokkelAfmetingen on sokkelAfmetingen.key = sokkelAfmetingen_fk " \
-                f"WHERE ophangingen.opstelling_fk in {idstring} " \
-                "ORDER BY ophangingen.opstelling_fk, id"
-        data = self.sql_db_reader.perform_read_query(query, {})
-
-        for row in data:
-            yield WDBOphanging(id=row[0], client_id=row[1], lengte=row[2], diameter=row[3], opstelling_id=row[4],
-                               sokkel_naam=row[5])
-
-    def get_all_beugels(self, ophanging_ids: [int]) -> Iterator[WDBBeugel]:
-        idstring = '(' + ','.join(map(str, ophanging_ids)) + ')'
-        query = "SELECT bevestigingen.id, ophanging_fk, bord_fk " \
+                "   LEFT JOIN borden on borden.aanzicht_fk = aanzichten.id "
+        if opstelling_ids is not None:
+            idstring = '(' + ','.join(map(str, opstelling_ids)) + ')'
+            query += f"WHERE aanzichten.opstelling_fk in {idstring} "
+        elif id_range:
+            query += "WHERE aanzichten.opstelling_fk BETWEEN :min_id AND :max_id "
+        query += "ORDER BY aanzichten.opstelling_fk, aanzichten.id , borden.id"
+        return query
+
+    def get_all_borden(self, opstelling_ids: [int] = None) -> Iterator[WDBBord]:
+        return self._iterate_children(self.borden_query, opstelling_ids, self.reference_data.get_bord_row_factory())
+
+    @staticmethod
+    def ophangingen_query(opstelling_ids: [int] = None, id_range: bool = False) -> str:
+        query = "SELECT id, clientId, lengte, diameter, opstelling_fk, sokkelAfmetingen_fk, kleur_fk, " \
+                "   ondergrondType_fk " \
+                "FROM ophangingen "
+        if opstelling_ids is not None:
+            idstring = '(' + ','.join(map(str, opstelling_ids)) + ')'
+            query += f"WHERE ophangingen.opstelling_fk in {idstring} "
+        elif id_range:
+            query += "WHERE ophangingen.opstelling_fk BETWEEN :min_id AND :max_id "
+        query += "ORDER BY ophangingen.opstelling_fk, id"
+        return query
+
+    def get_all_ophangingen(self, opstelling_ids: [int] = None) -> Iterator[WDBOphanging]:
+        return self._iterate_children(self.ophangingen_query, opstelling_ids,
+                                      self.reference_data.get_ophanging_row_factory())
+
+    @staticmethod
+    def beugels_query(ophanging_ids: [int] = None, id_range: bool = False) -> str:
+        query = "SELECT bevestigingen.id, ophanging_fk, bord_fk, ophangingen.opstelling_fk " \
                 "FROM bevestigingen " \
-                "LEFT JOIN bevestigingsprofielen bp ON bp.id = bevestigingen.bevestigingsprofiel_fk " \
-                f"WHERE ophanging_fk in {idstring} " \
-                "ORDER BY ophanging_fk, bevestigingen.id" \
+                "JOIN ophangingen ON ophangingen.id = bevestigingen.ophanging_fk " \
+                "LEFT JOIN bevestigingsprofielen bp ON bp.id = bevestigingen.bevestigingsprofiel_fk "
+        if ophanging_ids is not None:
+            idstring = '(' + ','.join(map(str, ophanging_ids)) + ')'
+            query += f"WHERE ophanging_fk in {idstring} " \
+                     "ORDER BY ophanging_fk, bevestigingen.id"
+        else:
+            if id_range:
+                query += "WHERE ophangingen.opstelling_fk BETWEEN :min_id AND :max_id "
+            query += "ORDER BY ophangingen.opstelling_fk, ophangingen.id, bevestigingen.id"
+        return query
+
+    def get_all_beugels(self, ophanging_ids: [int] = None) -> Iterator[WDBBeugel]:
+        return self._iterate_children(self.beugels_query, ophanging_ids, get_row_factory(WDBBeugel))
+
+    @staticmethod
+    def binaire_data_query() -> str:
+        return "SELECT binaireData.id, naam, mime, md5, data, " \
+               "   COALESCE(binaireData.opstelling_fk, aanzichten.opstelling_fk), aanzicht_fk " \
+               "FROM binaireData " \
+               "LEFT JOIN aanzichten ON aanzichten.id = binaireData.aanzicht_fk " \
+               "ORDER BY binaireData.id"
+
+    def get_all_binaire_data(self, chunk_size: int = None) -> Iterator[WDBBinaireData]:
+        """Streams the binary data records, the data is the base64 text as stored in the export."""
+        return self.sql_db_reader.iterate_read_query(self.binaire_data_query(), {}, chunk_size,
+                                                     row_factory=get_row_factory(WDBBinaireData))
+
+    def get_binaire_data_chunks(self, chunk_size: int = None) -> Iterator[list]:
+        """Streams the binary data records in the lists of chunk_size records they are fetched in."""
+        return self.sql_db_reader.iterate_read_query_chunks(self.binaire_data_query(), {}, chunk_size,
+                                                            row_factory=get_row_factory(WDBBinaireData))
+
+    @staticmethod
+    def aanzicht_borden_query(aanzicht_ids: [int] = None) -> str:
+        query = "SELECT aanzicht_fk, id FROM borden "
+        if aanzicht_ids is not None:
+            query += f"WHERE aanzicht_fk in ({','.join(map(str, aanzicht_ids))}) "
+        return query + "ORDER BY aanzicht_fk, id"
+
+    def get_bord_ids(self, aanzicht_ids: [int]) -> dict:
+        """The ids of the borden on each of the aanzichten."""
+        bord_ids = {}
+        if aanzicht_ids:
+            for aanzicht_id, bord_id in self.sql_db_reader.perform_read_query(
+                    self.aanzicht_borden_query(aanzicht_ids), {}):
+                bord_ids.setdefault(aanzicht_id, []).append(bord_id)
+        return bord_ids
+
+    @classmethod
+    def get_queries(cls) -> dict:
+        """The queries this executor performs, both the batched (IN list) and the joined variants, keyed on a
+        descriptive name. Used to check the query plans against a database."""
+        return {'opstellingen': cls.opstellingen_query(),
+                'borden (batch)': cls.borden_query([0]),
+                'ophangingen (batch)': cls.ophangingen_query([0]),
+                'beugels (batch)': cls.beugels_query([0]),
+                'borden (joined)': cls.borden_query(),
+                'ophangingen (joined)': cls.ophangingen_query(),
+                'beugels (joined)': cls.beugels_query(),
+                'binaireData': cls.binaire_data_query(),
+                'borden of aanzichten': cls.aanzicht_borden_query([0])}
+
+    def get_opstelling_id_ranges(self, amount: int) -> [(int, int)]:
+        """Splits the opstellingen in (at most) amount consecutive id ranges holding about the same number of
+        opstellingen."""
+        count = self.sql_db_reader.perform_read_query("SELECT count(*) FROM opstelling", {})[0][0]
+        if count == 0:
+            return []
+        amount = max(1, min(amount, count))
+        bounds = [self.sql_db_reader.perform_read_query(
+            "SELECT id FROM opstelling ORDER BY id LIMIT 1 OFFSET :offset", {'offset': count * i // amount})[0][0]
+                  for i in range(amount)]
+        max_id = self.sql_db_reader.perform_read_query("SELECT max(id) FROM opstelling", {})[0][0]
+        return [(bound, bounds[i + 1] - 1 if i + 1 < len(bounds) else max_id) for i, bound in enumerate(bounds)]
+
+    def start_after(self, opstelling_id: int):
+        """Narrows the opstellingen (and their children) to those with an id above opstelling_id, e.g. to resume an
+        interrupted conversion."""
+        if self.opstelling_id_range is None:
+            max_id = self.sql_db_reader.perform_read_query("SELECT max(id) FROM opstelling", {})[0][0]
+            self.opstelling_id_range = (opstelling_id + 1, opstelling_id if max_id is None else max_id)
+        else:
+            self.opstelling_id_range = (max(self.opstelling_id_range[0], opstelling_id + 1),
+                                        self.opstelling_id_range[1])
+
+    def get_all_opstelling_aggregates(self) -> Iterator[WDBOpstellingAggregate]:
+        """Walks opstelling, aanzichten/borden, ophangingen and bevestigingen in one ordered merge-join pass on
+        opstelling_fk. Every query is executed once and streamed, so no IN (...) lists are needed."""
+        borden = _OrderedChildStream(self.get_all_borden(), 'borden')
+        ophangingen = _OrderedChildStream(self.get_all_ophangingen(), 'ophangingen')
+        beugels = _OrderedChildStream(self.get_all_beugels(), 'beugels')
+
+        for opstelling in self.get_all_opstellingen():
+            yield WDBOpstellingAggregate(opstelling=opstelling,
+                                         borden=borden.take(opstelling.id),
+                                         ophangingen=ophangingen.take(opstelling.id),
+                                         beugels=beugels.take(opstelling.id))
+        for stream in (borden, ophangingen, beugels):
+            stream.finish()
+
+
+class _OrderedChildStream:
+    """Wraps records ordered by opstelling_id and hands out the records of one opstelling at a time. Records without
+    opstelling or of an opstelling that is never asked for (it doesn't exist, the batched extraction leaves them out
+    as well) are skipped and counted, finish() logs them."""
+
+    def __init__(self, records: Iterator, name: str = 'records'):
+        self._records = iter(records)
+        self._head = next(self._records, None)
+        self.name = name
+        self.skipped = 0
+        self.skipped_opstelling_ids = set()
+
+    def take(self, opstelling_id: int) -> list:
+        taken = []
+        while self._head is not None and (self._head.opstelling_id is None or
+                                          self._head.opstelling_id <= opstelling_id):
+            if self._head.opstelling_id == opstelling_id:
+                taken.append(self._head)
+            else:
+                self._skip()
+            self._head = next(self._records, None)
+        return taken
 
-        data = self.sql_db_reader.perform_read_query(query, {})
+    def _skip(self):
+        self.skipped += 1
+        self.skipped_opstelling_ids.add(self._head.opstelling_id)
 
-        for row in data:
-            yield WDBBeugel(id=row[0], ophanging_id=row[1], bord_id=row[2])
+    def finish(self):
+        """Skips the records after the last opstelling and logs the skipped records."""
+        while self._head is not None:
+            self._skip()
+            self._head = next(self._records, None)
+        if self.skipped:
+            ids = sorted(self.skipped_opstelling_ids, key=lambda opstelling_id: (opstelling_id is not None,
+                                                                                  opstelling_id))
+            logging.warning(f'skipped {self.skipped} {self.name} of a missing opstelling: opstelling_fk '
+                            f'{", ".join(map(str, ids[:10]))}{", ..." if len(ids) > 10 else ""}')
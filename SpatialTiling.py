@@ -0,0 +1,82 @@
+import math
+import re
+
+from WDBDataclasses.WDBOpstelling import WDBOpstelling
+
+NO_TILE = 'zonder-locatie'
+# (min x, min y, max x, max y) of Belgium in Lambert72, the area a grid can be expected to cover
+BELGIUM_EXTENT = (20000.0, 20000.0, 300000.0, 250000.0)
+
+
+class GridTiling:
+    """Assigns opstellingen to the square cells of a grid over their Lambert72 point, tiles are named
+    <column>_<row> counted from the origin in cells of cell_size meters."""
+    name = 'grid'
+
+    def __init__(self, cell_size: float = 10000.0):
+        if cell_size <= 0:
+            raise ValueError('cell_size must be positive')
+        self.cell_size = cell_size
+
+    def get_tile(self, opstelling: WDBOpstelling, point: (float, float)) -> str:
+        if point is None:
+            return NO_TILE
+        return f'{math.floor(point[0] / self.cell_size)}_{math.floor(point[1] / self.cell_size)}'
+
+    def count_tiles(self, extent: (float,) = BELGIUM_EXTENT) -> int:
+        """The amount of cells that cover the extent, the tile without a location included."""
+        min_x, min_y, max_x, max_y = extent
+        columns = math.floor(max_x / self.cell_size) - math.floor(min_x / self.cell_size) + 1
+        rows = math.floor(max_y / self.cell_size) - math.floor(min_y / self.cell_size) + 1
+        return columns * rows + 1
+
+    def get_extent(self, tile: str) -> [float]:
+        """The (min x, min y, max x, max y) of the cell, None for opstellingen without a location."""
+        if tile == NO_TILE:
+            return None
+        column, row = map(int, tile.split('_'))
+        return [column * self.cell_size, row * self.cell_size,
+                (column + 1) * self.cell_size, (row + 1) * self.cell_size]
+
+
+class GemeenteTiling:
+    """Assigns opstellingen to a tile per gemeente, named after the gemeente in lower case with every run of
+    characters that can't be used in a file name replaced by a dash."""
+    name = 'gemeente'
+
+    @staticmethod
+    def get_tile(opstelling: WDBOpstelling, point: (float, float)) -> str:
+        if not opstelling.gemeente:
+            return NO_TILE
+        return re.sub(r'[^\w]+', '-', opstelling.gemeente.strip().lower()).strip('-') or NO_TILE
+
+    @staticmethod
+    def count_tiles(extent: (float,) = BELGIUM_EXTENT) -> int:
+        """Unknown before the opstellingen are read, there are a few hundred gemeenten."""
+        return None
+
+    @staticmethod
+    def get_extent(tile: str) -> [float]:
+        return None
+
+
+TILINGS = {'grid': GridTiling, 'gemeente': GemeenteTiling}
+
+
+class TileExtent:
+    """The bounding box of the opstellingen in a tile and how many there are."""
+
+    def __init__(self):
+        self.opstellingen = 0
+        self.bbox = None
+
+    def add(self, point: (float, float)):
+        self.opstellingen += 1
+        if point is None:
+            return
+        x, y = point
+        if self.bbox is None:
+            self.bbox = [x, y, x, y]
+        else:
+            bbox = self.bbox
+            bbox[0], bbox[1], bbox[2], bbox[3] = min(bbox[0], x), min(bbox[1], y), max(bbox[2], x), max(bbox[3], y)
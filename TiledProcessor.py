@@ -0,0 +1,123 @@
+import json
+from pathlib import Path
+
+from ProcessingMetrics import ProcessingMetrics
+from Processor import Processor
+from ProcessorConfig import ProcessorConfig
+from SpatialTiling import GridTiling, TileExtent
+from SQLiteQueryExecutor import SQLiteQueryExecutor
+from TripleSink import TripleSink, create_sink
+
+# every tile keeps its file open until the end of the run, with compression also a CompressedWriter thread
+MAX_TILES = 1000
+
+
+def check_tiling(tiling, max_tiles: int = MAX_TILES):
+    """Raises when the tiling is expected to give more than max_tiles tiles over Belgium, so a tile size that is too
+    small fails before the conversion starts instead of running out of file handles."""
+    tiles = tiling.count_tiles()
+    if tiles is not None and tiles > max_tiles:
+        raise ValueError(f'the {tiling.name} tiling gives up to {tiles} tiles, more than the {max_tiles} files that '
+                         f'can be open at once, use larger tiles')
+
+
+class TiledProcessor(Processor):
+    """Converts the opstellingen into one file per tile of a spatial tiling (see SpatialTiling) instead of files of
+    write_size opstellingen in id order. Every opstelling is written to the tile of its point together with its
+    borden, ophangingen and beugels, so a tile holds complete assets. A manifest lists per tile its file, the cell
+    extent, the bounding box of its opstellingen and the amount of opstellingen and triples.
+    The opstellingen are read in id order, so every tile can get opstellingen until the end of the run and the file of
+    every tile stays open. That is why a tiled export needs a streaming sink ('nt', 'ttl' or 'binary'): with 'rdflib'
+    the graphs of all tiles would be kept in memory. Only with deterministic the triples of every tile are kept to be
+    sorted when the tiles are closed. A tile whose opstellingen were all quarantined gets no file.
+    To stay within the limit of open files, the conversion is refused when the tiling gives more than max_tiles
+    tiles: upfront when a grid over Belgium already has more cells, otherwise when the tile after max_tiles is
+    needed."""
+
+    mode = 'tiled'
+
+    def __init__(self, executor: SQLiteQueryExecutor = None, bord_register: Path = None,
+                 config: ProcessorConfig = None, metrics: ProcessingMetrics = None, tiling=None,
+                 manifest_path: Path = None, max_tiles: int = MAX_TILES):
+        """config defaults to the 'ttl' sink and the output prefix 'tile'."""
+        super().__init__(executor=executor, bord_register=bord_register,
+                         config=ProcessorConfig(output_prefix='tile', sink_type='ttl') if config is None else config,
+                         metrics=metrics)
+        self.tiling = GridTiling() if tiling is None else tiling
+        check_tiling(self.tiling, max_tiles)
+        self.max_tiles = max_tiles
+        self.manifest_path = Path(f'{self.output_prefix}_manifest.json') if manifest_path is None else manifest_path
+        self.tile_sinks = {}
+        self.tile_extents = {}
+        self.tile_triples = {}
+        self.tile_agents = {}
+
+    def get_tile_sink(self, tile: str) -> TripleSink:
+        sink = self.tile_sinks.get(tile)
+        if sink is None:
+            if len(self.tile_sinks) >= self.max_tiles:
+                raise ValueError(f'the {self.tiling.name} tiling needs more than {self.max_tiles} tiles, more files '
+                                 f'than can be open at once, use larger tiles')
+            sink = create_sink(self.config.sink_type, f'{self.output_prefix}_{tile}', sort=self.config.deterministic,
+                               compression=self.config.compression)
+            self.tile_sinks[tile] = sink
+            self.tile_extents[tile] = TileExtent()
+        return sink
+
+    def convert(self, batch_size: int = 100, write_size: int = 12500, joined: bool = True):
+        """Converts all opstellingen with the joined extraction. write_size is not used: every tile is one file."""
+        if self.quarantine is not None:
+            self.quarantine.start()
+        aggregates = self.metrics.timed_iter('extract', self.executor.get_all_opstelling_aggregates())
+        for batch in self.batched(aggregates, batch_size):
+            with self.metrics.measure('geometry', items=len(batch)):
+                geometries, points = self.geometry_converter.convert(
+                    [aggregate.opstelling.geometry for aggregate in batch])
+            for aggregate, geometry, point in zip(batch, geometries, points):
+                tile = self.tiling.get_tile(aggregate.opstelling, point)
+                sink = self.get_tile_sink(tile)
+                self.file_agents = self.tile_agents.setdefault(tile, set())
+                with self.metrics.measure('convert', items=1):
+                    if self.convert_aggregate(sink, aggregate, geometry):
+                        self.tile_extents[tile].add(point)
+
+        for tile, sink in self.tile_sinks.items():
+            if len(sink) == 0:
+                sink.close()
+                continue
+            self.tile_triples[tile] = len(sink)
+            self.write_and_close(sink)
+        self.metrics.add_triples('convert', self.triples_written)
+        self.write_checksums()
+        self.write_manifest()
+        if self.quarantine is not None:
+            self.quarantine.close()
+        self.metrics.finish()
+
+    def write_and_close(self, sink: TripleSink):
+        amount_triples = len(sink)
+        with self.metrics.measure('write', items=1) as stage:
+            sink.close()
+            stage.triples += amount_triples
+            stage.bytes += sink.size
+            stage.raw_bytes += sink.raw_size
+        self.triples_written += amount_triples
+        self.written_files.append(sink.file_name)
+        self.add_checksum(sink.file_name)
+        print(f'wrote {sink.file_name} with {amount_triples} triples{self.get_size_report(sink, amount_triples)}')
+
+    def write_manifest(self):
+        tiles = {}
+        for tile in sorted(self.tile_triples):
+            extent = self.tile_extents[tile]
+            tiles[tile] = {'file': Path(self.tile_sinks[tile].file_name).name,
+                           'extent': self.tiling.get_extent(tile),
+                           'bbox': extent.bbox,
+                           'opstellingen': extent.opstellingen,
+                           'sha256': self.checksums.get(self.tile_sinks[tile].file_name),
+                           'triples': self.tile_triples[tile]}
+        with open(self.manifest_path, 'w', encoding='utf-8') as manifest_file:
+            json.dump({'tiling': self.tiling.name, 'crs': 'http://www.opengis.net/def/crs/EPSG/0/31370',
+                       'sink_type': self.config.sink_type, 'compression': self.config.compression, 'tiles': tiles},
+                      manifest_file, indent=2)
+        print(f'wrote {self.manifest_path} with {len(tiles)} tiles')
@@ -0,0 +1,284 @@
+import hashlib
+import os
+from functools import lru_cache
+
+from rdflib import Graph, Namespace, URIRef, Literal, BNode, XSD
+
+import OTLVocabulary as otl
+from BinaryRDF import MAGIC, BinaryRDFEncoder
+from CompressedOutput import COMPRESSION_SUFFIXES, get_sizes, open_output
+
+PREFIXES = {
+    'asset': otl.ASSET,
+    'installatie': str(otl.INSTALLATIE),
+    'wr': 'https://www.vlaanderen.be/digitaal-vlaanderen/onze-oplossingen/wegenregister/',
+    'imel': str(otl.IMPLEMENTATIEELEMENT),
+    'abs': str(otl.ABSTRACTEN),
+    'sign': str(otl.SIGNALISATIE),
+    'kl': str(otl.CONCEPT),
+    'onderdeel': str(otl.ONDERDEEL),
+    'wegcode': f'{otl.WEGCODE}/media/image/orig/',
+    'geo': str(otl.GEO)}
+
+
+def get_temp_file_name(file_name: str) -> str:
+    """Sinks write their file under this name and rename it to file_name once it is complete, so an interrupted run
+    never leaves a truncated file under the final name."""
+    return f'{file_name}.tmp'
+
+
+_LITERAL_ESCAPES = str.maketrans({'\\': '\\\\', '"': '\\"', '\n': '\\n', '\r': '\\r'})
+
+
+class TripleSink:
+    """Receives the triples of one output file. Sinks implement add() and len() like an rdflib Graph so the
+    Processor can write to any of them. close() finishes the file (renaming it from its temporary name, see
+    get_temp_file_name), after which raw_size holds the size of the
+    serialization and size the size of the file in bytes; they differ for compressed files."""
+    extension = ''
+
+    def __init__(self, file_name: str, compression: str = None):
+        self.file_name = file_name
+        self.compression = compression
+        self.raw_size = 0
+        self.size = 0
+
+    def add(self, triple: tuple):
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
+
+
+class TripleList(list):
+    """Collects triples in a list, with the add() of a sink, e.g. to hand them to another thread or to only add them
+    to a sink once a whole opstelling is converted."""
+    add = list.append
+
+
+class GraphSink(Graph):
+    """Collects the triples in an in-memory rdflib Graph and serializes it as turtle when closed."""
+    extension = 'ttl'
+
+    def __init__(self, file_name: str, compression: str = None):
+        super().__init__()
+        self.file_name = file_name
+        self.compression = compression
+        self.raw_size = 0
+        self.size = 0
+        for prefix, namespace in PREFIXES.items():
+            self.bind(prefix, Namespace(namespace))
+
+    def close(self, commit_pending_transaction=False):
+        if len(self) > 0:
+            temp_file_name = get_temp_file_name(self.file_name)
+            if self.compression is None:
+                self.serialize(destination=temp_file_name)
+                output = None
+            else:
+                output = open_output(temp_file_name, self.compression, binary=True)
+                output.write(self.serialize(format='turtle', encoding='utf-8'))
+                output.close()
+            os.replace(temp_file_name, self.file_name)
+            self.raw_size, self.size = get_sizes(output, self.file_name)
+        super().close(commit_pending_transaction)
+
+
+class NTriplesSink(TripleSink):
+    """Writes every triple as an N-Triples line to a buffered file as soon as it is added. Nothing is kept in
+    memory, so duplicate triples are written as often as they are added. The file is created on the first triple."""
+    extension = 'nt'
+
+    def __init__(self, file_name: str, compression: str = None, buffer_size: int = 1 << 20):
+        super().__init__(file_name, compression)
+        self.buffer_size = buffer_size
+        self._file = None
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _open(self):
+        self._file = open_output(get_temp_file_name(self.file_name), self.compression, buffer_size=self.buffer_size)
+
+    @staticmethod
+    def format_term(term) -> str:
+        if isinstance(term, URIRef):
+            return f'<{term}>'
+        if isinstance(term, BNode):
+            return f'_:{term}'
+        return NTriplesSink.format_literal(term)
+
+    @staticmethod
+    def format_literal(literal: Literal) -> str:
+        lexical = str(literal).translate(_LITERAL_ESCAPES)
+        if literal.datatype == XSD.decimal and '.' not in lexical and 'e' not in lexical and 'E' not in lexical:
+            # same lexical form as the rdflib turtle serializer
+            lexical += '.0'
+        if literal.language is not None:
+            return f'"{lexical}"@{literal.language}'
+        if literal.datatype is not None:
+            return f'"{lexical}"^^<{literal.datatype}>'
+        return f'"{lexical}"'
+
+    def add(self, triple: tuple):
+        if self._file is None:
+            self._open()
+        s, p, o = triple
+        format_term = self.format_term
+        self._file.write(f'{format_term(s)} <{p}> {format_term(o)} .\n')
+        self._count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            os.replace(get_temp_file_name(self.file_name), self.file_name)
+            self.raw_size, self.size = get_sizes(self._file, self.file_name)
+            self._file = None
+
+
+class TurtleSink(NTriplesSink):
+    """Streams turtle: writes the prefixes, abbreviates IRIs with them and groups consecutive triples of the same
+    subject in a predicate list. Like NTriplesSink nothing but the current subject is kept in memory."""
+    extension = 'ttl'
+
+    def __init__(self, file_name: str, compression: str = None, buffer_size: int = 1 << 20):
+        super().__init__(file_name, compression, buffer_size)
+        self._subject = None
+
+    def _open(self):
+        super()._open()
+        for prefix, namespace in PREFIXES.items():
+            self._file.write(f'@prefix {prefix}: <{namespace}> .\n')
+        self._file.write('\n')
+
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def format_uri(uri: URIRef) -> str:
+        for prefix, namespace in PREFIXES.items():
+            if uri.startswith(namespace):
+                local_name = uri[len(namespace):]
+                if _is_local_name(local_name):
+                    return f'{prefix}:{local_name}'
+        return f'<{uri}>'
+
+    def format_term(self, term) -> str:
+        if isinstance(term, URIRef):
+            return self.format_uri(term)
+        if isinstance(term, BNode):
+            return f'_:{term}'
+        formatted = self.format_literal(term)
+        if term.datatype == XSD.decimal and 'e' not in formatted and 'E' not in formatted:
+            # shorthand notation, e.g. 1100.0
+            return formatted[1:formatted.index('"', 1)]
+        return formatted
+
+    def add(self, triple: tuple):
+        if self._file is None:
+            self._open()
+        s, p, o = triple
+        if s == self._subject:
+            self._file.write(f' ;\n    {self.format_uri(p)} {self.format_term(o)}')
+        else:
+            if self._subject is not None:
+                self._file.write(' .\n')
+            self._subject = s
+            self._file.write(f'{self.format_term(s)} {self.format_uri(p)} {self.format_term(o)}')
+        self._count += 1
+
+    def close(self):
+        if self._file is not None and self._subject is not None:
+            self._file.write(' .\n')
+        self._subject = None
+        super().close()
+
+
+class BinaryRDFSink(NTriplesSink):
+    """Streams the triples in the dictionary encoded binary format of BinaryRDF. Only the dictionary of the terms
+    written so far is kept in memory."""
+    extension = 'rdfb'
+
+    def __init__(self, file_name: str, compression: str = None, buffer_size: int = 1 << 20):
+        super().__init__(file_name, compression, buffer_size)
+        self._encoder = BinaryRDFEncoder()
+        self._buffer = bytearray()
+
+    def _open(self):
+        self._file = open_output(get_temp_file_name(self.file_name), self.compression, binary=True,
+                                 buffer_size=self.buffer_size)
+        self._file.write(MAGIC)
+
+    def add(self, triple: tuple):
+        if self._file is None:
+            self._open()
+        self._encoder.encode(triple, self._buffer)
+        self._count += 1
+        if len(self._buffer) >= 65536:
+            self._file.write(bytes(self._buffer))
+            self._buffer.clear()
+
+    def close(self):
+        if self._file is not None and self._buffer:
+            self._file.write(bytes(self._buffer))
+            self._buffer.clear()
+        super().close()
+
+
+class SortedSink(TripleSink):
+    """Collects the triples of a file and adds them to the wrapped sink in N-Triples order when closed, so the same
+    triples always give the same file. Duplicate triples are written once. Keeps all triples of the file in memory."""
+
+    def __init__(self, sink):
+        super().__init__(sink.file_name, sink.compression)
+        self.sink = sink
+        self.extension = sink.extension
+        self._triples = set()
+
+    def add(self, triple: tuple):
+        self._triples.add(triple)
+
+    def __len__(self) -> int:
+        return len(self._triples)
+
+    @staticmethod
+    def get_sort_key(triple: tuple) -> tuple:
+        format_term = NTriplesSink.format_term
+        return format_term(triple[0]), format_term(triple[1]), format_term(triple[2])
+
+    def close(self):
+        if self._triples:
+            for triple in sorted(self._triples, key=self.get_sort_key):
+                self.sink.add(triple)
+            self._triples = set()
+        self.sink.close()
+        self.raw_size, self.size = self.sink.raw_size, self.sink.size
+
+
+def _is_local_name(local_name: str) -> bool:
+    if local_name == '' or local_name[-1] == '.' or local_name[0] in '.-':
+        return False
+    return all(character.isalnum() or character in '_-.' for character in local_name)
+
+
+SINKS = {'rdflib': GraphSink, 'nt': NTriplesSink, 'ttl': TurtleSink, 'binary': BinaryRDFSink}
+
+
+def create_sink(sink_type: str, file_name_without_extension: str, sort: bool = False, compression: str = None):
+    """compression: None, 'gzip' or 'zstd', adds .gz or .zst to the file name."""
+    sink_class = SINKS[sink_type]
+    suffix = '' if compression is None else COMPRESSION_SUFFIXES[compression]
+    sink = sink_class(f'{file_name_without_extension}.{sink_class.extension}{suffix}', compression)
+    if sort:
+        return SortedSink(sink)
+    return sink
+
+
+def get_file_checksum(file_name: str) -> str:
+    checksum = hashlib.sha256()
+    with open(file_name, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            checksum.update(block)
+    return checksum.hexdigest()
@@ -1,9 +1,8 @@
-import dataclasses
+from typing import NamedTuple
 
 
-@dataclasses.dataclass
-class WDBBeugel:
+class WDBBeugel(NamedTuple):
     id: int = -1
     ophanging_id: int = -1
     bord_id: int = -1
-
+    opstelling_id: int = -1
@@ -0,0 +1,11 @@
+from typing import NamedTuple
+
+
+class WDBBinaireData(NamedTuple):
+    id: int = -1
+    naam: str = ''
+    mime: str = ''
+    md5: str = ''
+    data: str = ''
+    opstelling_id: int = -1
+    aanzicht_id: int = -1
@@ -1,8 +1,7 @@
-import dataclasses
+from typing import NamedTuple
 
 
-@dataclasses.dataclass
-class WDBBord:
+class WDBBord(NamedTuple):
     id: int = -1
     hoek: float = -1.0
     opstelling_id: int = -1
@@ -1,8 +1,7 @@
-import dataclasses
+from typing import NamedTuple
 
 
-@dataclasses.dataclass
-class WDBOphanging:
+class WDBOphanging(NamedTuple):
     id: int = -1
     client_id: str = ''
     lengte: int = -1
@@ -11,4 +10,3 @@ class WDBOphanging:
     sokkel_naam: str = ''
     kleur: str = ''
     ondergrond: str = ''
-
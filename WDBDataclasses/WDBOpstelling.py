@@ -1,9 +1,15 @@
-import dataclasses
+from typing import NamedTuple
 
 
-@dataclasses.dataclass
-class WDBOpstelling:
+class WDBOpstelling(NamedTuple):
     id: int = -1
     zijde_van_de_rijweg: str = ''
     status: str = ''
     wegsegment_id: int = -1
+    geometry: str = ''
+    gemeente: str = ''
+    wijzigings_datum: str = ''
+    to_delete: str = ''
+    gekozen_beheerder_id: int = None
+    beheerder_id: int = None
+    berekende_beheerder_id: int = None
@@ -0,0 +1,14 @@
+import dataclasses
+
+from WDBDataclasses.WDBBeugel import WDBBeugel
+from WDBDataclasses.WDBBord import WDBBord
+from WDBDataclasses.WDBOphanging import WDBOphanging
+from WDBDataclasses.WDBOpstelling import WDBOpstelling
+
+
+@dataclasses.dataclass
+class WDBOpstellingAggregate:
+    opstelling: WDBOpstelling = None
+    borden: [WDBBord] = dataclasses.field(default_factory=list)
+    ophangingen: [WDBOphanging] = dataclasses.field(default_factory=list)
+    beugels: [WDBBeugel] = dataclasses.field(default_factory=list)
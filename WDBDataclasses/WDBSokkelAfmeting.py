@@ -0,0 +1,8 @@
+from typing import NamedTuple
+
+
+class WDBSokkelAfmeting(NamedTuple):
+    naam: str = ''
+    hoogte: int = -1
+    breedte: int = -1
+    diepte: int = -1
@@ -0,0 +1,157 @@
+"""Generates a synthetic WDB export of any size from a template export, for benchmarking.
+
+The generated database has the schema of the template, with the reference tables (leverancierItem, sokkelAfmetingen,
+beheerder, ...) copied as they are. Every opstelling is a copy of a random opstelling of the template together with its
+aanzichten, borden, ophangingen, bevestigingsprofielen and bevestigingen (and, with binary_data, its binaireData),
+with new ids and the foreign keys remapped. The distributions of borden per aanzicht, ophangingen, bevestigingen,
+codes, vormen and sokkels therefore follow the template. The point of a copy is moved by a random offset, so the
+opstellingen are spread out like the template but don't coincide. Tables the converter doesn't read (fotos, tags,
+...) are created empty.
+
+Usage: python benchmarks/generate_wdb.py <opstellingen> <output> [--template db] [--seed n] [--binary-data]"""
+import argparse
+import logging
+import os
+import random
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+TEMPLATE = Path(__file__).resolve().parent.parent / 'verkeersborden300.sqlite'
+
+# the tables that are copied per opstelling, in insert order, with the table their foreign keys refer to
+CLONED_TABLES = {
+    'opstelling': {},
+    'aanzichten': {'opstelling_fk': 'opstelling'},
+    'borden': {'aanzicht_fk': 'aanzichten'},
+    'ophangingen': {'opstelling_fk': 'opstelling'},
+    'bevestigingsprofielen': {'bord_fk': 'borden'},
+    'bevestigingen': {'ophanging_fk': 'ophangingen', 'bevestigingsprofiel_fk': 'bevestigingsprofielen'},
+    'binaireData': {'opstelling_fk': 'opstelling', 'aanzicht_fk': 'aanzichten'}}
+EMPTY_TABLES = ('fotos', 'tags', 'bijlages', 'beugels', 'kalender')
+
+_POINT = re.compile(r'POINT \(([-\d.]+) ([-\d.]+)\)')
+
+
+class TemplateFamilies:
+    """The rows of every template opstelling and its children, per table, keyed on the template opstelling id."""
+
+    def __init__(self, con: sqlite3.Connection, binary_data: bool = False):
+        self.columns = {table: [row[1] for row in con.execute(f'PRAGMA table_info({table})')]
+                        for table in CLONED_TABLES}
+        self.tables = [table for table in CLONED_TABLES if binary_data or table != 'binaireData']
+        rows = {table: con.execute(f'SELECT * FROM {table} ORDER BY id').fetchall() for table in self.tables}
+
+        owner = {'opstelling': {row[0]: row[0] for row in rows['opstelling']}}
+        for table in self.tables[1:]:
+            owner[table] = {}
+            for row in rows[table]:
+                for column, parent in CLONED_TABLES[table].items():
+                    parent_id = row[self.columns[table].index(column)]
+                    if parent_id is not None and parent_id in owner.get(parent, {}):
+                        owner[table][row[0]] = owner[parent][parent_id]
+                        break
+
+        self.families = {opstelling_id: {table: [] for table in self.tables} for opstelling_id in owner['opstelling']}
+        for table in self.tables:
+            for row in rows[table]:
+                opstelling_id = owner[table].get(row[0])
+                if opstelling_id is not None:
+                    self.families[opstelling_id][table].append(row)
+        self.opstelling_ids = sorted(self.families)
+
+
+class WDBGenerator:
+    def __init__(self, template: Path = TEMPLATE, seed: int = 0, binary_data: bool = False, spread: float = 5000.0):
+        """spread: the standard deviation in meters of the offset of the copied points."""
+        self.template = template
+        self.random = random.Random(seed)
+        self.binary_data = binary_data
+        self.spread = spread
+
+    def create_schema(self, template_con: sqlite3.Connection, con: sqlite3.Connection):
+        statements = template_con.execute(
+            "SELECT type, name, sql FROM sqlite_master WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%' "
+            "ORDER BY type = 'index', rowid").fetchall()
+        for _, _, sql in statements:
+            con.execute(sql)
+        tables = [name for type_, name, _ in statements if type_ == 'table']
+        for table in tables:
+            if table in CLONED_TABLES or table in EMPTY_TABLES:
+                continue
+            rows = template_con.execute(f'SELECT * FROM {table}').fetchall()
+            if rows:
+                con.executemany(f'INSERT INTO {table} VALUES ({",".join("?" * len(rows[0]))})', rows)
+
+    def move_geometry(self, geometry: str) -> str:
+        match = _POINT.fullmatch(geometry) if geometry is not None else None
+        if match is None:
+            return geometry
+        x = float(match.group(1)) + self.random.gauss(0.0, self.spread)
+        y = float(match.group(2)) + self.random.gauss(0.0, self.spread)
+        return f'POINT ({x:.6f} {y:.6f})'
+
+    def generate(self, output: Path, opstellingen: int, batch_size: int = 10000):
+        """Writes a database with the given amount of opstellingen to output, replacing an existing file."""
+        start = time.perf_counter()
+        template_con = sqlite3.connect(f'{self.template.resolve().as_uri()}?mode=ro', uri=True)
+        families = TemplateFamilies(template_con, binary_data=self.binary_data)
+        if os.path.isfile(output):
+            os.remove(output)
+        con = sqlite3.connect(output)
+        con.execute('PRAGMA journal_mode = OFF')
+        con.execute('PRAGMA synchronous = OFF')
+        self.create_schema(template_con, con)
+        template_con.close()
+
+        next_ids = {table: 1 for table in families.tables}
+        id_indexes = {table: families.columns[table].index('id') for table in families.tables}
+        fk_indexes = {table: [(families.columns[table].index(column), parent)
+                              for column, parent in CLONED_TABLES[table].items()]
+                      for table in families.tables}
+        geometry_index = families.columns['opstelling'].index('geometry')
+        inserts = {table: f'INSERT INTO {table} VALUES ({",".join("?" * len(families.columns[table]))})'
+                   for table in families.tables}
+
+        batch = {table: [] for table in families.tables}
+        for count in range(1, opstellingen + 1):
+            family = families.families[self.random.choice(families.opstelling_ids)]
+            new_ids = {}
+            for table in families.tables:
+                table_ids = new_ids[table] = {}
+                for row in family[table]:
+                    row = list(row)
+                    table_ids[row[id_indexes[table]]] = next_ids[table]
+                    row[id_indexes[table]] = next_ids[table]
+                    next_ids[table] += 1
+                    for index, parent in fk_indexes[table]:
+                        if row[index] is not None:
+                            row[index] = new_ids[parent].get(row[index])
+                    if table == 'opstelling':
+                        row[geometry_index] = self.move_geometry(row[geometry_index])
+                    batch[table].append(row)
+
+            if count % batch_size == 0 or count == opstellingen:
+                for table, rows in batch.items():
+                    con.executemany(inserts[table], rows)
+                    rows.clear()
+                con.commit()
+                logging.info(f'{count} opstellingen generated')
+
+        con.commit()
+        con.execute('ANALYZE')
+        con.close()
+        logging.info(f'generated {output} with {opstellingen} opstellingen in {time.perf_counter() - start:.1f} s')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generates a synthetic WDB export from a template export.')
+    parser.add_argument('opstellingen', type=int)
+    parser.add_argument('output', type=Path)
+    parser.add_argument('--template', type=Path, default=TEMPLATE)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--binary-data', action='store_true', help='also copy the binaireData of the opstellingen')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
+    WDBGenerator(args.template, seed=args.seed, binary_data=args.binary_data).generate(args.output, args.opstellingen)
@@ -0,0 +1,72 @@
+"""Compares reading the borden of a WDB export into dataclass records (built from the row tuples with keyword
+arguments, as the executor used to) with the named tuples built by the sqlite3 row factory of the executor.
+
+Reports the time to read all records and the memory the list of records takes (tracemalloc).
+Usage: python benchmarks/record_types.py [database] [repeat]"""
+import dataclasses
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from SQLDbReader import SQLDbReader  # noqa: E402
+from ReferenceDataCache import ReferenceDataCache  # noqa: E402
+from SQLiteQueryExecutor import SQLiteQueryExecutor  # noqa: E402
+
+
+@dataclasses.dataclass
+class DataclassBord:
+    id: int = -1
+    hoek: float = -1.0
+    opstelling_id: int = -1
+    y: int = -1
+    parameters: str = ''
+    code: str = ''
+    folie_type: str = ''
+    vorm: str = ''
+    breedte: int = -1
+    hoogte: int = -1
+    leverancier: str = ''
+    fabricage: str = ''
+
+
+def read_dataclasses(reader: SQLDbReader, reference_data: ReferenceDataCache) -> list:
+    leveranciers, fabricage_types = reference_data.leveranciers, reference_data.fabricage_types
+    return [DataclassBord(id=row[0], hoek=row[1], opstelling_id=row[2], y=row[3], parameters=row[4], code=row[5],
+                          folie_type=row[6], vorm=row[7], breedte=row[8], hoogte=row[9],
+                          leverancier=leveranciers.get(row[10]), fabricage=fabricage_types.get(row[11]))
+            for row in reader.iterate_read_query(SQLiteQueryExecutor.borden_query(), {})]
+
+
+def read_named_tuples(reader: SQLDbReader, reference_data: ReferenceDataCache) -> list:
+    return list(reader.iterate_read_query(SQLiteQueryExecutor.borden_query(), {},
+                                          row_factory=reference_data.get_bord_row_factory()))
+
+
+def measure(name: str, read, reader: SQLDbReader, repeat: int):
+    reference_data = ReferenceDataCache.load(reader)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        records = read(reader, reference_data)
+        timings.append(time.perf_counter() - start)
+    del records
+
+    tracemalloc.start()
+    records = read(reader, reference_data)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    best = min(timings)
+    print(f'{name:<12} {len(records):>8} records  {best * 1000:8.1f} ms  {len(records) / best:10.0f} records/s  '
+          f'{size / 1024:9.1f} KiB  {size / max(len(records), 1):6.0f} B/record')
+
+
+if __name__ == '__main__':
+    db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else \
+        Path(__file__).resolve().parent.parent / 'verkeersborden300.sqlite'
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    sql_reader = SQLDbReader(db_path)
+    measure('dataclass', read_dataclasses, sql_reader, repeat)
+    measure('namedtuple', read_named_tuples, sql_reader, repeat)
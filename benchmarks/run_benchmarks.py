@@ -0,0 +1,151 @@
+"""Runs Processor.process end to end on synthetic WDB exports of increasing size and appends the results to a JSON lines
+file, one line per run, so runs of different commits can be compared.
+
+Every run converts one database in a fresh process, so its peak memory isn't influenced by earlier runs. A result
+holds the total wall time, the peak RSS and the metrics per stage (sqlite fetch, extract, convert, write, ...: wall
+and CPU time, items, triples and throughput) as collected by ProcessingMetrics. The databases are generated with
+generate_wdb.py into the work directory the first time they are needed and reused afterwards.
+
+Usage: python benchmarks/run_benchmarks.py [--sizes 10000 100000 1000000] [--sink nt] [--compression gzip] [--batch]"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPOSITORY = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPOSITORY))
+
+from ProcessingMetrics import ProcessingMetrics  # noqa: E402
+from Processor import Processor  # noqa: E402
+from ProcessorConfig import ProcessorConfig  # noqa: E402
+from SQLDbReader import SQLDbReader  # noqa: E402
+from SQLiteIndexProvisioner import SQLiteIndexProvisioner  # noqa: E402
+from SQLiteQueryExecutor import SQLiteQueryExecutor  # noqa: E402
+from generate_wdb import WDBGenerator  # noqa: E402
+
+WORK_DIRECTORY = Path(__file__).resolve().parent / 'data'
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPOSITORY, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_database(opstellingen: int, work_directory: Path, seed: int, regenerate: bool = False) -> Path:
+    """Returns the (indexed) database with the given amount of opstellingen, generating it when needed."""
+    db_path = work_directory / f'wdb_{opstellingen}_{seed}.sqlite'
+    if regenerate or not os.path.isfile(db_path):
+        WDBGenerator(seed=seed).generate(db_path, opstellingen)
+    return SQLiteIndexProvisioner(db_path).prepare(build_indexes=True)
+
+
+def convert(db_path: Path, output_directory: Path, sink_type: str, joined: bool, metrics_path: Path,
+            compression: str = None):
+    """Converts the database in this process and writes the metrics to metrics_path."""
+    metrics = ProcessingMetrics()
+    with SQLDbReader(db_path, metrics=metrics) as sql_db_reader:
+        config = ProcessorConfig(output_prefix=str(output_directory / 'benchmark'), sink_type=sink_type,
+                                 compression=compression, metrics_path=metrics_path)
+        processor = Processor(SQLiteQueryExecutor(sql_db_reader), bord_register=REPOSITORY / 'wegcode_register.csv',
+                              config=config, metrics=metrics)
+        processor.process(joined=joined)
+
+
+def run(opstellingen: int, db_path: Path, sink_type: str, joined: bool, compression: str = None) -> dict:
+    """Converts the database in a child process and returns the result."""
+    with tempfile.TemporaryDirectory() as output_directory:
+        metrics_path = Path(output_directory) / 'metrics.json'
+        command = [sys.executable, __file__, '--convert', str(db_path), '--output', output_directory,
+                   '--metrics', str(metrics_path), '--sink', sink_type]
+        if not joined:
+            command.append('--batch')
+        if compression is not None:
+            command += ['--compression', compression]
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f'converting {db_path} failed:\n{completed.stderr[-3000:]}')
+        with open(metrics_path, encoding='utf-8') as metrics_file:
+            metrics = json.load(metrics_file)
+
+    return {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'commit': get_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'opstellingen': opstellingen,
+            'sink': sink_type,
+            'compression': compression,
+            'mode': 'joined' if joined else 'batch',
+            'opstellingen_per_second': round(opstellingen / metrics['total_wall_time'], 1)
+            if metrics['total_wall_time'] else None,
+            'metrics': metrics}
+
+
+def get_previous(results_path: Path, result: dict) -> dict:
+    """The last earlier result for the same size, sink and mode."""
+    previous = None
+    if os.path.isfile(results_path):
+        with open(results_path, encoding='utf-8') as results_file:
+            for line in results_file:
+                earlier = json.loads(line)
+                if all(earlier.get(key) == result[key] for key in ('opstellingen', 'sink', 'compression', 'mode')):
+                    previous = earlier
+    return previous
+
+
+def report(result: dict, previous: dict = None):
+    metrics = result['metrics']
+    sink = result['sink'] if result.get('compression') is None else f'{result["sink"]} {result["compression"]}'
+    message = (f'{result["opstellingen"]} opstellingen ({result["mode"]}, {sink}): '
+               f'{metrics["total_wall_time"]:.2f} s, {result["opstellingen_per_second"]} opstellingen/s, '
+               f'peak RSS {metrics["peak_rss_kb"] / 1024:.1f} MiB')
+    if previous is not None and previous['metrics']['total_wall_time']:
+        change = metrics['total_wall_time'] / previous['metrics']['total_wall_time'] - 1
+        message += f' ({change:+.1%} against {previous["commit"]} at {previous["timestamp"]})'
+    print(message)
+    for stage, stage_metrics in metrics['stages'].items():
+        print(f'    {stage:<14} wall {stage_metrics["wall_time"]:8.3f} s  cpu {stage_metrics["cpu_time"]:8.3f} s  '
+              f'{stage_metrics["items"]:>9} items  {stage_metrics["triples"]:>10} triples'
+              + (f'  {stage_metrics["bytes"]:>11} bytes  ratio {stage_metrics["compression_ratio"]}'
+                 if stage_metrics.get('bytes') else ''))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks the conversion on synthetic WDB exports.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000],
+                        help='amounts of opstellingen, e.g. 10000 100000 1000000')
+    parser.add_argument('--sink', choices=['rdflib', 'nt', 'ttl', 'binary'], default='nt')
+    parser.add_argument('--compression', choices=['gzip', 'zstd'])
+    parser.add_argument('--batch', action='store_true', help='query the children per batch instead of joined')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--work-directory', type=Path, default=WORK_DIRECTORY,
+                        help='where the generated databases are kept')
+    parser.add_argument('--results', type=Path, help='JSON lines file the results are appended to, '
+                                                     'results.jsonl in the work directory by default')
+    parser.add_argument('--regenerate', action='store_true', help='generate the databases again')
+    parser.add_argument('--convert', type=Path, help=argparse.SUPPRESS)
+    parser.add_argument('--output', type=Path, help=argparse.SUPPRESS)
+    parser.add_argument('--metrics', type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.convert is not None:
+        convert(args.convert, args.output, args.sink, not args.batch, args.metrics, args.compression)
+        sys.exit(0)
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
+    args.work_directory.mkdir(parents=True, exist_ok=True)
+    results_path = args.work_directory / 'results.jsonl' if args.results is None else args.results
+    for size in args.sizes:
+        database = get_database(size, args.work_directory, args.seed, args.regenerate)
+        benchmark_result = run(size, database, args.sink, not args.batch, args.compression)
+        report(benchmark_result, get_previous(results_path, benchmark_result))
+        with open(results_path, 'a', encoding='utf-8') as results:
+            results.write(json.dumps(benchmark_result) + '\n')
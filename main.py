@@ -1,17 +1,121 @@
-
+import argparse
+import logging
 from pathlib import Path
 
+from BeheerderCache import BEHEERDER_SOURCES, DEFAULT_PRECEDENCE
+from BinaryDataExtractor import BinaryDataExtractor
+from NodeFactory import SkolemNodeFactory
+from ParallelProcessor import ParallelProcessor
+from PipelinedProcessor import PipelinedProcessor
+from ProcessingMetrics import ProcessingMetrics
 from Processor import Processor
+from ProcessorConfig import ProcessorConfig
 from SQLDbReader import SQLDbReader
+from SQLiteIndexProvisioner import SQLiteIndexProvisioner
+from SpatialTiling import GridTiling, TILINGS
 from SQLiteQueryExecutor import SQLiteQueryExecutor
+from TiledProcessor import TiledProcessor, check_tiling
 
 
 if __name__ == '__main__':
-    processor = Processor(SQLiteQueryExecutor(SQLDbReader(Path('verkeersborden300.sqlite'))),
-                          bord_register=Path('wegcode_register.csv'))
-    processor.process()
+    parser = argparse.ArgumentParser(description='Converts a WDB sqlite export to OTL turtle files.')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='amount of worker processes, each converting a shard of the opstellingen')
+    parser.add_argument('--sink', choices=['rdflib', 'nt', 'ttl', 'binary'],
+                        help='rdflib builds a graph per file, nt and ttl stream the triples straight to the file, '
+                             'binary streams them to a dictionary encoded file (see BinaryRDF.py); the default is '
+                             'rdflib, or ttl with --tiling')
+    parser.add_argument('--compression', choices=['gzip', 'zstd'],
+                        help='compress the output files in a background thread, zstd needs zstandard')
+    parser.add_argument('--checkpoint', type=Path,
+                        help='incremental conversion: only convert the opstellingen that changed since the run that '
+                             'wrote this checkpoint file, into delta_<N> files, and write the deleted assets to '
+                             'delta_deleted.txt')
+    parser.add_argument('--resume', action='store_true',
+                        help='continue an interrupted run after the last file recorded in test_journal.json')
+    parser.add_argument('--quarantine', action='store_true',
+                        help="write opstellingen that can't be converted to test_rejects.jsonl instead of aborting")
+    parser.add_argument('--memory-budget', type=float,
+                        help='adaptive flushing: close the files before the process grows beyond this many MiB and '
+                             'tune the batch size while converting')
+    parser.add_argument('--triple-budget', type=int,
+                        help='adaptive flushing: close the files at this many triples')
+    parser.add_argument('--beheerder-precedence', type=lambda value: tuple(value.split(',')),
+                        default=DEFAULT_PRECEDENCE,
+                        help='the beheerder of an opstelling is the first of its beheerders in this comma separated '
+                             f'order of {", ".join(BEHEERDER_SOURCES)} (default {",".join(DEFAULT_PRECEDENCE)})')
+    parser.add_argument('--build-indexes', action='store_true',
+                        help='build the indexes the queries need in an indexed copy of the export '
+                             '(verkeersborden300.indexed.sqlite) when the export lacks them, by default the missing '
+                             'indexes are only reported')
+    parser.add_argument('--crs', choices=['lambert72', 'wgs84'], default='lambert72',
+                        help='coordinate system of the geometries, wgs84 needs pyproj')
+    parser.add_argument('--tiling', choices=list(TILINGS),
+                        help='write one file per grid cell or gemeente into the tiles directory, with a manifest')
+    parser.add_argument('--tile-size', type=float, default=10000.0,
+                        help='size of the grid cells in meters (Lambert72)')
+    parser.add_argument('--deterministic', action='store_true',
+                        help='skolem IRIs instead of blank nodes, sorted triples and sha256 checksums per file')
+    parser.add_argument('--images', type=Path,
+                        help='extract the binaireData images into this directory and write them as bijlagen to '
+                             'test_documenten')
+    parser.add_argument('--images-base-uri',
+                        help='the uri the --images directory is published at; without it the bijlagen refer to the '
+                             'images with a relative reference, the --images directory as given')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='overlap reading, converting and writing in separate threads with bounded queues')
+    parser.add_argument('--metrics', type=Path,
+                        help='write the per stage timings, throughput and peak memory to this JSON file')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
+    modes = [mode for mode, selected in (('parallel', args.workers > 1), ('tiled', args.tiling is not None),
+                                         ('pipelined', args.pipeline)) if selected]
+    if len(modes) > 1:
+        parser.error('--workers, --tiling and --pipeline can not be combined')
+    mode = modes[0] if modes else 'sequential'
+    if args.sink is None:
+        args.sink = 'ttl' if mode == 'tiled' else 'rdflib'
+    try:
+        config = ProcessorConfig(output_prefix='tiles/tile' if mode == 'tiled' else None,
+                                 sink_type=args.sink,
+                                 compression=args.compression, deterministic=args.deterministic,
+                                 geometry_crs=args.crs, checkpoint_path=args.checkpoint, resume=args.resume,
+                                 quarantine=args.quarantine, memory_budget=args.memory_budget,
+                                 triple_budget=args.triple_budget, beheerder_precedence=args.beheerder_precedence,
+                                 metrics_path=args.metrics)
+        config.check_mode(mode)
+        if mode == 'tiled':
+            tiling = GridTiling(args.tile_size) if args.tiling == 'grid' else TILINGS[args.tiling]()
+            check_tiling(tiling)
+    except (ValueError, ImportError) as error:
+        parser.error(str(error))
+
+    db_path = SQLiteIndexProvisioner(Path('verkeersborden300.sqlite')).prepare(build_indexes=args.build_indexes)
+    if mode == 'parallel':
+        ParallelProcessor(db_path, bord_register=Path('wegcode_register.csv'), workers=args.workers,
+                          config=config).process()
+    else:
+        metrics = ProcessingMetrics()
+        with SQLDbReader(db_path, metrics=metrics) as sql_db_reader:
+            executor = SQLiteQueryExecutor(sql_db_reader)
+            if mode == 'tiled':
+                Path('tiles').mkdir(exist_ok=True)
+                processor = TiledProcessor(executor, bord_register=Path('wegcode_register.csv'), config=config,
+                                           metrics=metrics, tiling=tiling)
+            else:
+                processor_class = PipelinedProcessor if mode == 'pipelined' else Processor
+                processor = processor_class(executor, bord_register=Path('wegcode_register.csv'), config=config,
+                                            metrics=metrics)
+            processor.process(joined=True)
+
+    if args.images is not None:
+        with SQLDbReader(db_path) as sql_db_reader:
+            node_factory = SkolemNodeFactory() if args.deterministic else None
+            BinaryDataExtractor(SQLiteQueryExecutor(sql_db_reader), args.images, base_uri=args.images_base_uri,
+                                node_factory=node_factory).process(sink_type=args.sink, sort=args.deterministic,
+                                                                   compression=args.compression)
 
 
 # html table scraping:
 # https://www.convertcsv.com/html-table-to-csv.htm
-# https://www.wegcode.be/nl/regelgeving/1975120109~hra8v386pu#sb9oiiegjk
\ No newline at end of file
+# https://www.wegcode.be/nl/regelgeving/1975120109~hra8v386pu#sb9oiiegjk
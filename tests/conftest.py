@@ -0,0 +1,39 @@
+"""The fixtures of the tests: a tiny synthetic WDB export (see benchmarks/generate_wdb.py).
+
+Run the tests with: python -m pytest -q tests"""
+import shutil
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+REPOSITORY = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPOSITORY))
+sys.path.insert(0, str(REPOSITORY / 'benchmarks'))
+
+from generate_wdb import WDBGenerator  # noqa: E402
+from support import OPSTELLINGEN, ORPHANED_OPSTELLING  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def template_db(tmp_path_factory) -> Path:
+    """A generated export of OPSTELLINGEN opstellingen with children that don't belong to an opstelling: those of
+    the removed ORPHANED_OPSTELLING (between the ids of the others) and an ophanging without opstelling_fk."""
+    db_path = tmp_path_factory.mktemp('wdb') / 'wdb.sqlite'
+    WDBGenerator(seed=3).generate(db_path, OPSTELLINGEN)
+    with sqlite3.connect(db_path) as con:
+        con.execute('DELETE FROM opstelling WHERE id = ?', (ORPHANED_OPSTELLING,))
+        con.execute('CREATE TEMP TABLE orphan AS SELECT * FROM ophangingen WHERE id = 1')
+        con.execute('UPDATE orphan SET id = (SELECT max(id) + 1 FROM ophangingen), opstelling_fk = NULL')
+        con.execute('INSERT INTO ophangingen SELECT * FROM orphan')
+    con.close()
+    return db_path
+
+
+@pytest.fixture
+def wdb(template_db, tmp_path) -> Path:
+    """A copy of the export the test can change."""
+    db_path = tmp_path / 'wdb.sqlite'
+    shutil.copyfile(template_db, db_path)
+    return db_path
@@ -0,0 +1,48 @@
+"""Helpers shared by the tests: converting the export of the wdb fixture and reading the output back."""
+import sqlite3
+from pathlib import Path
+
+from rdflib import Graph
+
+from BinaryRDF import read_binary_rdf
+from Processor import Processor
+from ProcessorConfig import ProcessorConfig
+from SQLDbReader import SQLDbReader
+from SQLiteQueryExecutor import SQLiteQueryExecutor
+
+REPOSITORY = Path(__file__).resolve().parent.parent
+BORD_REGISTER = REPOSITORY / 'wegcode_register.csv'
+OPSTELLINGEN = 30
+# the opstelling that is removed from the export, its aanzichten and ophangingen are left behind
+ORPHANED_OPSTELLING = 10
+
+
+def execute(db_path: Path, query: str, params: tuple = ()) -> list:
+    with sqlite3.connect(db_path) as con:
+        rows = con.execute(query, params).fetchall()
+    con.close()
+    return rows
+
+
+def convert(db_path: Path, output_prefix: Path, joined: bool = True, write_size: int = 12500,
+            processor_class=Processor, **options) -> Processor:
+    """Converts the export with a ProcessorConfig of the options and returns the processor."""
+    with SQLDbReader(db_path) as sql_db_reader:
+        processor = processor_class(SQLiteQueryExecutor(sql_db_reader), bord_register=BORD_REGISTER,
+                                    config=ProcessorConfig(
+                                        output_prefix=None if output_prefix is None else str(output_prefix), **options))
+        processor.convert(write_size=write_size, joined=joined)
+    return processor
+
+
+def read_graph(files: [str]) -> Graph:
+    """The triples of the (uncompressed) output files in one graph."""
+    g = Graph()
+    for file_name in files:
+        file_name = str(file_name)
+        if '.rdfb' in file_name:
+            for triple in read_binary_rdf(file_name):
+                g.add(triple)
+        else:
+            g.parse(file_name, format='nt' if file_name.endswith('.nt') else 'turtle')
+    return g
@@ -0,0 +1,85 @@
+import pytest
+
+from AdaptiveFlushPolicy import AdaptiveFlushPolicy
+from ProcessingMetrics import ProcessingMetrics
+from support import convert, read_graph
+
+
+@pytest.fixture
+def rss(monkeypatch) -> list:
+    """The RSS in KiB the policy measures, set the last item to change it."""
+    rss_kb = [100 * 1024]
+    monkeypatch.setattr(ProcessingMetrics, 'get_rss_kb', staticmethod(lambda: rss_kb[-1]))
+    return rss_kb
+
+
+def test_a_policy_needs_a_budget():
+    with pytest.raises(ValueError):
+        AdaptiveFlushPolicy()
+
+
+def test_files_are_closed_on_the_triple_budget():
+    policy = AdaptiveFlushPolicy(triple_budget=1000)
+    policy.start_file()
+
+    assert not policy.should_flush(999)
+    assert policy.should_flush(1000)
+    assert policy.reason == 'triple budget'
+
+
+def test_the_memory_budget_becomes_a_triple_limit(rss):
+    policy = AdaptiveFlushPolicy(memory_budget_mb=200, min_sample_triples=1000, headroom=0.5)
+    policy.start_file()
+    rss.append(110 * 1024)
+
+    policy.after_batch(10240)
+
+    # 10 MiB for 10240 triples, half of the 100 MiB left in the budget
+    assert policy.bytes_per_triple == 1024
+    assert policy.triple_limit == 50 * 1024
+    assert not policy.should_flush(50 * 1024 - 1)
+    assert policy.should_flush(50 * 1024)
+    assert policy.reason == 'memory budget'
+
+
+def test_growing_beyond_the_budget_closes_the_file(rss):
+    policy = AdaptiveFlushPolicy(memory_budget_mb=150, min_sample_triples=10 ** 9)
+    policy.start_file()
+    rss.append(160 * 1024)
+
+    policy.after_batch(10)
+
+    assert policy.should_flush(10)
+    assert policy.reason == 'RSS over the memory budget'
+    policy.flushed(10, 0.1)
+    # the memory of the closed file is reused by the next one
+    policy.after_batch(10)
+    assert not policy.should_flush(10)
+
+
+@pytest.mark.parametrize('seconds, batch_size', [(0.1, 200), (0.5, 100), (2.0, 50)])
+def test_the_batch_size_is_tuned_to_the_target_time(seconds, batch_size):
+    policy = AdaptiveFlushPolicy(triple_budget=1000, batch_size=100, target_batch_seconds=0.5)
+
+    policy.tune_batch_size(seconds)
+
+    assert policy.batch_size == batch_size
+
+
+def test_the_batch_size_stays_within_its_bounds():
+    policy = AdaptiveFlushPolicy(triple_budget=1000, batch_size=15, min_batch_size=10, max_batch_size=20)
+
+    policy.tune_batch_size(10.0)
+    assert policy.batch_size == 10
+    policy.tune_batch_size(0.0)
+    policy.tune_batch_size(0.0)
+    assert policy.batch_size == 20
+
+
+def test_a_conversion_with_a_triple_budget_writes_the_same_triples(wdb, tmp_path):
+    fixed = convert(wdb, tmp_path / 'fixed', sink_type='nt', deterministic=True)
+    budgeted = convert(wdb, tmp_path / 'budgeted', sink_type='nt', deterministic=True, triple_budget=500)
+
+    assert len(fixed.written_files) == 1
+    assert len(budgeted.written_files) > 1
+    assert set(read_graph(budgeted.written_files)) == set(read_graph(fixed.written_files))
@@ -0,0 +1,74 @@
+import re
+
+import pytest
+from rdflib import URIRef
+
+import OTLVocabulary as otl
+from BeheerderCache import BeheerderCache
+from SQLDbReader import SQLDbReader
+from WDBDataclasses.WDBOpstelling import WDBOpstelling
+from support import convert, execute, read_graph
+
+ROWS = {'gekozen': {1: ('OVO000001', 'Gekozen naam')},
+        'beheerder': {1: ('OVO000002', 'Beheerder 2'), 2: ('OVO000001', 'Andere naam'), 3: ('AWV 114', None)},
+        'berekend': {1: ('OVO000003', 'Berekend 3'), 2: ('AWV 114', 'District 114')}}
+
+
+def get_code(cache: BeheerderCache, gekozen: int = None, beheerder: int = None, berekend: int = None) -> str:
+    resolved = cache.resolve(WDBOpstelling(id=1, gekozen_beheerder_id=gekozen, beheerder_id=beheerder,
+                                           berekende_beheerder_id=berekend))
+    return None if resolved is None else resolved.relatie_suffix.removeprefix('-beheerder_')
+
+
+def test_the_first_source_of_the_precedence_wins():
+    cache = BeheerderCache(ROWS)
+
+    assert get_code(cache, gekozen=1, beheerder=1, berekend=1) == 'OVO000001'
+    assert get_code(cache, beheerder=1, berekend=1) == 'OVO000002'
+    assert get_code(cache, berekend=1) == 'OVO000003'
+    assert get_code(cache) is None
+    assert get_code(cache.with_precedence(('berekend', 'beheerder')), gekozen=1, beheerder=1, berekend=1) == \
+           'OVO000003'
+
+
+def test_unknown_keys_fall_through_to_the_next_source():
+    assert get_code(BeheerderCache(ROWS), gekozen=99, beheerder=1) == 'OVO000002'
+    assert get_code(BeheerderCache(ROWS, ('gekozen',)), beheerder=1) is None
+
+
+def test_an_agent_is_compiled_once_and_named_by_the_precedence():
+    cache = BeheerderCache(ROWS)
+    gekozen = cache.resolve(WDBOpstelling(gekozen_beheerder_id=1))
+
+    assert gekozen is cache.resolve(WDBOpstelling(beheerder_id=2))
+    assert gekozen.uri == URIRef(f'{otl.AGENT}OVO000001')
+    assert 'Gekozen naam' in {str(o) for _, _, o in gekozen.template.triples}
+    # a gebiedcode with a space, named by the source that has a naam
+    district = cache.resolve(WDBOpstelling(beheerder_id=3))
+    assert district.uri == URIRef(f'{otl.AGENT}AWV-114')
+    assert 'District 114' in {str(o) for _, _, o in district.template.triples}
+
+
+def test_an_unknown_source_is_refused():
+    with pytest.raises(ValueError, match='unknown beheerder source'):
+        BeheerderCache(ROWS, ('gekozen', 'eigenaar'))
+
+
+def test_the_conversion_relates_every_opstelling_to_its_beheerder(wdb, tmp_path):
+    converted = convert(wdb, tmp_path / 'test', sink_type='nt', deterministic=True,
+                        beheerder_precedence=('berekend', 'beheerder', 'gekozen'))
+    g = read_graph(converted.written_files)
+    with SQLDbReader(wdb) as sql_db_reader:
+        cache = BeheerderCache.load(sql_db_reader, ('berekend', 'beheerder', 'gekozen'))
+
+    opstellingen = [WDBOpstelling(id=row[0], gekozen_beheerder_id=row[1], beheerder_id=row[2],
+                                  berekende_beheerder_id=row[3])
+                    for row in execute(wdb, 'SELECT id, gekozenBeheerder_fk, beheerder_fk, berekendeBeheerder_fk '
+                                            'FROM opstelling')]
+    assert any(cache.resolve(opstelling) is not None for opstelling in opstellingen)
+    for opstelling in opstellingen:
+        relations = {str(subject) for subject in g.subjects()
+                     if re.fullmatch(f'{otl.ASSET}opstelling_{opstelling.id}-beheerder_.+', str(subject))}
+        beheerder = cache.resolve(opstelling)
+        expected = set() if beheerder is None else {f'{otl.ASSET}opstelling_{opstelling.id}{beheerder.relatie_suffix}'}
+        assert relations == expected
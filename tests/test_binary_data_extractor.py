@@ -0,0 +1,75 @@
+import base64
+import hashlib
+from pathlib import Path
+
+from rdflib import URIRef
+
+import OTLVocabulary as otl
+from BinaryDataExtractor import BinaryDataExtractor
+from NodeFactory import SkolemNodeFactory
+from SQLDbReader import SQLDbReader
+from SQLiteQueryExecutor import SQLiteQueryExecutor
+from support import execute, read_graph
+
+PNG = b'\x89PNG\r\n\x1a\n first image'
+JPEG = b'\xff\xd8\xff second image'
+
+
+def add_binaire_data(db_path: Path, binaire_id: int, content: bytes, md5: str, opstelling_id: int = None,
+                     aanzicht_id: int = None, mime: str = 'image/png'):
+    execute(db_path, 'INSERT INTO binaireData (id, naam, mime, md5, data, opstelling_fk, aanzicht_fk) '
+                     'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (binaire_id, f'foto {binaire_id}', mime, md5, base64.b64encode(content).decode('ascii'), opstelling_id,
+             aanzicht_id))
+
+
+def extract(db_path: Path, directory: Path, output_prefix: Path) -> (BinaryDataExtractor, str):
+    with SQLDbReader(db_path) as sql_db_reader:
+        extractor = BinaryDataExtractor(SQLiteQueryExecutor(sql_db_reader), directory,
+                                        base_uri='https://example.org/images/', chunk_size=2,
+                                        node_factory=SkolemNodeFactory())
+        file_name = extractor.process(sink_type='nt', output_prefix=str(output_prefix))
+    return extractor, file_name
+
+
+def test_images_are_stored_once_by_md5_and_linked_to_their_assets(wdb, tmp_path):
+    png_md5 = base64.b64encode(hashlib.md5(PNG).digest()).decode('ascii')
+    jpeg_md5 = hashlib.md5(JPEG).hexdigest()
+    execute(wdb, 'DELETE FROM binaireData')
+    add_binaire_data(wdb, 1, PNG, png_md5, aanzicht_id=1)
+    add_binaire_data(wdb, 2, PNG, png_md5, aanzicht_id=2)
+    add_binaire_data(wdb, 3, JPEG, jpeg_md5.upper(), opstelling_id=3, mime='image/jpeg')
+    add_binaire_data(wdb, 4, b'tampered', hashlib.md5(b'original').hexdigest(), aanzicht_id=3)
+    add_binaire_data(wdb, 5, JPEG, jpeg_md5, mime='image/jpeg')
+    bord_ids = [row[0] for row in execute(wdb, 'SELECT id FROM borden WHERE aanzicht_fk = 1')]
+    aanzicht_opstelling = execute(wdb, 'SELECT opstelling_fk FROM aanzichten WHERE id = 1')[0][0]
+
+    extractor, file_name = extract(wdb, tmp_path / 'images', tmp_path / 'test')
+
+    png_path = tmp_path / 'images' / hashlib.md5(PNG).hexdigest()[:2] / f'{hashlib.md5(PNG).hexdigest()}.png'
+    jpeg_path = tmp_path / 'images' / jpeg_md5[:2] / f'{jpeg_md5}.jpg'
+    assert png_path.read_bytes() == PNG
+    assert jpeg_path.read_bytes() == JPEG
+    assert (extractor.files_written, extractor.duplicates, extractor.rejected, extractor.unlinked) == (2, 2, 1, 1)
+
+    g = read_graph([file_name])
+    documents = set(g.objects(URIRef(f'{otl.ASSET}opstelling_{aanzicht_opstelling}'), otl.AIMOBJECT_BIJLAGE))
+    assert bord_ids
+    for bord_id in bord_ids:
+        assert documents & set(g.objects(URIRef(f'{otl.ASSET}bord_{bord_id}'), otl.AIMOBJECT_BIJLAGE))
+    [jpeg_document] = g.objects(URIRef(f'{otl.ASSET}opstelling_3'), otl.AIMOBJECT_BIJLAGE)
+    assert g.value(jpeg_document, otl.DTC_DOCUMENT_URI) == \
+           URIRef(f'https://example.org/images/{jpeg_md5[:2]}/{jpeg_md5}.jpg')
+    # every image but the tampered one and the one without an asset is a bijlage
+    assert len(set(g.subjects(otl.DTC_DOCUMENT_URI, None))) == 3
+
+
+def test_images_written_by_an_earlier_run_are_skipped(wdb, tmp_path):
+    execute(wdb, 'DELETE FROM binaireData')
+    add_binaire_data(wdb, 1, PNG, hashlib.md5(PNG).hexdigest(), aanzicht_id=1)
+
+    first, _ = extract(wdb, tmp_path / 'images', tmp_path / 'first')
+    second, file_name = extract(wdb, tmp_path / 'images', tmp_path / 'second')
+
+    assert (first.files_written, second.files_written, second.duplicates) == (1, 0, 1)
+    assert set(read_graph([file_name]).subjects(otl.DTC_DOCUMENT_URI, None))
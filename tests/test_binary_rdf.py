@@ -0,0 +1,46 @@
+import gzip
+from pathlib import Path
+
+import pytest
+from rdflib import BNode, Literal, URIRef, XSD
+
+from BinaryRDF import read_binary_rdf
+from TripleSink import create_sink
+from support import convert, read_graph
+
+
+def test_binary_sink_gives_the_graph_of_the_nt_sink(wdb, tmp_path):
+    binary = convert(wdb, tmp_path / 'binary', sink_type='binary', write_size=7, deterministic=True)
+    nt = convert(wdb, tmp_path / 'nt', sink_type='nt', write_size=7, deterministic=True)
+
+    assert set(read_graph(binary.written_files)) == set(read_graph(nt.written_files))
+
+
+@pytest.mark.parametrize('compression', [None, 'gzip'])
+def test_binary_rdf_round_trip(tmp_path, compression):
+    node = BNode()
+    subject, predicate = URIRef('https://example.org/a#x'), URIRef('https://example.org/p')
+    triples = [(subject, predicate, Literal('plain')),
+               (subject, predicate, Literal('1.5', datatype=XSD.decimal)),
+               (subject, predicate, Literal('bord', lang='nl')),
+               (node, predicate, Literal('é \n "quoted" €')),
+               (subject, URIRef('https://example.org/r'), node)]
+    # enough terms for references of more than one byte
+    triples += [(URIRef(f'https://example.org/s/{i}'), predicate, Literal(i))
+                for i in range(300)]
+    sink = create_sink('binary', str(tmp_path / 'triples'), compression=compression)
+    for triple in triples:
+        sink.add(triple)
+    sink.close()
+
+    assert list(read_binary_rdf(sink.file_name)) == triples
+
+
+def test_gzip_files_hold_the_uncompressed_output(wdb, tmp_path):
+    plain = convert(wdb, tmp_path / 'plain', sink_type='nt', write_size=7, deterministic=True)
+    compressed = convert(wdb, tmp_path / 'compressed', sink_type='nt', write_size=7, deterministic=True,
+                         compression='gzip')
+
+    assert all(file_name.endswith('.nt.gz') for file_name in compressed.written_files)
+    for plain_file, compressed_file in zip(plain.written_files, compressed.written_files, strict=True):
+        assert gzip.decompress(Path(compressed_file).read_bytes()) == Path(plain_file).read_bytes()
@@ -0,0 +1,59 @@
+import pytest
+
+import OTLVocabulary as otl
+from BordCodeIndex import BordCodeIndex
+from support import BORD_REGISTER, convert, execute
+
+
+@pytest.fixture(scope='module')
+def index() -> BordCodeIndex:
+    bord_code_index = BordCodeIndex()
+    bord_code_index.add_register(BORD_REGISTER)
+    return bord_code_index
+
+
+@pytest.mark.parametrize('code, register_code', [
+    ('C43', 'C43'),
+    ('c43/', 'C43'),
+    ('A1 a', 'A1a'),
+    ('ZC43/', 'C43'),
+    ('ZE9a', 'E9a'),
+    ('C5-C7', 'C5'),
+    ('F27-xx', 'F27'),
+    ('B15a', None),
+    ('D1d', None),
+    ('Z/', None),
+    ('pijl links', None),
+    (None, None)])
+def test_resolve(index, code, register_code):
+    assert index.resolve(code) == register_code
+
+
+@pytest.mark.parametrize('code, unresolved', [
+    ('C43', ()),
+    ('C5-C7-C9', ()),
+    ('F27-xx', ('xx',)),
+    ('ZC21-5t5/', ('5t5/',)),
+    ('ZE9a-GVIIa/', ('GVIIa/',)),
+    ('B15a-xx', ())])
+def test_unresolved_parts_of_composite_codes(index, code, unresolved):
+    assert index.get(code).unresolved == unresolved
+
+
+def test_codes_get_the_register_entry_and_the_class_of_their_bord(index):
+    info = index.get('c43/')
+
+    assert info.entry.code == 'C43'
+    assert info.type_uri == otl.RETROREFLECTEREND_VERKEERSBORD
+    assert index.get('GIII').type_uri == otl.ONDERBORD
+    assert index.get('c43/') is info
+
+
+def test_the_unresolved_parts_are_reported_as_missing_from_the_register(wdb, tmp_path):
+    execute(wdb, "UPDATE borden SET code = 'F27-xx' WHERE id = 1")
+    execute(wdb, "UPDATE borden SET code = 'B15a' WHERE id = 2")
+
+    converted = convert(wdb, tmp_path / 'test', sink_type='nt')
+
+    assert {'xx', 'B15a'} <= converted.bord_register_not_found
+    assert 'F27-xx' not in converted.bord_register_not_found
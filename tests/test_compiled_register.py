@@ -0,0 +1,72 @@
+import logging
+import marshal
+import shutil
+
+import pytest
+
+import CompiledRegister
+from BordCodeIndex import BordCodeIndex
+from CompiledRegister import compile_register, load_register
+from support import BORD_REGISTER
+
+
+@pytest.fixture
+def register(tmp_path):
+    path = tmp_path / 'wegcode_register.csv'
+    shutil.copyfile(BORD_REGISTER, path)
+    return path
+
+
+def forbid_compiling(monkeypatch):
+    def add_register(index, bord_register):
+        raise AssertionError('the register is compiled again')
+    monkeypatch.setattr(BordCodeIndex, 'add_register', add_register)
+
+
+def test_a_fresh_artifact_is_loaded_without_compiling(register, monkeypatch):
+    compiled = compile_register(register)
+    forbid_compiling(monkeypatch)
+
+    loaded = load_register(register)
+
+    assert loaded.to_data() == compiled.to_data()
+    assert loaded.resolve('ZC43/') == 'C43'
+
+
+def test_a_changed_register_is_compiled_again(register):
+    compile_register(register)
+    with open(register, 'a', encoding='utf-8') as register_file:
+        register_file.write('"/media/image/orig/nieuw.png";"X1. Nieuw bord."\n')
+
+    assert load_register(register).resolve('X1') == 'X1'
+    artifact = marshal.loads(CompiledRegister.get_artifact_path(register).read_bytes())
+    assert artifact['source_hash'] == CompiledRegister.get_source_hash(register)
+
+
+def test_the_mapping_workbook_does_not_invalidate_the_artifact(register, monkeypatch):
+    compile_register(register)
+    (register.parent / 'mapping.xlsx').write_bytes(b'another workbook')
+    forbid_compiling(monkeypatch)
+
+    assert len(load_register(register)) > 0
+
+
+def test_an_unreadable_artifact_is_compiled_again(register, caplog):
+    CompiledRegister.get_artifact_path(register).write_bytes(b'not marshalled')
+
+    with caplog.at_level(logging.WARNING):
+        index = load_register(register)
+
+    assert index.resolve('C43') == 'C43'
+    assert 'can not be read' in caplog.text
+
+
+def test_an_artifact_that_can_not_be_written_falls_back_to_memory(register, tmp_path, caplog):
+    artifact_path = tmp_path / 'read-only' / 'register.index.bin'
+
+    with caplog.at_level(logging.WARNING):
+        index = load_register(register, artifact_path)
+
+    assert index.resolve('C43') == 'C43'
+    assert 'can not be written' in caplog.text
+    assert not artifact_path.parent.exists()
@@ -0,0 +1,45 @@
+from pathlib import Path
+
+import pytest
+
+from Processor import Processor
+from support import convert
+
+
+class InterruptedProcessor(Processor):
+    """Stops the conversion like an interrupted run when it reaches opstelling interrupt_at."""
+    interrupt_at = 23
+
+    def convert_aggregate(self, g, aggregate, geometry):
+        if aggregate.opstelling.id == self.interrupt_at:
+            raise KeyboardInterrupt
+        super().convert_aggregate(g, aggregate, geometry)
+
+
+def test_resume_after_interruption_equals_an_uninterrupted_run(wdb, tmp_path):
+    options = {'sink_type': 'nt', 'deterministic': True, 'quarantine': True}
+    (tmp_path / 'expected').mkdir()
+    expected = convert(wdb, tmp_path / 'expected' / 'test', write_size=5, **options)
+
+    (tmp_path / 'resumed').mkdir()
+    with pytest.raises(KeyboardInterrupt):
+        convert(wdb, tmp_path / 'resumed' / 'test', write_size=5, processor_class=InterruptedProcessor, **options)
+    assert (tmp_path / 'resumed' / 'test_journal.json').is_file()
+    resumed = convert(wdb, tmp_path / 'resumed' / 'test', write_size=5, resume=True, **options)
+
+    assert [Path(file_name).name for file_name in resumed.written_files] == \
+           [Path(file_name).name for file_name in expected.written_files]
+    for expected_file, resumed_file in zip(expected.written_files, resumed.written_files):
+        assert Path(resumed_file).read_bytes() == Path(expected_file).read_bytes()
+    assert (tmp_path / 'resumed' / 'test_checksums.sha256').read_text() == \
+           (tmp_path / 'expected' / 'test_checksums.sha256').read_text()
+    assert resumed.triples_written == expected.triples_written
+    assert not (tmp_path / 'resumed' / 'test_journal.json').exists()
+
+
+def test_a_journal_of_other_settings_is_not_resumed(wdb, tmp_path):
+    with pytest.raises(KeyboardInterrupt):
+        convert(wdb, tmp_path / 'test', write_size=5, sink_type='nt', processor_class=InterruptedProcessor)
+
+    with pytest.raises(ValueError, match='other settings'):
+        convert(wdb, tmp_path / 'test', write_size=5, sink_type='ttl', resume=True)
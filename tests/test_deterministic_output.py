@@ -0,0 +1,37 @@
+import hashlib
+from pathlib import Path
+
+import pytest
+from rdflib import BNode
+
+from support import convert, read_graph
+
+
+@pytest.mark.parametrize('sink_type', ['nt', 'ttl', 'binary'])
+def test_two_runs_give_identical_files_and_checksums(wdb, tmp_path, sink_type):
+    for run in ('first', 'second'):
+        (tmp_path / run).mkdir()
+    first = convert(wdb, tmp_path / 'first' / 'test', sink_type=sink_type, write_size=7, deterministic=True)
+    second = convert(wdb, tmp_path / 'second' / 'test', sink_type=sink_type, write_size=7, deterministic=True)
+
+    assert len(first.written_files) > 1
+    for first_file, second_file in zip(first.written_files, second.written_files, strict=True):
+        assert Path(first_file).read_bytes() == Path(second_file).read_bytes()
+    checksums = (tmp_path / 'first' / 'test_checksums.sha256').read_text(encoding='utf-8')
+    assert checksums == (tmp_path / 'second' / 'test_checksums.sha256').read_text(encoding='utf-8')
+    assert checksums.splitlines() == [f'{hashlib.sha256(Path(file_name).read_bytes()).hexdigest()}  '
+                                      f'{Path(file_name).name}' for file_name in first.written_files]
+
+
+def test_deterministic_output_has_no_blank_nodes(wdb, tmp_path):
+    converted = convert(wdb, tmp_path / 'test', sink_type='nt', deterministic=True)
+
+    g = read_graph(converted.written_files)
+    assert len(g) > 0
+    assert not any(isinstance(term, BNode) for triple in g for term in triple)
+
+
+def test_checksums_are_only_written_in_deterministic_mode(wdb, tmp_path):
+    convert(wdb, tmp_path / 'test', sink_type='nt')
+
+    assert not (tmp_path / 'test_checksums.sha256').exists()
@@ -0,0 +1,59 @@
+import collections
+import logging
+
+from rdflib.compare import isomorphic
+
+from SQLDbReader import SQLDbReader
+from SQLiteQueryExecutor import SQLiteQueryExecutor, _OrderedChildStream
+from support import OPSTELLINGEN, ORPHANED_OPSTELLING, convert, execute, read_graph
+
+
+def test_joined_and_batched_extraction_give_isomorphic_graphs(wdb, tmp_path):
+    # skolem IRIs instead of blank nodes keep the isomorphism check fast
+    joined = convert(wdb, tmp_path / 'joined', joined=True, sink_type='nt', deterministic=True)
+    batched = convert(wdb, tmp_path / 'batched', joined=False, sink_type='nt', deterministic=True)
+
+    joined_graph = read_graph(joined.written_files)
+    assert len(joined_graph) > 0
+    assert isomorphic(joined_graph, read_graph(batched.written_files))
+    assert joined.bord_register_not_found == batched.bord_register_not_found
+
+
+def test_aggregates_hold_the_children_of_their_opstelling(wdb):
+    with SQLDbReader(wdb) as sql_db_reader:
+        executor = SQLiteQueryExecutor(sql_db_reader)
+        aggregates = list(executor.get_all_opstelling_aggregates())
+        ophangingen = collections.Counter(ophanging.opstelling_id for ophanging in executor.get_all_ophangingen())
+
+    assert [aggregate.opstelling.id for aggregate in aggregates] == \
+           [i for i in range(1, OPSTELLINGEN + 1) if i != ORPHANED_OPSTELLING]
+    assert all(len(aggregate.ophangingen) == ophangingen[aggregate.opstelling.id] for aggregate in aggregates)
+
+
+def test_children_of_missing_opstellingen_are_skipped_and_logged(wdb, caplog):
+    ophangingen = execute(wdb, 'SELECT opstelling_fk FROM ophangingen WHERE opstelling_fk IS NULL OR '
+                               'opstelling_fk = ?', (ORPHANED_OPSTELLING,))
+    assert ophangingen
+
+    with caplog.at_level(logging.WARNING), SQLDbReader(wdb) as sql_db_reader:
+        aggregates = list(SQLiteQueryExecutor(sql_db_reader).get_all_opstelling_aggregates())
+
+    assert len(aggregates) == OPSTELLINGEN - 1
+    assert all(child.opstelling_id == aggregate.opstelling.id for aggregate in aggregates
+               for child in aggregate.borden + aggregate.ophangingen + aggregate.beugels)
+    assert f'skipped {len(ophangingen)} ophangingen of a missing opstelling: opstelling_fk None, ' \
+           f'{ORPHANED_OPSTELLING}' in caplog.text
+
+
+def test_ordered_child_stream_skips_children_without_or_of_a_skipped_opstelling(caplog):
+    Child = collections.namedtuple('Child', 'id opstelling_id')
+    stream = _OrderedChildStream([Child(1, None), Child(2, 1), Child(3, 1), Child(4, 2), Child(5, 4), Child(6, 9)],
+                                 'children')
+
+    assert stream.take(1) == [Child(2, 1), Child(3, 1)]
+    assert stream.take(4) == [Child(5, 4)]
+    assert stream.take(5) == []
+    with caplog.at_level(logging.WARNING):
+        stream.finish()
+    assert stream.skipped == 3
+    assert 'skipped 3 children of a missing opstelling: opstelling_fk None, 2, 9' in caplog.text
@@ -0,0 +1,47 @@
+import pytest
+
+import GeometryConverter
+import OTLVocabulary as otl
+from GeometryConverter import CRS_IRIS
+from ProcessorConfig import ProcessorConfig
+
+
+@pytest.mark.parametrize('wkt, point', [
+    ('POINT (150000.5 200000)', (150000.5, 200000.0)),
+    ('POINT Z (150000 200000 12.5)', (150000.0, 200000.0)),
+    ('POINT(1e5 2e5)', (100000.0, 200000.0)),
+    ('POINT EMPTY', None),
+    ('POINT (150000)', None),
+    ('LINESTRING (0 0, 1 1)', None),
+    ('', None),
+    (None, None)])
+def test_parse_point(wkt, point):
+    assert GeometryConverter.GeometryConverter.parse_point(wkt) == point
+
+
+def test_lambert72_keeps_the_coordinates_and_skips_what_is_not_a_point():
+    literals, points = GeometryConverter.GeometryConverter().convert(['POINT (150000.5 200000)', None])
+
+    assert str(literals[0]) == f'<{CRS_IRIS["lambert72"]}> POINT (150000.5 200000.0)'
+    assert literals[0].datatype == otl.WKT_LITERAL
+    assert (literals[1], points) == (None, [(150000.5, 200000.0), None])
+
+
+def test_wgs84_reprojects_to_longitude_latitude():
+    pytest.importorskip('pyproj')
+    literals, points = GeometryConverter.GeometryConverter('wgs84').convert(['POINT (150000 200000)'])
+
+    longitude, latitude = map(float, str(literals[0]).partition('(')[2].rstrip(')').split())
+    assert str(literals[0]).startswith(f'<{CRS_IRIS["wgs84"]}> POINT (')
+    # north of Brussels
+    assert (longitude, latitude) == pytest.approx((4.37, 51.11), abs=0.02)
+    assert points == [(150000.0, 200000.0)]
+
+
+def test_the_config_rejects_wgs84_without_pyproj(monkeypatch):
+    monkeypatch.setattr(GeometryConverter, 'pyproj', None)
+
+    with pytest.raises(ImportError, match='pyproj'):
+        ProcessorConfig(geometry_crs='wgs84')
+    with pytest.raises(ValueError, match='unknown crs'):
+        ProcessorConfig(geometry_crs='etrs89')
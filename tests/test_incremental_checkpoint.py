@@ -0,0 +1,110 @@
+import json
+import re
+
+from rdflib import URIRef
+
+import OTLVocabulary as otl
+from IncrementalCheckpoint import IncrementalCheckpoint
+from support import OPSTELLINGEN, convert, execute, read_graph
+
+
+def get_opstellingen(files: [str]) -> set:
+    return {str(subject) for subject in read_graph(files).subjects()
+            if isinstance(subject, URIRef) and re.fullmatch(f'{otl.ASSET}opstelling_[0-9]+', subject)}
+
+
+def read_delete_set(path) -> set:
+    return set(path.read_text(encoding='utf-8').split()) if path.exists() else set()
+
+
+def test_checkpoint_only_converts_changes_and_writes_the_deleted_assets(wdb, tmp_path):
+    checkpoint_path = tmp_path / 'checkpoint.json'
+    first = convert(wdb, tmp_path / 'first', sink_type='nt', checkpoint_path=checkpoint_path)
+    assert first.checkpoint.changed == OPSTELLINGEN - 1
+    assert not (tmp_path / 'first_deleted.txt').exists()
+
+    execute(wdb, "UPDATE opstelling SET wijzigingsDatum = '01/01/2030' WHERE id = 3")
+    removed_ophanging = execute(wdb, 'SELECT min(id) FROM ophangingen WHERE opstelling_fk = 4')[0][0]
+    execute(wdb, 'DELETE FROM ophangingen WHERE id = ?', (removed_ophanging,))
+    execute(wdb, 'DELETE FROM opstelling WHERE id = 7')
+    second = convert(wdb, tmp_path / 'second', sink_type='nt', checkpoint_path=checkpoint_path)
+
+    assert (second.checkpoint.changed, second.checkpoint.unchanged) == (2, OPSTELLINGEN - 4)
+    assert second.checkpoint.last_wijzigings_datum == '2030-01-01'
+    assert get_opstellingen(second.written_files) == {f'{otl.ASSET}opstelling_3', f'{otl.ASSET}opstelling_4'}
+    deleted = read_delete_set(tmp_path / 'second_deleted.txt')
+    assert f'{otl.ASSET}opstelling_7' in deleted
+    assert {f'{otl.ASSET}ophanging_{removed_ophanging}', f'{otl.ASSET}fundering_{removed_ophanging}',
+            f'{otl.ASSET}ophanging_{removed_ophanging}-opstelling_4',
+            f'{otl.ASSET}ophanging_{removed_ophanging}-fundering_{removed_ophanging}'} <= deleted
+    assert not {f'{otl.ASSET}opstelling_3', f'{otl.ASSET}opstelling_4'} & deleted
+
+    third = convert(wdb, tmp_path / 'third', sink_type='nt', checkpoint_path=checkpoint_path)
+    assert (third.checkpoint.changed, third.written_files) == (0, [])
+
+
+def test_delete_set_holds_every_asset_and_relation_of_a_deleted_opstelling(wdb, tmp_path):
+    checkpoint_path = tmp_path / 'checkpoint.json'
+    first = convert(wdb, tmp_path / 'first', sink_type='nt', checkpoint_path=checkpoint_path)
+    graph = read_graph(first.written_files)
+    # the opstelling, everything that belongs to it and every relation between them
+    assets = {URIRef(f'{otl.ASSET}opstelling_7')}
+    while True:
+        relations = {relation for relation, _, target in graph.triples((None, otl.RELATIE_OBJECT_DOEL, None))
+                     if target in assets or graph.value(relation, otl.RELATIE_OBJECT_BRON) in assets}
+        grown = assets | relations | {graph.value(relation, predicate) for relation in relations
+                                      for predicate in (otl.RELATIE_OBJECT_BRON, otl.RELATIE_OBJECT_DOEL)}
+        if grown == assets:
+            break
+        assets = grown
+    assets = {str(asset) for asset in assets if asset.startswith(otl.ASSET)}
+    assert any('-beheerder_' in asset for asset in assets)
+
+    execute(wdb, 'DELETE FROM opstelling WHERE id = 7')
+    convert(wdb, tmp_path / 'second', sink_type='nt', checkpoint_path=checkpoint_path)
+
+    assert read_delete_set(tmp_path / 'second_deleted.txt') == assets
+
+
+def test_relations_to_another_target_are_deleted(wdb, tmp_path):
+    checkpoint_path = tmp_path / 'checkpoint.json'
+    convert(wdb, tmp_path / 'first', sink_type='nt', checkpoint_path=checkpoint_path)
+    aanzicht = execute(wdb, 'SELECT min(aanzicht_fk) FROM borden JOIN aanzichten ON aanzicht_fk = aanzichten.id '
+                            'WHERE opstelling_fk = 4')[0][0]
+    borden = [row[0] for row in execute(wdb, 'SELECT id FROM borden WHERE aanzicht_fk = ?', (aanzicht,))]
+    execute(wdb, 'UPDATE aanzichten SET opstelling_fk = 5 WHERE id = ?', (aanzicht,))
+    # the beheerder of opstelling 1 moves to another gebied, the opstelling itself doesn't change
+    old_relation = [asset for asset in json.loads(checkpoint_path.read_text())['opstellingen']['1']['assets']
+                    if '-beheerder_' in asset]
+    assert old_relation
+    execute(wdb, 'UPDATE beheerder SET gebiedCode_key = (SELECT max(key) FROM gebied) WHERE key = '
+                 '(SELECT beheerder_fk FROM opstelling WHERE id = 1)')
+    second = convert(wdb, tmp_path / 'second', sink_type='nt', checkpoint_path=checkpoint_path)
+
+    assert get_opstellingen(second.written_files) == {f'{otl.ASSET}opstelling_{i}' for i in (1, 4, 5)}
+    deleted = read_delete_set(tmp_path / 'second_deleted.txt')
+    assert deleted == {f'{otl.ASSET}bord_{bord}-opstelling_4' for bord in borden} | {f'{otl.ASSET}{old_relation[0]}'}
+
+
+def test_delta_output_does_not_overwrite_a_full_conversion(wdb, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    full = convert(wdb, None, sink_type='nt')
+    delta = convert(wdb, None, sink_type='nt', checkpoint_path=tmp_path / 'checkpoint.json')
+
+    assert full.written_files == ['test_1.nt']
+    assert delta.written_files == ['delta_1.nt']
+
+
+def test_version_1_checkpoint_converts_everything_again(wdb, tmp_path):
+    checkpoint_path = tmp_path / 'checkpoint.json'
+    checkpoint_path.write_text(json.dumps({'version': 1, 'last_wijzigings_datum': '2020-01-01', 'opstellingen': {
+        '7': {'hash': 'old', 'records': ['opstelling_7', 'bord_1']},
+        '999': {'hash': 'old', 'records': ['opstelling_999', 'ophanging_99999']}}}))
+
+    checkpoint = IncrementalCheckpoint(checkpoint_path)
+
+    assert checkpoint.previous['999']['assets'] == ['opstelling_999', 'ophanging_99999', 'fundering_99999']
+    converted = convert(wdb, tmp_path / 'delta', sink_type='nt', checkpoint_path=checkpoint_path)
+    assert converted.checkpoint.changed == OPSTELLINGEN - 1
+    assert read_delete_set(tmp_path / 'delta_deleted.txt') == {f'{otl.ASSET}{asset}' for asset in
+                                                               ('opstelling_999', 'ophanging_99999', 'fundering_99999')}
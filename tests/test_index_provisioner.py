@@ -0,0 +1,44 @@
+import os
+
+from SQLDbReader import SQLDbReader
+from SQLiteIndexProvisioner import SQLiteIndexProvisioner
+
+
+def get_plan_warnings(db_path) -> dict:
+    with SQLDbReader(db_path) as reader:
+        return SQLiteIndexProvisioner.get_plan_warnings(reader)
+
+
+def test_plan_check_reports_the_missing_indexes(wdb):
+    warnings = get_plan_warnings(wdb)
+
+    assert {'borden (batch)', 'ophangingen (batch)', 'beugels (batch)'} <= set(warnings)
+    assert any(step.startswith('SCAN ') for step in warnings['ophangingen (batch)'])
+
+
+def test_indexed_copy_is_only_built_on_request(wdb):
+    provisioner = SQLiteIndexProvisioner(wdb)
+
+    assert provisioner.prepare() == wdb.resolve()
+    assert not provisioner.indexed_path.exists()
+
+    indexed_path = provisioner.prepare(build_indexes=True)
+    assert indexed_path == provisioner.indexed_path
+    assert provisioner.is_indexed_copy_current()
+    assert get_plan_warnings(indexed_path) == {}
+
+
+def test_indexed_copy_is_reused_until_the_export_changes(wdb):
+    provisioner = SQLiteIndexProvisioner(wdb)
+    provisioner.prepare(build_indexes=True)
+    built = os.stat(provisioner.indexed_path).st_mtime_ns
+
+    assert provisioner.prepare(build_indexes=True) == provisioner.indexed_path
+    assert os.stat(provisioner.indexed_path).st_mtime_ns == built
+
+    stat = os.stat(wdb)
+    os.utime(wdb, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10 ** 9))
+    assert not provisioner.is_indexed_copy_current()
+    assert provisioner.prepare() == wdb.resolve()
+    provisioner.prepare(build_indexes=True)
+    assert provisioner.is_indexed_copy_current()
@@ -0,0 +1,33 @@
+from ParallelProcessor import ParallelProcessor
+from ProcessorConfig import ProcessorConfig
+from SQLDbReader import SQLDbReader
+from SQLiteQueryExecutor import SQLiteQueryExecutor
+from support import BORD_REGISTER, OPSTELLINGEN, convert, execute, read_graph
+
+
+def test_shards_cover_every_opstelling_once(wdb):
+    ids = [row[0] for row in execute(wdb, 'SELECT id FROM opstelling ORDER BY id')]
+    with SQLDbReader(wdb) as sql_db_reader:
+        executor = SQLiteQueryExecutor(sql_db_reader)
+        for amount in (1, 3, 4, OPSTELLINGEN - 1, OPSTELLINGEN + 5):
+            shards = executor.get_opstelling_id_ranges(amount)
+
+            assert len(shards) == min(amount, len(ids))
+            assert shards[0][0] == ids[0] and shards[-1][1] == ids[-1]
+            assert all(previous[1] + 1 == following[0] for previous, following in zip(shards, shards[1:]))
+            assert sorted(i for low, high in shards for i in ids if low <= i <= high) == ids
+
+
+def test_shards_give_the_graph_of_a_sequential_run(wdb, tmp_path):
+    config = ProcessorConfig(output_prefix=str(tmp_path / 'parallel'), sink_type='nt', deterministic=True)
+    results = ParallelProcessor(wdb, bord_register=BORD_REGISTER, workers=2, config=config).process(shard_count=3)
+    sequential = convert(wdb, tmp_path / 'sequential', sink_type='nt', deterministic=True)
+
+    assert [result.shard for result in results] == [0, 1, 2]
+    assert all(result.files and all(f'parallel_{result.shard}_' in file for file in result.files)
+               for result in results)
+    assert sum(result.triples for result in results) == sequential.triples_written
+    assert set(read_graph(file for result in results for file in result.files)) == \
+           set(read_graph(sequential.written_files))
+    assert set().union(*(result.bord_register_not_found for result in results)) == \
+           sequential.bord_register_not_found
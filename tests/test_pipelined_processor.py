@@ -0,0 +1,67 @@
+from pathlib import Path
+
+import pytest
+
+from PipelinedProcessor import PipelinedProcessor
+from SQLiteQueryExecutor import SQLiteQueryExecutor
+from support import convert
+
+
+class SmallQueuePipelinedProcessor(PipelinedProcessor):
+    """Queues of one batch, so every stage has to wait for the others."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, queue_size=1, **kwargs)
+
+
+class FailingConversion(SmallQueuePipelinedProcessor):
+    def process_aggregate(self, g, aggregate, geometry=None):
+        if aggregate.opstelling.id == 20:
+            raise ValueError('conversion failed')
+        super().process_aggregate(g, aggregate, geometry)
+
+
+class FailingWriter(SmallQueuePipelinedProcessor):
+    def write_graph(self, g):
+        raise OSError('disk full')
+
+
+def test_pipelined_files_equal_the_sequential_files(wdb, tmp_path):
+    for run in ('sequential', 'pipelined'):
+        (tmp_path / run).mkdir()
+    sequential = convert(wdb, tmp_path / 'sequential' / 'test', write_size=7, sink_type='nt', deterministic=True)
+    pipelined = convert(wdb, tmp_path / 'pipelined' / 'test', write_size=7, sink_type='nt', deterministic=True,
+                        processor_class=SmallQueuePipelinedProcessor)
+
+    assert len(sequential.written_files) > 1
+    assert [Path(file_name).name for file_name in pipelined.written_files] == \
+           [Path(file_name).name for file_name in sequential.written_files]
+    for sequential_file, pipelined_file in zip(sequential.written_files, pipelined.written_files):
+        assert Path(pipelined_file).read_bytes() == Path(sequential_file).read_bytes()
+    assert pipelined.triples_written == sequential.triples_written
+    assert pipelined.bord_register_not_found == sequential.bord_register_not_found
+
+
+def test_an_error_in_the_conversion_is_raised(wdb, tmp_path):
+    with pytest.raises(ValueError, match='conversion failed'):
+        convert(wdb, tmp_path / 'test', write_size=7, sink_type='nt', processor_class=FailingConversion)
+
+
+def test_an_error_in_the_writer_is_raised(wdb, tmp_path):
+    with pytest.raises(OSError, match='disk full'):
+        convert(wdb, tmp_path / 'test', write_size=7, sink_type='nt', processor_class=FailingWriter)
+
+
+def test_an_error_in_the_extraction_is_raised(wdb, tmp_path, monkeypatch):
+    get_all_opstelling_aggregates = SQLiteQueryExecutor.get_all_opstelling_aggregates
+
+    def failing_extraction(executor):
+        for aggregate in get_all_opstelling_aggregates(executor):
+            if aggregate.opstelling.id == 20:
+                raise RuntimeError('database gone')
+            yield aggregate
+
+    monkeypatch.setattr(SQLiteQueryExecutor, 'get_all_opstelling_aggregates', failing_extraction)
+
+    with pytest.raises(RuntimeError, match='database gone'):
+        convert(wdb, tmp_path / 'test', write_size=7, sink_type='nt', processor_class=SmallQueuePipelinedProcessor)
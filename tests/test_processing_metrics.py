@@ -0,0 +1,45 @@
+import json
+
+from ProcessingMetrics import ProcessingMetrics, StageMetrics
+
+
+def test_measurements_are_counted_in_power_of_two_buckets():
+    stage = StageMetrics()
+    for wall_time in (0.0005, 0.001, 0.003, 0.003, 0.1):
+        stage.add(wall_time, 0.0, items=2)
+
+    summary = stage.to_dict()
+
+    assert (summary['calls'], summary['items']) == (5, 10)
+    assert summary['latency_histogram_ms'] == {'<= 1': 2, '<= 4': 2, '<= 128': 1}
+    assert 'bytes' not in summary
+
+
+def test_merged_stages_add_up():
+    first, second = ProcessingMetrics(), ProcessingMetrics()
+    first.add_triples('transform', 10)
+    list(first.timed_iter('extract', range(3)))
+    with second.measure('write', items=1) as write:
+        write.bytes, write.raw_bytes = 100, 400
+    second.add_triples('write', 10)
+    second.peak_rss_kb = 1234
+
+    first.merge(second)
+
+    assert first.stages['extract'].items == 3
+    assert first.peak_rss_kb == 1234
+    write = first.to_dict()['stages']['write']
+    assert (write['triples'], write['bytes_per_triple'], write['compression_ratio']) == (10, 10.0, 4.0)
+
+
+def test_the_summary_is_written_as_json(tmp_path):
+    metrics = ProcessingMetrics()
+    with metrics.measure('transform', items=5):
+        pass
+    metrics.finish()
+    metrics.write_json(tmp_path / 'metrics.json')
+
+    summary = json.loads((tmp_path / 'metrics.json').read_text(encoding='utf-8'))
+
+    assert summary['stages']['transform']['items'] == 5
+    assert summary['total_wall_time'] >= summary['stages']['transform']['wall_time']
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+from rdflib.compare import isomorphic
+
+from support import convert, execute, read_graph
+
+
+def test_quarantine_leaves_out_the_failing_opstelling_and_its_side_effects(wdb, tmp_path):
+    rejected = 5
+    execute(wdb, "UPDATE borden SET folieType = 'onmogelijk' WHERE aanzicht_fk IN "
+                 "(SELECT id FROM aanzichten WHERE opstelling_fk = ?)", (rejected,))
+    with pytest.raises(ValueError, match='folie_type'):
+        convert(wdb, tmp_path / 'aborted', sink_type='nt')
+
+    quarantined = convert(wdb, tmp_path / 'quarantined', sink_type='nt', deterministic=True, quarantine=True)
+    with open(tmp_path / 'quarantined_rejects.jsonl', encoding='utf-8') as rejects_file:
+        rejects = [json.loads(line) for line in rejects_file]
+    assert [reject['opstelling_id'] for reject in rejects] == [rejected]
+    assert rejects[0]['rows']['opstelling']['id'] == rejected
+    assert dict(quarantined.quarantine.counts) == {"ValueError: bord.folie_type can't be mapped to it": 1}
+
+    # the output equals a conversion of the export without the opstelling
+    execute(wdb, 'DELETE FROM opstelling WHERE id = ?', (rejected,))
+    without = convert(wdb, tmp_path / 'without', sink_type='nt', deterministic=True)
+    assert isomorphic(read_graph(quarantined.written_files), read_graph(without.written_files))
+    assert quarantined.bord_register_not_found == without.bord_register_not_found
+
+
+def test_a_rejected_opstelling_is_converted_again_by_the_next_incremental_run(wdb, tmp_path):
+    checkpoint_path = tmp_path / 'checkpoint.json'
+    execute(wdb, "UPDATE borden SET folieType = 'onmogelijk' WHERE aanzicht_fk IN "
+                 "(SELECT id FROM aanzichten WHERE opstelling_fk = 5)")
+    first = convert(wdb, tmp_path / 'first', sink_type='nt', quarantine=True, checkpoint_path=checkpoint_path)
+    assert sum(first.quarantine.counts.values()) == 1
+
+    execute(wdb, "UPDATE borden SET folieType = NULL WHERE folieType = 'onmogelijk'")
+    second = convert(wdb, tmp_path / 'second', sink_type='nt', quarantine=True, checkpoint_path=checkpoint_path)
+
+    assert second.checkpoint.changed == 1
+    assert not (tmp_path / 'second_deleted.txt').exists()
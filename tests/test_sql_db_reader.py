@@ -0,0 +1,31 @@
+import gc
+import weakref
+
+import pytest
+
+from SQLDbReader import SQLDbReader
+
+
+def test_connection_is_reused_until_closed(wdb):
+    reader = SQLDbReader(wdb)
+    connection = reader.get_connection()
+    assert reader.perform_read_query('SELECT count(*) FROM opstelling', {})[0][0] > 0
+    assert reader.get_connection() is connection
+
+    reader.close()
+    assert reader.get_connection() is not connection
+    reader.close()
+
+
+def test_closed_reader_is_not_kept_alive(wdb):
+    with SQLDbReader(wdb) as reader:
+        list(reader.iterate_read_query('SELECT id FROM opstelling', {}))
+    reference = weakref.ref(reader)
+    del reader
+    gc.collect()
+    assert reference() is None
+
+
+def test_missing_file_is_rejected(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        SQLDbReader(tmp_path / 'missing.sqlite')
@@ -0,0 +1,65 @@
+import json
+import math
+
+import pytest
+
+from ProcessorConfig import ProcessorConfig
+from SpatialTiling import NO_TILE, GemeenteTiling, GridTiling
+from SQLDbReader import SQLDbReader
+from SQLiteQueryExecutor import SQLiteQueryExecutor
+from support import BORD_REGISTER, OPSTELLINGEN, execute, read_graph
+from TiledProcessor import TiledProcessor
+
+
+def convert_tiles(db_path, tmp_path, tiling, **options) -> TiledProcessor:
+    with SQLDbReader(db_path) as sql_db_reader:
+        processor = TiledProcessor(SQLiteQueryExecutor(sql_db_reader), bord_register=BORD_REGISTER,
+                                   config=ProcessorConfig(output_prefix=str(tmp_path / 'tile'), sink_type='nt',
+                                                          deterministic=True),
+                                   tiling=tiling, **options)
+        processor.convert()
+    return processor
+
+
+def test_grid_tiles_hold_the_opstellingen_of_their_cell(wdb, tmp_path):
+    execute(wdb, 'UPDATE opstelling SET geometry = NULL WHERE id = 2')
+    processor = convert_tiles(wdb, tmp_path, GridTiling(50000.0))
+
+    manifest = json.loads((tmp_path / 'tile_manifest.json').read_text(encoding='utf-8'))
+    assert manifest['tiling'] == 'grid'
+    assert sum(tile['opstellingen'] for tile in manifest['tiles'].values()) == OPSTELLINGEN - 1
+    assert manifest['tiles'][NO_TILE]['opstellingen'] == 1
+    assert manifest['tiles'][NO_TILE]['extent'] is None
+    for tile, entry in manifest['tiles'].items():
+        assert entry['triples'] == len(read_graph([tmp_path / entry['file']]))
+        assert entry['sha256'] == processor.checksums[str(tmp_path / entry['file'])]
+        if tile != NO_TILE:
+            min_x, min_y, max_x, max_y = entry['extent']
+            assert min_x <= entry['bbox'][0] <= entry['bbox'][2] < max_x
+            assert min_y <= entry['bbox'][1] <= entry['bbox'][3] < max_y
+
+    for opstelling_id, wkt in execute(wdb, 'SELECT id, geometry FROM opstelling WHERE id <> 2'):
+        x, y = map(float, wkt.partition('(')[2].rstrip(')').split())
+        tile = manifest['tiles'][f'{math.floor(x / 50000.0)}_{math.floor(y / 50000.0)}']
+        assert f'/opstelling_{opstelling_id}>' in (tmp_path / tile['file']).read_text(encoding='utf-8')
+
+
+def test_gemeente_tiles_are_named_after_the_gemeente():
+    tiling = GemeenteTiling()
+
+    assert tiling.get_tile(type('Opstelling', (), {'gemeente': " Sint-Pieters-Leeuw (Vlaams-Brabant) "})(),
+                           None) == 'sint-pieters-leeuw-vlaams-brabant'
+    assert tiling.get_tile(type('Opstelling', (), {'gemeente': None})(), None) == NO_TILE
+
+
+def test_a_grid_with_too_many_cells_is_refused_upfront(tmp_path):
+    assert GridTiling(10000.0).count_tiles((0.0, 0.0, 25000.0, 5000.0)) == 3 * 1 + 1
+
+    with pytest.raises(ValueError, match='more than the 1000 files'):
+        TiledProcessor(config=ProcessorConfig(output_prefix=str(tmp_path / 'tile'), sink_type='nt'),
+                       tiling=GridTiling(1000.0))
+
+
+def test_the_conversion_stops_at_the_tile_after_max_tiles(wdb, tmp_path):
+    with pytest.raises(ValueError, match='needs more than 2 tiles'):
+        convert_tiles(wdb, tmp_path, GemeenteTiling(), max_tiles=2)
@@ -0,0 +1,31 @@
+import os
+
+import pytest
+from rdflib import Literal, URIRef, XSD
+
+from TripleSink import create_sink, get_temp_file_name
+from support import convert, read_graph
+
+
+def test_streaming_sinks_write_the_graph_of_the_rdflib_sink(wdb, tmp_path):
+    graphs = {sink_type: set(read_graph(convert(wdb, tmp_path / sink_type, sink_type=sink_type, write_size=7,
+                                                deterministic=True).written_files))
+              for sink_type in ('rdflib', 'nt', 'ttl')}
+
+    assert graphs['rdflib']
+    assert graphs['nt'] == graphs['rdflib']
+    assert graphs['ttl'] == graphs['rdflib']
+
+
+@pytest.mark.parametrize('sink_type', ['rdflib', 'nt', 'ttl'])
+def test_file_only_appears_when_the_sink_is_closed(tmp_path, sink_type):
+    sink = create_sink(sink_type, str(tmp_path / 'triples'))
+    sink.add((URIRef('https://example.org/a'), URIRef('https://example.org/b'), Literal(3, datatype=XSD.decimal)))
+    assert len(sink) == 1
+    assert not os.path.exists(sink.file_name)
+
+    sink.close()
+    assert os.path.isfile(sink.file_name)
+    assert not os.path.exists(get_temp_file_name(sink.file_name))
+    assert set(read_graph([sink.file_name])) == {
+        (URIRef('https://example.org/a'), URIRef('https://example.org/b'), Literal('3.0', datatype=XSD.decimal))}